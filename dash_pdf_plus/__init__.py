@@ -6,10 +6,36 @@ import os as _os
 import sys as _sys
 
 import dash as _dash
-import requests
 
 # noinspection PyUnresolvedReferences
 from ._imports_ import __all__, _DashPdf
+from .annotations import AnnotationStore, VersionConflict, from_arrays, to_annotations
+from .documents import (
+    STREAM_DOCUMENT_OPTIONS,
+    DocumentRegistry,
+    default_registry,
+    init_app,
+    register_document,
+)
+from .export import export_annotations, export_batch
+from .fetch import DocumentTooLarge, RemoteFetcher, default_fetcher, fetch
+from .metrics import (
+    MetricsAggregator,
+    default_aggregator,
+    init_metrics,
+    record_metrics,
+)
+from .persistence import AnnotationBackend, MemoryBackend, SQLiteBackend
+from .render import THUMBNAIL_SCALE, PageRenderer, default_renderer, render_pages
+from .sync import LocalBroker, SyncHub, default_hub, init_sync
+from .text import (
+    DocumentText,
+    TextExtractor,
+    default_extractor,
+    extract_text,
+    fill_selected_text,
+    text_in_rect,
+)
 
 if not hasattr(_dash, "__plotly_dash") and not hasattr(_dash, "development"):
     print(
@@ -32,7 +58,7 @@ _current_path = _os.path.dirname(_os.path.abspath(__file__))
 
 _this_module = _sys.modules[__name__]
 
-async_resources = []
+async_resources = ["viewer"]
 
 _js_dist = []
 
@@ -94,14 +120,79 @@ for _component in __all__:
 
 
 class DashPDF(_DashPdf):
-    def __init__(self, id, data, **kwargs):
+    """PDF viewer that accepts bytes, file paths and remote URLs as ``data``.
+
+    By default the document is embedded in the layout as a base64 data URI.
+    With ``stream=True`` the bytes (or file path) are registered in a
+    server-side ``DocumentRegistry`` instead and the component loads them
+    from a short URL served by the route added with ``init_app``, fetching
+    only the byte ranges it needs. The default registry is bounded, so a
+    document registered long ago may be evicted while it is still shown;
+    see ``register_document``. ``stream="chunked"`` loads it in
+    fixed-size chunks through the component's ``transfer="chunked"`` mode
+    instead, reporting ``load_progress`` and ``bytes_loaded``.
+
+    Remote URLs are downloaded through ``fetcher`` (a shared, cached
+    ``RemoteFetcher`` by default).
+
+    With ``thumbnails=True`` the document is also registered so that the
+    thumbnail strip loads page images rendered on the server.
+
+    ``data`` may be left out when ``doc_key`` names a document the browser
+    has stored (see ``browser_cache_mb``). Streamed documents get their
+    registry id as ``doc_key`` unless one is given.
+
+    With ``sync=True`` (or a ``SyncHub``) annotation edits are synced live
+    with the other viewers of the document through the routes added with
+    ``init_sync``.
+    """
+
+    def __init__(
+        self,
+        id,
+        data=None,
+        stream=False,
+        registry=None,
+        fetcher=None,
+        sync=False,
+        **kwargs,
+    ):
+        if sync:
+            kwargs["sync_url"] = (default_hub if sync is True else sync).url_prefix
+        if data is None:
+            if not kwargs.get("doc_key"):
+                raise ValueError("DashPDF needs data or a doc_key")
+            super().__init__(id=id, **kwargs)
+            return
         if isinstance(data, str) and (
             data.startswith("http://") or data.startswith("https://")
         ):
-            response = requests.get(data)
-            pdf_content = response.content
-            pdf_base64 = base64.b64encode(pdf_content).decode("utf-8")
-            data = f"data:application/pdf;base64,{pdf_base64}"
+            data = fetch(data, fetcher=fetcher)
+        registrable = isinstance(data, (bytes, _os.PathLike)) or (
+            isinstance(data, str) and _os.path.isfile(data)
+        )
+        if kwargs.get("thumbnails") is True:
+            if not registrable:
+                raise ValueError(
+                    "thumbnails=True needs the document as bytes or a file path"
+                )
+            registry = registry or default_registry
+            kwargs["thumbnails"] = registry.page_url_for(
+                registry.register(data), scale=THUMBNAIL_SCALE
+            )
+        if stream:
+            if registrable:
+                registry = registry or default_registry
+                doc_id = registry.register(data)
+                data = registry.url_for(doc_id)
+                kwargs.setdefault("doc_key", doc_id)
+            if stream == "chunked":
+                kwargs["transfer"] = "chunked"
+            else:
+                kwargs["document_options"] = {
+                    **STREAM_DOCUMENT_OPTIONS,
+                    **(kwargs.get("document_options") or {}),
+                }
         elif isinstance(data, bytes):
             data = (
                 f"data:application/pdf;base64,{base64.b64encode(data).decode('utf-8')}"
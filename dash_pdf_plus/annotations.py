@@ -0,0 +1,362 @@
+"""Server-side handling of annotations edited in ``DashPDF``.
+
+With ``annotation_changes=[]`` (and optionally ``echo_annotations=False``)
+the component reports each edit as a small delta instead of the full
+annotation list. ``AnnotationStore`` applies those deltas to a server-side
+copy of the annotations, using the annotation ``version`` for optimistic
+concurrency checks.
+
+``from_arrays`` builds large batches of annotations (e.g. detector output)
+from columns of values, in a compact columnar format that the component
+decodes itself instead of one JSON object per annotation.
+"""
+
+import array
+import base64
+import math
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from .text import TEXT_ANNOTATION_TYPES, extract_text
+
+COLUMNAR_FORMAT = "dash-pdf-columnar"
+ANNOTATION_TYPES = ("rectangle", "highlight", "comment")
+RECT_COLUMNS = ("x", "y", "width", "height")
+
+# Coordinates are sent as float32, rounded to this many decimals
+COORDINATE_DECIMALS = 2
+
+# Binary column types: (array typecode, numpy dtype), packed little-endian
+_COLUMN_TYPES = {"page": ("I", "<u4")}
+_COLUMN_TYPES.update((name, ("f", "<f4")) for name in RECT_COLUMNS)
+
+
+class VersionConflict(Exception):
+    """Raised when a delta was made against a different annotation version."""
+
+    def __init__(self, change, current):
+        self.change = change
+        self.current = current
+        super().__init__(
+            "{} of annotation {!r} at version {} conflicts with version {}".format(
+                change.get("op"),
+                change.get("id"),
+                change.get("version"),
+                None if current is None else current.get("version", 1),
+            )
+        )
+
+
+def resolve_change(change, current):
+    """Return ``current`` with the delta ``change`` applied.
+
+    Returns None when the annotation is deleted and raises
+    ``VersionConflict`` if the delta was made against another version.
+    """
+    op = change["op"]
+    version = change.get("version")
+    if op == "add":
+        if current is not None:
+            raise VersionConflict(change, current)
+        return dict(change["patch"])
+    if op == "update":
+        # The client bumps the version by one for every edit
+        if current is None or (
+            version is not None and current.get("version", 1) != version - 1
+        ):
+            raise VersionConflict(change, current)
+        return {**current, **change["patch"]}
+    if op == "delete":
+        if (
+            current is not None
+            and version is not None
+            and current.get("version", 1) != version
+        ):
+            raise VersionConflict(change, current)
+        return None
+    raise ValueError("unknown annotation change {!r}".format(op))
+
+
+def new_changes(changes, last_seq):
+    """Yield deltas from ``changes`` not yet applied according to ``last_seq``.
+
+    ``last_seq`` maps each session to the last applied ``seq`` and is updated
+    as deltas are yielded.
+    """
+    for change in sorted(changes or [], key=lambda c: c["seq"]):
+        session = change.get("session")
+        if change["seq"] <= last_seq.get(session, 0):
+            continue
+        last_seq[session] = change["seq"]
+        yield change
+
+
+class AnnotationStore:
+    """In-memory annotations keyed by id, updated from component deltas.
+
+    Each delta is ``{seq, session, op, id, patch, version}``. ``apply``
+    skips deltas whose ``seq`` was already applied for their ``session``,
+    so passing the whole ``annotation_changes`` window on every callback
+    is safe.
+    """
+
+    def __init__(self, annotations=()):
+        self._annotations = {a["id"]: dict(a) for a in annotations}
+        self._last_seq = {}
+        self._lock = threading.RLock()
+
+    def apply_change(self, change, resolve=resolve_change):
+        """Apply one delta, raising ``VersionConflict`` if it is stale.
+
+        ``resolve(change, current)`` returns the resulting annotation (None
+        when deleted), which is also returned.
+        """
+        annotation_id = change["id"]
+        with self._lock:
+            annotation = resolve(change, self._annotations.get(annotation_id))
+            if annotation is None:
+                self._annotations.pop(annotation_id, None)
+            else:
+                self._annotations[annotation_id] = annotation
+            return None if annotation is None else dict(annotation)
+
+    def apply(self, changes):
+        """Apply new deltas from ``changes`` and return the conflicting ones."""
+        conflicts = []
+        with self._lock:
+            for change in new_changes(changes, self._last_seq):
+                try:
+                    self.apply_change(change)
+                except VersionConflict:
+                    conflicts.append(change)
+        return conflicts
+
+    def get(self, annotation_id):
+        with self._lock:
+            annotation = self._annotations.get(annotation_id)
+            return None if annotation is None else dict(annotation)
+
+    def annotations(self, page=None):
+        """Return a list of annotations, optionally only those on ``page``."""
+        with self._lock:
+            return [
+                dict(a)
+                for a in self._annotations.values()
+                if page is None or a.get("page") == page
+            ]
+
+    def __len__(self):
+        return len(self._annotations)
+
+    def __contains__(self, annotation_id):
+        return annotation_id in self._annotations
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _sized(values, name):
+    if values is None or isinstance(values, (str, bytes)):
+        raise TypeError("{} must be a sequence, got {!r}".format(name, values))
+    return values if hasattr(values, "__len__") else list(values)
+
+
+def _pack(name, values, numpy):
+    typecode, dtype = _COLUMN_TYPES[name]
+    if numpy is not None:
+        content = numpy.asarray(values, dtype=dtype).tobytes()
+    else:
+        packed = array.array(typecode, values)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        content = packed.tobytes()
+    return base64.b64encode(content).decode("ascii")
+
+
+def _unpack(name, data):
+    packed = array.array(_COLUMN_TYPES[name][0])
+    packed.frombytes(base64.b64decode(data))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _normalize_numpy(numpy, pages, rects):
+    pages = numpy.asarray(pages, dtype=numpy.float64)
+    x, y, width, height = numpy.asarray(rects, dtype=numpy.float64)
+    if not numpy.all((pages >= 1) & (pages == numpy.floor(pages))):
+        raise ValueError("pages must be integers >= 1")
+    if not numpy.all(numpy.isfinite([x, y, width, height])):
+        raise ValueError("coordinates must be finite numbers")
+    # Negative sizes extend to the left of / above the given corner
+    x = numpy.where(width < 0, x + width, x)
+    y = numpy.where(height < 0, y + height, y)
+    rects = numpy.round(
+        [x, y, numpy.abs(width), numpy.abs(height)], COORDINATE_DECIMALS
+    )
+    return pages.astype(numpy.uint32), rects
+
+
+def _normalize_lists(pages, rects):
+    normalized_pages = []
+    for page in pages:
+        page = float(page)
+        if not (page >= 1 and page.is_integer()):
+            raise ValueError("pages must be integers >= 1")
+        normalized_pages.append(int(page))
+    columns = [[], [], [], []]
+    for x, y, width, height in zip(*rects):
+        x, y, width, height = float(x), float(y), float(width), float(height)
+        if not all(map(math.isfinite, (x, y, width, height))):
+            raise ValueError("coordinates must be finite numbers")
+        if width < 0:
+            x, width = x + width, -width
+        if height < 0:
+            y, height = y + height, -height
+        for column, value in zip(columns, (x, y, width, height)):
+            column.append(round(value, COORDINATE_DECIMALS))
+    return normalized_pages, columns
+
+
+def _timestamp():
+    """Current time formatted like the component's ``created_at``."""
+    now = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    return now.replace("+00:00", "Z")
+
+
+def from_arrays(
+    pages,
+    x,
+    y,
+    width,
+    height,
+    annotation_type="rectangle",
+    ids=None,
+    selected_text=None,
+    comments=None,
+    doc=None,
+    extractor=None,
+    **fields,
+):
+    """Build a batch of annotations from columns of values.
+
+    ``pages`` (1-based), ``x``, ``y``, ``width`` and ``height`` are equally
+    long NumPy arrays or iterables, in points at scale 1.0 from the top-left
+    corner of the page. Rectangles with negative sizes are normalized and
+    coordinates rounded to ``COORDINATE_DECIMALS``. Every annotation gets
+    ``annotation_type`` and the constant ``fields`` (e.g. ``color``), and
+    ids derived from a shared prefix unless ``ids`` are given.
+
+    ``selected_text`` is taken from ``doc`` (bytes or a file path) through
+    the text extractor when it is passed, for rectangles and highlights.
+
+    Returns a value for the component's ``annotations`` prop; use
+    ``to_annotations`` to expand it into annotation dicts on the server.
+    NumPy is used when it is installed.
+    """
+    if annotation_type not in ANNOTATION_TYPES:
+        raise ValueError("unknown annotation type {!r}".format(annotation_type))
+    pages = _sized(pages, "pages")
+    rects = [
+        _sized(values, name)
+        for values, name in zip((x, y, width, height), RECT_COLUMNS)
+    ]
+    text_columns = {
+        name: list(_sized(values, name))
+        for name, values in (
+            ("id", ids),
+            ("selected_text", selected_text),
+            ("comment", comments),
+        )
+        if values is not None
+    }
+    lengths = {len(pages), *map(len, rects), *map(len, text_columns.values())}
+    if len(lengths) > 1:
+        raise ValueError("columns have different lengths: {}".format(sorted(lengths)))
+    count = len(pages)
+    if "id" in text_columns and len(set(text_columns["id"])) != count:
+        raise ValueError("ids must be unique")
+
+    numpy = _import_numpy()
+    if numpy is not None:
+        pages, rects = _normalize_numpy(numpy, pages, rects)
+    else:
+        pages, rects = _normalize_lists(pages, rects)
+
+    if (
+        doc is not None
+        and "selected_text" not in text_columns
+        and annotation_type in TEXT_ANNOTATION_TYPES
+    ):
+        document = extract_text(doc, extractor=extractor)
+        text_columns["selected_text"] = [
+            document.text_in_rect(int(page), *map(float, rect))
+            for page, rect in zip(pages, zip(*rects))
+        ]
+
+    now = _timestamp()
+    batch = {
+        "format": COLUMNAR_FORMAT,
+        "count": count,
+        "decimals": COORDINATE_DECIMALS,
+        "fields": {
+            "version": 1,
+            "created_at": now,
+            "updated_at": now,
+            **fields,
+            "type": annotation_type,
+        },
+        "columns": {
+            "page": _pack("page", pages, numpy),
+            **{
+                name: _pack(name, values, numpy)
+                for name, values in zip(RECT_COLUMNS, rects)
+            },
+            **text_columns,
+        },
+    }
+    if "id" not in text_columns:
+        batch["id_prefix"] = "{}-{}-".format(annotation_type, uuid.uuid4().hex[:12])
+    return batch
+
+
+def is_columnar(annotations):
+    """Whether ``annotations`` is a batch built by ``from_arrays``."""
+    return (
+        isinstance(annotations, dict) and annotations.get("format") == COLUMNAR_FORMAT
+    )
+
+
+def to_annotations(annotations):
+    """Expand a ``from_arrays`` batch into a list of annotation dicts.
+
+    Lists of annotations are returned as a copy, so that either form of the
+    ``annotations`` prop can be passed.
+    """
+    if not is_columnar(annotations):
+        return [dict(a) for a in annotations or ()]
+    columns = annotations["columns"]
+    decimals = annotations.get("decimals", COORDINATE_DECIMALS)
+    values = {
+        name: _unpack(name, data) if name in _COLUMN_TYPES else data
+        for name, data in columns.items()
+    }
+    result = []
+    for index in range(annotations["count"]):
+        annotation = dict(annotations.get("fields") or {})
+        if "id_prefix" in annotations:
+            annotation["id"] = "{}{}".format(annotations["id_prefix"], index)
+        for name, column in values.items():
+            value = column[index]
+            if name in RECT_COLUMNS:
+                value = round(value, decimals)
+            annotation[name] = value
+        result.append(annotation)
+    return result
@@ -0,0 +1,267 @@
+"""Server-side document registry for serving PDFs by reference.
+
+Instead of embedding the whole PDF in the layout as a base64 data URI, a
+document can be registered here and the component is handed a short
+``/_dash-pdf/<doc_id>`` URL. The route streams the bytes and honours HTTP
+``Range`` requests, so pdf.js only fetches the parts it needs.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from .text import content_hash
+
+ROUTE_NAME = "_dash-pdf"
+CHUNK_SIZE = 64 * 1024
+# Memory held by in-memory documents in the default registry
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# pdf.js options that make it load large documents range by range instead of
+# downloading the whole file up front.
+STREAM_DOCUMENT_OPTIONS = {
+    "disableAutoFetch": True,
+    "disableStream": True,
+    "rangeChunkSize": 256 * 1024,
+}
+
+
+class _Entry:
+    """A registered document backed either by bytes or by a file path.
+
+    ``content_hash`` identifies the content, whatever ``doc_id`` it is
+    registered under: a hash of the bytes, or of the path, size and
+    modification time for files.
+    """
+
+    def __init__(self, doc_id, content=None, path=None, content_hash=None):
+        self.doc_id = doc_id
+        self.content = content
+        self.path = path
+        self.content_hash = content_hash
+        if content is not None:
+            self.size = len(content)
+        else:
+            self.size = os.path.getsize(path)
+
+    @property
+    def etag(self):
+        return self.content_hash
+
+    def iter_bytes(self, start, end, chunk_size=CHUNK_SIZE):
+        """Yield the bytes in ``[start, end)`` in chunks of ``chunk_size``."""
+        if self.content is not None:
+            view = memoryview(self.content)
+            for offset in range(start, end, chunk_size):
+                yield bytes(view[offset : min(offset + chunk_size, end)])
+            return
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def _hash_path(path):
+    stat = os.stat(path)
+    key = "{}:{}:{}".format(path, stat.st_size, stat.st_mtime_ns)
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DocumentRegistry:
+    """Thread-safe mapping of document ids to PDF bytes or file paths.
+
+    Document ids are derived from the content (or from the path, size and
+    modification time for files), so registering the same document twice
+    returns the same id. ``max_bytes`` bounds the memory held by in-memory
+    documents; the least recently used ones are dropped first, after which
+    their URL answers 404 even if a viewer still shows them.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.url_prefix = "/{}/".format(ROUTE_NAME)
+        self._entries = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+
+    def register(self, source, doc_id=None):
+        """Register ``source`` (bytes or a file path) and return its id.
+
+        Registering different content under an existing ``doc_id`` replaces
+        the document registered under it.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            content = bytes(source)
+            doc_hash = content_hash(content)
+            path = None
+        elif isinstance(source, (str, os.PathLike)):
+            path = os.path.abspath(os.fspath(source))
+            if not os.path.isfile(path):
+                raise FileNotFoundError(path)
+            doc_hash = _hash_path(path)
+            content = None
+        else:
+            raise TypeError(
+                "expected bytes or a file path, got {}".format(
+                    type(source).__name__
+                )
+            )
+        doc_id = doc_id or doc_hash
+        with self._lock:
+            previous = self._entries.get(doc_id)
+            if previous is not None and previous.content_hash == doc_hash:
+                self._entries.move_to_end(doc_id)
+                return doc_id
+            # New content under an existing id replaces the old content
+            if previous is not None:
+                del self._entries[doc_id]
+                if previous.content is not None:
+                    self._memory -= previous.size
+            entry = _Entry(doc_id, content=content, path=path, content_hash=doc_hash)
+            self._entries[doc_id] = entry
+            if content is not None:
+                self._memory += entry.size
+                self._evict()
+        return doc_id
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        for doc_id in list(self._entries):
+            if self._memory <= self.max_bytes or len(self._entries) <= 1:
+                break
+            entry = self._entries[doc_id]
+            if entry.content is None:
+                continue
+            del self._entries[doc_id]
+            self._memory -= entry.size
+
+    def unregister(self, doc_id):
+        with self._lock:
+            entry = self._entries.pop(doc_id, None)
+            if entry is not None and entry.content is not None:
+                self._memory -= entry.size
+
+    def get(self, doc_id):
+        with self._lock:
+            entry = self._entries.get(doc_id)
+            if entry is not None:
+                self._entries.move_to_end(doc_id)
+            return entry
+
+    def __contains__(self, doc_id):
+        with self._lock:
+            return doc_id in self._entries
+
+    def url_for(self, doc_id):
+        return self.url_prefix + doc_id
+
+    def page_url_for(self, doc_id, page="{page}", scale=1.0, format="png"):
+        """URL of a rendered page image; by default a ``{page}`` template."""
+        return "{}/pages/{}.{}?scale={:g}".format(
+            self.url_for(doc_id), page, format, scale
+        )
+
+
+# Bounded, since documents registered in callbacks are never unregistered
+default_registry = DocumentRegistry(max_bytes=DEFAULT_MAX_BYTES)
+
+
+def _send_document(entry):
+    from flask import Response, request
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": '"{}"'.format(entry.etag),
+        "Cache-Control": "private, max-age=3600",
+    }
+    if request.range is None and entry.etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+
+    start, end, status = 0, entry.size, 200
+    # Multipart responses are not supported; a Range header asking for
+    # several ranges is ignored, as RFC 7233 allows
+    if request.range is not None and len(request.range.ranges) == 1:
+        bounds = request.range.range_for_length(entry.size)
+        if bounds is None:
+            headers["Content-Range"] = "bytes */{}".format(entry.size)
+            return Response(status=416, headers=headers)
+        start, end = bounds
+        status = 206
+        headers["Content-Range"] = "bytes {}-{}/{}".format(
+            start, end - 1, entry.size
+        )
+    headers["Content-Length"] = str(end - start)
+
+    return Response(
+        entry.iter_bytes(start, end),
+        status=status,
+        mimetype="application/pdf",
+        headers=headers,
+        direct_passthrough=True,
+    )
+
+
+def init_app(app, registry=None):
+    """Add the document routes to a Dash app's Flask server.
+
+    Registered documents are served at
+    ``<requests_pathname_prefix>_dash-pdf/<doc_id>`` and images of their pages
+    at ``.../<doc_id>/pages/<page>.<format>?scale=<scale>``.
+    """
+    from flask import abort
+
+    registry = registry or default_registry
+    routes_prefix = app.config.routes_pathname_prefix
+    registry.url_prefix = "{}{}/".format(
+        app.config.requests_pathname_prefix, ROUTE_NAME
+    )
+
+    def serve_document(doc_id):
+        entry = registry.get(doc_id)
+        if entry is None:
+            abort(404)
+        return _send_document(entry)
+
+    app.server.add_url_rule(
+        "{}{}/<doc_id>".format(routes_prefix, ROUTE_NAME),
+        endpoint="dash_pdf_plus_document",
+        view_func=serve_document,
+        methods=["GET", "HEAD"],
+    )
+
+    def serve_page_image(doc_id, page, format):
+        from .render import _send_page_image
+
+        entry = registry.get(doc_id)
+        if entry is None:
+            abort(404)
+        return _send_page_image(entry, page, format)
+
+    app.server.add_url_rule(
+        "{}{}/<doc_id>/pages/<int:page>.<format>".format(routes_prefix, ROUTE_NAME),
+        endpoint="dash_pdf_plus_page_image",
+        view_func=serve_page_image,
+        methods=["GET", "HEAD"],
+    )
+    return registry
+
+
+def register_document(source, registry=None, doc_id=None):
+    """Register ``source`` and return the URL the component should load.
+
+    Documents are never unregistered, so registering in callbacks relies on
+    the registry's ``max_bytes`` bound: the least recently used in-memory
+    documents are evicted, and viewers still showing one get a 404 for its
+    remaining ranges. Pass a stable ``doc_id`` (such as a hash of where the
+    document came from) to keep one entry per source; registering new
+    content under it replaces the old content.
+    """
+    registry = registry or default_registry
+    return registry.url_for(registry.register(source, doc_id=doc_id))
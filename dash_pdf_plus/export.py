@@ -0,0 +1,262 @@
+"""Exporting component annotations into the PDF as native annotations.
+
+Rectangles become ``/Square`` annotations, comments ``/FreeText`` and
+highlights ``/Highlight``, placed by mapping the component's coordinates
+(scale 1.0, origin at the top-left of the displayed page) back to PDF user
+space::
+
+    with open("reviewed.pdf", "wb") as f:
+        dash_pdf_plus.export_annotations(pdf_bytes, annotations, output=f)
+
+``export_batch`` runs many exports in a pool of worker processes. Exporting
+uses ``pypdf``, installed with ``pip install dash-pdf-plus[export]``.
+"""
+
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Colors of the annotations as drawn by the component
+RECTANGLE_COLOR = "#dc2626"
+RECTANGLE_FILL_OPACITY = 0.1
+COMMENT_COLOR = "#3b82f6"
+COMMENT_BACKGROUND = "#dbeafe"
+HIGHLIGHT_COLOR = "#ffff00"
+HIGHLIGHT_OPACITY = 0.3
+COMMENT_FONT_SIZE = 14
+COMMENT_MIN_WIDTH = 80
+COMMENT_MIN_HEIGHT = 24
+
+
+def _import_pypdf():
+    try:
+        import pypdf
+        import pypdf.annotations
+    except ImportError as e:
+        raise ImportError(
+            "exporting annotations requires pypdf; install it with "
+            "`pip install dash-pdf-plus[export]`"
+        ) from e
+    return pypdf
+
+
+def _rgb(color, default):
+    """Parse a ``#rgb`` or ``#rrggbb`` color into ``(r, g, b)`` in [0, 1]."""
+    value = (color or default).lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    try:
+        return tuple(int(value[i : i + 2], 16) / 255 for i in (0, 2, 4))
+    except ValueError:
+        return _rgb(default, default)
+
+
+def _hex(rgb):
+    return "".join("{:02x}".format(round(c * 255)) for c in rgb)
+
+
+def to_pdf_point(x, y, view_box, rotation=0):
+    """Map a point from component coordinates to PDF user space.
+
+    ``view_box`` is the page's crop box ``(x1, y1, x2, y2)`` and
+    ``rotation`` its ``/Rotate`` value, which pdf.js applies when it lays the
+    page out.
+    """
+    x1, y1, x2, y2 = view_box
+    rotation %= 360
+    if rotation == 90:
+        return x1 + y, y1 + x
+    if rotation == 180:
+        return x2 - x, y1 + y
+    if rotation == 270:
+        return x2 - y, y2 - x
+    return x1 + x, y2 - y
+
+
+def to_pdf_rect(x, y, width, height, view_box, rotation=0):
+    """Map a component rectangle to a PDF ``[left, bottom, right, top]``."""
+    ax, ay = to_pdf_point(x, y, view_box, rotation)
+    bx, by = to_pdf_point(x + width, y + height, view_box, rotation)
+    return min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)
+
+
+def _add_indirect(writer, obj):
+    """Add ``obj`` to ``writer`` as an indirect object and return its reference.
+
+    Streams such as appearance streams must be indirect objects. pypdf has no
+    public method for this (``PdfWriter.add_object`` does not exist as of
+    pypdf 6), so the private one is used only when a public one is missing.
+    """
+    add_object = getattr(writer, "add_object", None) or writer._add_object
+    return add_object(obj)
+
+
+def _rectangle_appearance(writer, rect, color, opacity):
+    """Appearance stream of a rectangle with an opaque border.
+
+    ``/CA`` would make the border as translucent as the fill, so the fill
+    ``opacity`` is set in the stream's graphics state instead.
+    """
+    from pypdf.generic import (
+        ArrayObject,
+        DecodedStreamObject,
+        DictionaryObject,
+        FloatObject,
+        NameObject,
+    )
+
+    left, bottom, right, top = rect
+    width, height = float(right - left), float(top - bottom)
+    rgb = " ".join("{:.4f}".format(c) for c in color)
+    stream = DecodedStreamObject()
+    stream.set_data(
+        "/GS0 gs {0} rg {0} RG 1 w 0.5 0.5 {1:.4f} {2:.4f} re B".format(
+            rgb, max(width - 1, 0), max(height - 1, 0)
+        ).encode()
+    )
+    graphics_state = DictionaryObject(
+        {
+            NameObject("/ca"): FloatObject(opacity),
+            NameObject("/CA"): FloatObject(1),
+        }
+    )
+    stream.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject(
+                FloatObject(v) for v in (0, 0, width, height)
+            ),
+            NameObject("/Resources"): DictionaryObject(
+                {
+                    NameObject("/ExtGState"): DictionaryObject(
+                        {NameObject("/GS0"): graphics_state}
+                    )
+                }
+            ),
+        }
+    )
+    return DictionaryObject({NameObject("/N"): _add_indirect(writer, stream)})
+
+
+def _pdf_annotation(writer, annotation, view_box, rotation):
+    pypdf = _import_pypdf()
+    from pypdf.generic import ArrayObject, FloatObject, NameObject, TextStringObject
+
+    kind = annotation.get("type")
+    width = annotation.get("width") or 0
+    height = annotation.get("height") or 0
+    if kind == "comment":
+        width = max(width, COMMENT_MIN_WIDTH)
+        height = max(height, COMMENT_MIN_HEIGHT)
+    rect = to_pdf_rect(
+        annotation["x"], annotation["y"], width, height, view_box, rotation
+    )
+
+    if kind == "rectangle":
+        color = _rgb(annotation.get("color"), RECTANGLE_COLOR)
+        pdf_annotation = pypdf.annotations.Rectangle(
+            rect=rect, interior_color=_hex(color)
+        )
+        pdf_annotation[NameObject("/C")] = ArrayObject(FloatObject(c) for c in color)
+        pdf_annotation[NameObject("/AP")] = _rectangle_appearance(
+            writer,
+            rect,
+            color,
+            annotation.get("opacity", RECTANGLE_FILL_OPACITY),
+        )
+        # The fill opacity is in the appearance; the border is opaque
+        opacity = 1
+    elif kind == "highlight":
+        color = _rgb(annotation.get("color"), HIGHLIGHT_COLOR)
+        left, bottom, right, top = rect
+        pdf_annotation = pypdf.annotations.Highlight(
+            rect=rect,
+            quad_points=ArrayObject(
+                FloatObject(v)
+                for v in (left, top, right, top, left, bottom, right, bottom)
+            ),
+            highlight_color=_hex(color),
+        )
+        opacity = annotation.get("opacity", HIGHLIGHT_OPACITY)
+    elif kind == "comment":
+        pdf_annotation = pypdf.annotations.FreeText(
+            text=annotation.get("comment") or "",
+            rect=rect,
+            font_size="{}pt".format(COMMENT_FONT_SIZE),
+            border_color=_hex(_rgb(annotation.get("color"), COMMENT_COLOR)),
+            background_color=_hex(_rgb(None, COMMENT_BACKGROUND)),
+        )
+        opacity = annotation.get("opacity", 1)
+    else:
+        raise ValueError("unknown annotation type {!r}".format(kind))
+
+    pdf_annotation[NameObject("/CA")] = FloatObject(opacity)
+    pdf_annotation[NameObject("/NM")] = TextStringObject(str(annotation["id"]))
+    if kind != "comment" and annotation.get("comment"):
+        pdf_annotation[NameObject("/Contents")] = TextStringObject(
+            annotation["comment"]
+        )
+    return pdf_annotation
+
+
+def export_annotations(source, annotations, output=None):
+    """Write ``source`` with ``annotations`` added as PDF annotations.
+
+    ``source`` is PDF bytes or a file path. The result is written to
+    ``output`` (a path or binary file object) as it is serialized; without
+    ``output`` the bytes are returned.
+    """
+    pypdf = _import_pypdf()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    writer = pypdf.PdfWriter(clone_from=pypdf.PdfReader(source))
+
+    for annotation in annotations:
+        page_index = (annotation.get("page") or 1) - 1
+        page = writer.pages[page_index]
+        box = page.cropbox
+        view_box = (box.left, box.bottom, box.right, box.top)
+        pdf_annotation = _pdf_annotation(writer, annotation, view_box, page.rotation)
+        writer.add_annotation(page_number=page_index, annotation=pdf_annotation)
+
+    if output is None:
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+    writer.write(output)
+    return output
+
+
+def _export_job(source, annotations, output):
+    export_annotations(source, annotations, output=os.fspath(output))
+    return output
+
+
+def export_batch(jobs, max_workers=None):
+    """Export ``(source, annotations, output_path)`` jobs concurrently.
+
+    Jobs run in a pool of worker processes and are consumed lazily, so only
+    a few documents are held in memory at a time. Yields ``(output_path,
+    error)`` as jobs finish, with ``error`` None on success.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending = {}
+        jobs = iter(jobs)
+        while True:
+            for source, annotations, output in jobs:
+                future = executor.submit(_export_job, source, annotations, output)
+                pending[future] = output
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.exception()
@@ -0,0 +1,188 @@
+"""Cached, connection-pooled fetching of remote PDFs.
+
+Layouts are often rebuilt per request, so ``DashPDF`` goes through a shared
+``RemoteFetcher`` instead of calling ``requests.get`` on every construction.
+The fetcher keeps a bounded LRU cache with a TTL, revalidates stale entries
+with ``ETag``/``Last-Modified``, caps concurrent downloads and lets
+simultaneous requests for the same URL share one download.
+
+``requests`` is only imported once the first document is downloaded, so
+that importing the package stays cheap for apps that never fetch.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when a remote document exceeds the fetcher's ``max_size``."""
+
+
+class _CacheEntry:
+    def __init__(self, content, etag=None, last_modified=None):
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+    @property
+    def size(self):
+        return len(self.content)
+
+
+class RemoteFetcher:
+    """Download remote documents through a pooled session with caching.
+
+    ``max_entries`` and ``max_bytes`` bound the cache, ``ttl`` is the number
+    of seconds an entry is served without revalidation, ``max_size`` caps the
+    size of a single download and ``max_concurrent`` the number of downloads
+    running at once.
+    """
+
+    def __init__(
+        self,
+        max_entries=32,
+        max_bytes=512 * 1024 * 1024,
+        ttl=300,
+        timeout=30,
+        max_size=None,
+        max_concurrent=4,
+        pool_size=10,
+        session=None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_size = max_size
+        self.pool_size = pool_size
+        self._session = session
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._downloads = threading.BoundedSemaphore(max_concurrent)
+
+    @property
+    def session(self):
+        """The pooled ``requests.Session``, created on first use."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def fetch(self, url):
+        """Return the content at ``url``, from the cache when it is fresh."""
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+                if time.monotonic() - entry.fetched_at < self.ttl:
+                    return entry.content
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = self._inflight[url] = Future()
+        if not owner:
+            return future.result()
+        try:
+            entry = self._download(url, entry)
+            self._store(url, entry)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(entry.content)
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+        return entry.content
+
+    def _download(self, url, cached):
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        with self._downloads:
+            with self.session.get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            ) as response:
+                if cached is not None and response.status_code == 304:
+                    cached.fetched_at = time.monotonic()
+                    return cached
+                response.raise_for_status()
+                content = self._read(url, response)
+                return _CacheEntry(
+                    content,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+
+    def _read(self, url, response):
+        length = response.headers.get("Content-Length")
+        if self.max_size is not None and length and int(length) > self.max_size:
+            raise DocumentTooLarge(
+                "{} is {} bytes, limit is {}".format(url, length, self.max_size)
+            )
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            received += len(chunk)
+            if self.max_size is not None and received > self.max_size:
+                raise DocumentTooLarge(
+                    "{} exceeds the limit of {} bytes".format(url, self.max_size)
+                )
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _store(self, url, entry):
+        if self.max_bytes is not None and entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._cache.pop(url, None)
+            if previous is not None:
+                self._cache_bytes -= previous.size
+            self._cache[url] = entry
+            self._cache_bytes += entry.size
+            while self._cache and (
+                len(self._cache) > self.max_entries
+                or (
+                    self.max_bytes is not None
+                    and self._cache_bytes > self.max_bytes
+                )
+            ):
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.size
+
+    def invalidate(self, url=None):
+        """Drop ``url`` from the cache, or the whole cache if ``url`` is None."""
+        with self._lock:
+            if url is None:
+                self._cache.clear()
+                self._cache_bytes = 0
+                return
+            entry = self._cache.pop(url, None)
+            if entry is not None:
+                self._cache_bytes -= entry.size
+
+
+default_fetcher = RemoteFetcher()
+
+
+def fetch(url, fetcher=None):
+    """Fetch ``url`` through ``fetcher`` (the shared default fetcher if None)."""
+    return (fetcher or default_fetcher).fetch(url)
@@ -0,0 +1,228 @@
+"""Server-side aggregation of the performance metrics reported by viewers.
+
+With ``collect_metrics=True`` the component reports batches of timings,
+counters and gauges through its ``metrics`` prop. Passing those batches to
+``record_metrics`` in a callback aggregates them into histograms and
+counters, which the route added with ``init_metrics`` serves in the
+Prometheus text format.
+"""
+
+import bisect
+import math
+import numbers
+import re
+import threading
+
+ROUTE_NAME = "_dash-pdf/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket bounds, in milliseconds.
+DEFAULT_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Names of the metrics reported by the component. Others are ignored, so
+# that clients cannot create arbitrary series.
+METRIC_NAMES = frozenset(
+    [
+        "annotations_rendered",
+        "document_fetch_ms",
+        "document_load_errors",
+        "document_load_ms",
+        "document_parse_ms",
+        "js_heap_bytes",
+        "page_render_ms",
+        "render_cache_bytes",
+        "set_props_bytes",
+        "set_props_calls",
+        "text_layer_ms",
+    ]
+)
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _number(value):
+    """Return ``value`` if it is a finite number, otherwise ``None``."""
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{{{}}}".format(
+        ",".join(
+            '{}="{}"'.format(
+                name,
+                str(value)
+                .replace("\\", "\\\\")
+                .replace('"', '\\"')
+                .replace("\n", "\\n"),
+            )
+            for name, value in labels
+        )
+    )
+
+
+class Histogram:
+    """Counts of observed values falling into fixed ``buckets``."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+
+    def cumulative(self):
+        """Yield ``(upper bound, observations <= bound)``, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield float("inf"), self.count
+
+
+class MetricsAggregator:
+    """Aggregate the ``metrics`` batches reported by the component.
+
+    Timings become histograms named ``<prefix>_<name>``, counters are summed
+    into ``<prefix>_<name>_total`` and gauges keep their latest value.
+    ``labels`` passed to ``record`` tell series apart, e.g. by app or page.
+    Metrics not in ``metric_names`` are ignored; pass ``None`` to accept any.
+    Values that are not finite numbers are skipped, since batches come from
+    clients.
+    """
+
+    def __init__(
+        self, prefix="dash_pdf", buckets=DEFAULT_BUCKETS, metric_names=METRIC_NAMES
+    ):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.metric_names = metric_names
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def _name(self, name):
+        return "{}_{}".format(self.prefix, _INVALID_NAME.sub("_", name))
+
+    def _known(self, values):
+        return (
+            (name, value)
+            for name, value in (values or {}).items()
+            if self.metric_names is None or name in self.metric_names
+        )
+
+    def record(self, batch, labels=None):
+        """Add a batch reported through ``metrics``; ``None`` is ignored."""
+        if not batch:
+            return
+        labels = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            for name, values in self._known(batch.get("timings")):
+                if not isinstance(values, (list, tuple)):
+                    continue
+                values = [v for v in map(_number, values) if v is not None]
+                if not values:
+                    continue
+                key = (self._name(name), labels)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                for value in values:
+                    histogram.observe(float(value))
+            for name, value in self._known(batch.get("counters")):
+                value = _number(value)
+                if value is not None:
+                    key = (self._name(name) + "_total", labels)
+                    self._counters[key] = self._counters.get(key, 0) + value
+            for name, value in self._known(batch.get("gauges")):
+                value = _number(value)
+                if value is not None:
+                    self._gauges[(self._name(name), labels)] = value
+            key = (self._name("reports") + "_total", labels)
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def histogram(self, name, labels=None):
+        """Return the histogram of timing ``name``, or ``None``."""
+        with self._lock:
+            return self._histograms.get(
+                (self._name(name), tuple(sorted((labels or {}).items())))
+            )
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def collect(self):
+        """Return the aggregated metrics in the Prometheus text format."""
+        lines = []
+
+        def add_family(metric_type, series, add_samples):
+            previous = None
+            for (name, labels), value in sorted(series.items()):
+                if name != previous:
+                    lines.append("# TYPE {} {}".format(name, metric_type))
+                    previous = name
+                add_samples(name, labels, value)
+
+        def add_sample(name, labels, value):
+            lines.append(
+                "{}{} {}".format(name, _format_labels(labels), _format_value(value))
+            )
+
+        def add_histogram(name, labels, histogram):
+            for bound, count in histogram.cumulative():
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                add_sample(name + "_bucket", bucket_labels, count)
+            add_sample(name + "_sum", labels, histogram.sum)
+            add_sample(name + "_count", labels, histogram.count)
+
+        with self._lock:
+            add_family("counter", self._counters, add_sample)
+            add_family("gauge", self._gauges, add_sample)
+            add_family("histogram", self._histograms, add_histogram)
+        return "\n".join(lines) + "\n"
+
+
+default_aggregator = MetricsAggregator()
+
+
+def record_metrics(batch, labels=None, aggregator=None):
+    """Aggregate a batch from the component's ``metrics`` prop."""
+    (aggregator or default_aggregator).record(batch, labels=labels)
+
+
+def init_metrics(app, aggregator=None):
+    """Serve the aggregated metrics at ``<routes_pathname_prefix>_dash-pdf/metrics``."""
+    from flask import Response
+
+    aggregator = aggregator or default_aggregator
+
+    def serve_metrics():
+        return Response(aggregator.collect(), content_type=CONTENT_TYPE)
+
+    app.server.add_url_rule(
+        "{}{}".format(app.config.routes_pathname_prefix, ROUTE_NAME),
+        endpoint="dash_pdf_plus_metrics",
+        view_func=serve_metrics,
+        methods=["GET"],
+    )
+    return aggregator
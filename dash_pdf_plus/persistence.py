@@ -0,0 +1,339 @@
+"""Pluggable persistence for annotations, indexed by document and page.
+
+Backends store annotations per ``(doc_id, page, id)`` so a callback can load
+just the annotations for the pages a viewer is showing, and write edits back
+in bulk inside a transaction::
+
+    backend = SQLiteBackend("annotations.db")
+
+    @app.callback(
+        Output("pdf-viewer", "annotations"), Input("pdf-viewer", "page_number")
+    )
+    def load_page(page):
+        return backend.get_annotations(DOC_ID, pages=[page])
+
+    @app.callback(
+        Output("status", "children"), Input("pdf-viewer", "annotation_changes")
+    )
+    def save(changes):
+        backend.apply_changes(DOC_ID, changes)
+"""
+
+import abc
+import json
+import threading
+from contextlib import contextmanager
+
+from .annotations import VersionConflict, new_changes, resolve_change
+
+
+class AnnotationBackend(abc.ABC):
+    """Base class for annotation storage backends.
+
+    Subclasses implement ``transaction``, ``get``, ``get_annotations``,
+    ``upsert``, ``delete``, ``get_last_seq`` and ``set_last_seq``;
+    ``apply_changes`` is built on top of them.
+    """
+
+    @abc.abstractmethod
+    def transaction(self):
+        """Context manager grouping writes; rolled back on an exception."""
+
+    @abc.abstractmethod
+    def get(self, doc_id, annotation_id):
+        """Return one annotation, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def get_annotations(self, doc_id, pages=None):
+        """Return the annotations of ``doc_id``, optionally only on ``pages``."""
+
+    @abc.abstractmethod
+    def upsert(self, doc_id, annotations):
+        """Insert or replace ``annotations`` in one transaction."""
+
+    @abc.abstractmethod
+    def delete(self, doc_id, annotation_ids):
+        """Delete the annotations with ``annotation_ids`` in one transaction."""
+
+    @abc.abstractmethod
+    def get_last_seq(self, doc_id):
+        """Return the last applied ``seq`` of each session of ``doc_id``."""
+
+    @abc.abstractmethod
+    def set_last_seq(self, doc_id, last_seq):
+        """Record the last applied ``seq`` of the sessions in ``last_seq``."""
+
+    def apply_changes(self, doc_id, changes):
+        """Apply ``annotation_changes`` deltas and return the conflicting ones.
+
+        Deltas already applied for their session are skipped. All accepted
+        deltas are written in a single transaction, together with the last
+        applied ``seq`` of each session, so a failed transaction leaves them
+        to be applied again and other processes skip them too.
+        """
+        conflicts = []
+        with self.transaction():
+            last_seq = self.get_last_seq(doc_id)
+            applied = dict(last_seq)
+            resolved = {}
+            for change in new_changes(changes, last_seq):
+                annotation_id = change["id"]
+                current = (
+                    resolved[annotation_id]
+                    if annotation_id in resolved
+                    else self.get(doc_id, annotation_id)
+                )
+                try:
+                    resolved[annotation_id] = resolve_change(change, current)
+                except VersionConflict:
+                    conflicts.append(change)
+            self.upsert(doc_id, [a for a in resolved.values() if a is not None])
+            self.delete(doc_id, [i for i, a in resolved.items() if a is None])
+            self.set_last_seq(
+                doc_id,
+                {
+                    session: seq
+                    for session, seq in last_seq.items()
+                    if applied.get(session) != seq
+                },
+            )
+        return conflicts
+
+
+class MemoryBackend(AnnotationBackend):
+    """Keeps annotations in process memory, bucketed by document and page.
+
+    Writes inside a transaction are recorded in an undo log, so rolling back
+    only touches what the transaction changed.
+    """
+
+    def __init__(self):
+        # doc_id -> page -> id -> annotation
+        self._pages = {}
+        # doc_id -> id -> page
+        self._locations = {}
+        # doc_id -> session -> seq
+        self._last_seq = {}
+        self._lock = threading.RLock()
+        # Undo callbacks of the open transaction, None outside of one
+        self._undo = None
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            outermost = self._undo is None
+            if outermost:
+                self._undo = []
+            try:
+                yield
+            except BaseException:
+                if outermost:
+                    for undo in reversed(self._undo):
+                        undo()
+                raise
+            finally:
+                if outermost:
+                    self._undo = None
+
+    def _put(self, doc_id, annotation_id, page, annotation):
+        # Move or remove one annotation, recording how to put it back
+        doc_pages = self._pages.setdefault(doc_id, {})
+        locations = self._locations.setdefault(doc_id, {})
+        if annotation_id in locations:
+            previous_page = locations[annotation_id]
+            previous = doc_pages[previous_page].pop(annotation_id)
+            del locations[annotation_id]
+        else:
+            previous_page = previous = None
+        if annotation is not None:
+            doc_pages.setdefault(page, {})[annotation_id] = annotation
+            locations[annotation_id] = page
+        self._undo.append(
+            lambda: self._put(doc_id, annotation_id, previous_page, previous)
+        )
+
+    def get(self, doc_id, annotation_id):
+        with self._lock:
+            locations = self._locations.get(doc_id, {})
+            if annotation_id not in locations:
+                return None
+            page = locations[annotation_id]
+            return dict(self._pages[doc_id][page][annotation_id])
+
+    def get_annotations(self, doc_id, pages=None):
+        with self._lock:
+            doc_pages = self._pages.get(doc_id, {})
+            if pages is None:
+                pages = sorted(doc_pages, key=lambda p: (p is None, p))
+            return [
+                dict(annotation)
+                for page in pages
+                for annotation in doc_pages.get(page, {}).values()
+            ]
+
+    def upsert(self, doc_id, annotations):
+        with self.transaction():
+            for annotation in annotations:
+                self._put(
+                    doc_id, annotation["id"], annotation.get("page"), dict(annotation)
+                )
+
+    def delete(self, doc_id, annotation_ids):
+        with self.transaction():
+            locations = self._locations.get(doc_id, {})
+            for annotation_id in annotation_ids:
+                if annotation_id in locations:
+                    self._put(doc_id, annotation_id, None, None)
+
+    def get_last_seq(self, doc_id):
+        with self._lock:
+            return dict(self._last_seq.get(doc_id, {}))
+
+    def set_last_seq(self, doc_id, last_seq):
+        with self.transaction():
+            seqs = self._last_seq.setdefault(doc_id, {})
+            previous = {session: seqs.get(session) for session in last_seq}
+            seqs.update(last_seq)
+            self._undo.append(lambda: self._restore_seqs(seqs, previous))
+
+    @staticmethod
+    def _restore_seqs(seqs, previous):
+        for session, seq in previous.items():
+            if seq is None:
+                seqs.pop(session, None)
+            else:
+                seqs[session] = seq
+
+
+class SQLiteBackend(AnnotationBackend):
+    """Stores annotations in a SQLite database.
+
+    Annotations are stored as JSON with their document, page, id and version
+    in indexed columns. A single connection is shared between threads and
+    guarded by a lock; the database uses write-ahead logging so other
+    processes can read while a transaction is being written.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS annotations (
+            doc_id TEXT NOT NULL,
+            id TEXT NOT NULL,
+            page INTEGER,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at TEXT,
+            data TEXT NOT NULL,
+            PRIMARY KEY (doc_id, id)
+        );
+        CREATE INDEX IF NOT EXISTS annotations_page
+            ON annotations (doc_id, page, id);
+        CREATE TABLE IF NOT EXISTS change_sessions (
+            doc_id TEXT NOT NULL,
+            session TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            PRIMARY KEY (doc_id, session)
+        );
+    """
+
+    def __init__(self, path=":memory:"):
+        import sqlite3
+
+        self.path = path
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.RLock()
+        self._depth = 0
+        with self._lock:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            outermost = self._depth == 0
+            if outermost:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._connection
+            except BaseException:
+                self._depth -= 1
+                if outermost:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outermost:
+                self._connection.execute("COMMIT")
+
+    def get(self, doc_id, annotation_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM annotations WHERE doc_id = ? AND id = ?",
+                (doc_id, annotation_id),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get_annotations(self, doc_id, pages=None):
+        with self._lock:
+            if pages is None:
+                rows = self._connection.execute(
+                    "SELECT data FROM annotations WHERE doc_id = ? ORDER BY page, id",
+                    (doc_id,),
+                ).fetchall()
+            else:
+                pages = list(pages)
+                rows = self._connection.execute(
+                    "SELECT data FROM annotations WHERE doc_id = ? AND page IN ({}) "
+                    "ORDER BY page, id".format(", ".join("?" * len(pages))),
+                    (doc_id, *pages),
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def upsert(self, doc_id, annotations):
+        rows = [
+            (
+                doc_id,
+                annotation["id"],
+                annotation.get("page"),
+                annotation.get("version", 1),
+                annotation.get("updated_at"),
+                json.dumps(annotation),
+            )
+            for annotation in annotations
+        ]
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO annotations "
+                "(doc_id, id, page, version, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete(self, doc_id, annotation_ids):
+        with self.transaction() as connection:
+            connection.executemany(
+                "DELETE FROM annotations WHERE doc_id = ? AND id = ?",
+                [(doc_id, annotation_id) for annotation_id in annotation_ids],
+            )
+
+    # Deltas without a session are recorded under the empty string
+    def get_last_seq(self, doc_id):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT session, seq FROM change_sessions WHERE doc_id = ?",
+                (doc_id,),
+            ).fetchall()
+        return {session or None: seq for session, seq in rows}
+
+    def set_last_seq(self, doc_id, last_seq):
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO change_sessions (doc_id, session, seq) "
+                "VALUES (?, ?, ?)",
+                [(doc_id, session or "", seq) for session, seq in last_seq.items()],
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,373 @@
+"""Rendering PDF pages to images on the server.
+
+Pages are rasterized in a pool of worker processes and written to a disk
+cache keyed by document content hash, page, scale and format, so each image
+is only rendered once. ``init_app`` serves the images of registered
+documents, which is what the component's ``thumbnails`` strip loads::
+
+    renderer = PageRenderer()
+    paths = renderer.render_pages(pdf_bytes, pages=range(1, 11), scale=0.25)
+
+The same is available from the command line::
+
+    dash-pdf-render document.pdf --pages 1-10 --scale 0.25 --output thumbs/
+
+Rendering uses ``pypdfium2`` and ``Pillow``, installed with ``pip install
+dash-pdf-plus[render]``.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .text import _read_source, content_hash
+
+# format -> (Pillow format, mimetype)
+FORMATS = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+}
+MAX_SCALE = 4.0
+# Scale of the images in the component's thumbnail strip
+THUMBNAIL_SCALE = 0.2
+# Scales served by the page image route; other requested scales are rounded
+# to the nearest one, so clients can't have arbitrary many images rendered
+SCALE_STEP = 0.25
+SERVED_SCALES = (THUMBNAIL_SCALE,) + tuple(
+    step * SCALE_STEP for step in range(1, int(MAX_SCALE / SCALE_STEP) + 1)
+)
+# Default bound on the size of the rendered images kept on disk
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+# Name of the copies of in-memory documents in the cache
+SOURCE_NAME = "source.pdf"
+
+# Documents kept open in each worker process, by path
+_WORKER_DOCUMENTS = 4
+_worker_documents = OrderedDict()
+
+
+def _import_pdfium():
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise ImportError(
+            "page rendering requires pypdfium2 and Pillow; install them with "
+            "`pip install dash-pdf-plus[render]`"
+        ) from e
+    return pypdfium2
+
+
+def _open_document(path):
+    document = _worker_documents.pop(path, None)
+    if document is None:
+        document = _import_pdfium().PdfDocument(path)
+    _worker_documents[path] = document
+    while len(_worker_documents) > _WORKER_DOCUMENTS:
+        _worker_documents.popitem(last=False)[1].close()
+    return document
+
+
+def _page_count(path):
+    document = _import_pdfium().PdfDocument(path)
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+
+def _render_to_file(path, page, scale, format, target):
+    """Render one page into ``target``; runs in a worker process."""
+    image = _open_document(path)[page - 1].render(scale=scale).to_pil()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            image.save(f, format=FORMATS[format][0])
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return target
+
+
+def _check_format(format):
+    if format not in FORMATS:
+        raise ValueError(
+            "unsupported image format {!r}, expected one of {}".format(
+                format, ", ".join(FORMATS)
+            )
+        )
+
+
+class PageRenderer:
+    """Renders pages in a process pool and caches the images on disk.
+
+    Images are stored under ``cache_dir`` (a directory under the system temp
+    dir by default) as ``<content hash>/<page>@<scale>.<format>``. In-memory
+    documents are written next to them once so workers can open them by
+    path. ``max_workers`` defaults to the number of CPUs. Requests for an
+    image that is already being rendered share the render.
+
+    The images and document copies take up at most ``max_cache_bytes`` on
+    disk (None for no limit); the least recently used ones are deleted
+    first, and a deleted copy is written again when the document is next
+    rendered.
+    """
+
+    def __init__(
+        self, cache_dir=None, max_workers=None, max_cache_bytes=DEFAULT_CACHE_BYTES
+    ):
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), "dash-pdf-pages")
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_cache_bytes = max_cache_bytes
+        # path -> size of the cached files, least recently used first
+        self._images = None
+        self._image_bytes = 0
+        self._executor = None
+        self._inflight = {}
+        self._page_counts = {}
+        self._path_hashes = {}
+        self._lock = threading.RLock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Forking a threaded server process is unsafe, so workers are
+                # always spawned
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _source(self, source, doc_hash=None):
+        """Return the path and content hash of ``source``."""
+        if isinstance(source, (str, os.PathLike)):
+            path = os.path.abspath(os.fspath(source))
+            if doc_hash is None:
+                stat = os.stat(path)
+                key = (path, stat.st_size, stat.st_mtime_ns)
+                doc_hash = self._path_hashes.get(key)
+                if doc_hash is None:
+                    doc_hash = self._path_hashes[key] = content_hash(_read_source(path))
+            return path, doc_hash
+
+        content = _read_source(source)
+        doc_hash = doc_hash or content_hash(content)
+        path = self._source_copy(doc_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        self._touch([path])
+        return path, doc_hash
+
+    def _source_copy(self, doc_hash):
+        return os.path.join(self.cache_dir, doc_hash, SOURCE_NAME)
+
+    def page_count(self, source, doc_hash=None):
+        path, doc_hash = self._source(source, doc_hash)
+        count = self._page_counts.get(doc_hash)
+        if count is None:
+            count = self._page_counts[doc_hash] = _page_count(path)
+        return count
+
+    def render_pages(self, source, pages=None, scale=1.0, format="png", doc_hash=None):
+        """Render ``pages`` (all by default) and return ``{page: path}``.
+
+        ``source`` is PDF bytes or a file path; ``doc_hash`` can be passed
+        to skip hashing the content when it is already known.
+        """
+        _check_format(format)
+        if not 0 < scale <= MAX_SCALE:
+            raise ValueError("scale must be in (0, {}]".format(MAX_SCALE))
+        path, doc_hash = self._source(source, doc_hash)
+        count = self.page_count(path, doc_hash)
+        pages = range(1, count + 1) if pages is None else list(pages)
+        for page in pages:
+            if not 1 <= page <= count:
+                raise IndexError(
+                    "page {} out of range for a {}-page document".format(
+                        page, count
+                    )
+                )
+
+        directory = os.path.join(self.cache_dir, doc_hash)
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        futures = {}
+        for page in pages:
+            target = os.path.join(directory, "{}@{:g}.{}".format(page, scale, format))
+            if os.path.exists(target):
+                paths[page] = target
+                continue
+            with self._lock:
+                future = self._inflight.get(target)
+                if future is None:
+                    future = self._inflight[target] = self._pool().submit(
+                        _render_to_file, path, page, scale, format, target
+                    )
+                    future.add_done_callback(
+                        lambda _, target=target: self._done(target)
+                    )
+            futures[page] = future
+        for page, future in futures.items():
+            paths[page] = future.result()
+        touched = list(paths.values())
+        if path == self._source_copy(doc_hash):
+            touched.append(path)
+        self._touch(touched)
+        return {page: paths[page] for page in pages}
+
+    def _done(self, target):
+        with self._lock:
+            self._inflight.pop(target, None)
+
+    def _cached_images(self):
+        """Images and document copies in the cache directory, oldest first."""
+        found = []
+        for directory, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                if "@" not in name and name != SOURCE_NAME:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, path, stat.st_size))
+        return OrderedDict((path, size) for _, path, size in sorted(found))
+
+    def _touch(self, paths):
+        """Mark cached files as used and evict the least recently used ones."""
+        paths = set(paths)
+        with self._lock:
+            if self._images is None:
+                self._images = self._cached_images()
+                self._image_bytes = sum(self._images.values())
+            images = self._images
+            for path in paths:
+                if path in images:
+                    images.move_to_end(path)
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                images[path] = size
+                self._image_bytes += size
+            if self.max_cache_bytes is None:
+                return
+            while self._image_bytes > self.max_cache_bytes:
+                path = next(iter(images))
+                # Never delete the files being returned, or a document copy
+                # that pages are being rendered from
+                if path in paths or self._rendering_from(path):
+                    break
+                self._image_bytes -= images.pop(path)
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def _rendering_from(self, path):
+        if os.path.basename(path) != SOURCE_NAME:
+            return False
+        directory = os.path.dirname(path)
+        return any(os.path.dirname(target) == directory for target in self._inflight)
+
+    def render_page(self, source, page, scale=1.0, format="png", doc_hash=None):
+        """Render one page and return the image bytes."""
+        path = self.render_pages(
+            source, [page], scale=scale, format=format, doc_hash=doc_hash
+        )[page]
+        with open(path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+default_renderer = PageRenderer()
+
+
+def render_pages(source, pages=None, scale=1.0, format="png", renderer=None):
+    """Render pages of ``source`` with ``renderer`` and return their paths."""
+    return (renderer or default_renderer).render_pages(
+        source, pages=pages, scale=scale, format=format
+    )
+
+
+def _send_page_image(entry, page, format, renderer=None):
+    from flask import abort, request, send_file
+
+    if format not in FORMATS:
+        abort(404)
+    scale = request.args.get("scale", 1.0, type=float)
+    if not 0 < scale <= MAX_SCALE:
+        abort(400)
+    scale = min(SERVED_SCALES, key=lambda served: abs(served - scale))
+    source = entry.content if entry.content is not None else entry.path
+    try:
+        path = (renderer or default_renderer).render_pages(
+            source, [page], scale=scale, format=format, doc_hash=entry.content_hash
+        )[page]
+    except IndexError:
+        abort(404)
+    return send_file(path, mimetype=FORMATS[format][1], max_age=3600)
+
+
+def _parse_pages(value):
+    pages = []
+    for part in value.split(","):
+        first, _, last = part.partition("-")
+        pages.extend(range(int(first), int(last or first) + 1))
+    return pages
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="dash-pdf-render", description="Render PDF pages to images."
+    )
+    parser.add_argument("document", help="path of the PDF to render")
+    parser.add_argument(
+        "--pages", type=_parse_pages, help="pages to render, e.g. 1-5,8 (default: all)"
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="png")
+    parser.add_argument("--output", default=".", help="output directory")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--cache-dir", help="image cache directory")
+    args = parser.parse_args(argv)
+
+    renderer = PageRenderer(cache_dir=args.cache_dir, max_workers=args.workers)
+    try:
+        paths = renderer.render_pages(
+            args.document, pages=args.pages, scale=args.scale, format=args.format
+        )
+    finally:
+        renderer.close()
+    os.makedirs(args.output, exist_ok=True)
+    for page, path in paths.items():
+        target = os.path.join(args.output, "page-{}.{}".format(page, args.format))
+        shutil.copyfile(path, target)
+        print(target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Live annotation sync between viewers of the same document.
+
+With ``init_sync(app)`` and ``sync=True`` on ``DashPDF``, viewers post their
+annotation edits to the server in small batches. The server checks each
+edit against the annotation ``version``, keeps the result in an
+``AnnotationStore`` per document and broadcasts it to the other viewers of
+the document over server-sent events, so no viewer has to poll or send the
+full annotation list.
+
+Conflicting edits (made against an older version) are resolved by
+``updated_at``: the later edit wins. Broadcasts go through a broker with a
+Redis-like ``publish``/``subscribe`` interface; ``LocalBroker`` serves a
+single server process.
+"""
+
+import json
+import queue
+import threading
+import time
+
+from .annotations import AnnotationStore, VersionConflict, resolve_change
+
+ROUTE_NAME = "_dash-pdf/sync"
+
+# Seconds between keep-alive comments on idle event streams
+HEARTBEAT_INTERVAL = 15
+
+# Messages queued for a subscriber that stopped reading are dropped
+MAX_QUEUED_MESSAGES = 1000
+
+# Seconds after which the annotations of a document nobody is viewing are
+# dropped
+STORE_IDLE_TIMEOUT = 600
+
+CHANGE_OPS = ("add", "update", "delete")
+
+
+class Subscription:
+    """Messages published to ``channel`` since subscribing."""
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(MAX_QUEUED_MESSAGES)
+
+    def put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            pass
+
+    def get(self, timeout=None):
+        """Return the next message, or None after ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process publish/subscribe of string messages, standing in for Redis."""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        """Send ``message`` to the subscribers of ``channel``; return their count."""
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
+        return len(subscriptions)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._channels[subscription.channel]
+
+
+def check_change(change):
+    """Raise ``ValueError`` unless ``change`` is a well-formed sync change."""
+    if not isinstance(change, dict):
+        raise ValueError("a change must be an object")
+    if not isinstance(change.get("id"), str):
+        raise ValueError("a change needs a string id")
+    if change.get("op") not in CHANGE_OPS:
+        raise ValueError("unknown change op {!r}".format(change.get("op")))
+    version = change.get("version")
+    if version is not None and type(version) is not int:
+        raise ValueError("version must be an integer")
+    if change["op"] != "delete":
+        if not isinstance(change.get("patch"), dict):
+            raise ValueError("{} needs a patch object".format(change["op"]))
+        if not isinstance(change.get("annotation") or {}, dict):
+            raise ValueError("annotation must be an object")
+    if not isinstance(change.get("updated_at") or "", str):
+        raise ValueError("updated_at must be a string")
+
+
+def _is_newer(change, current):
+    """Whether ``change`` was made after ``current`` was last updated."""
+    updated_at = change.get("updated_at")
+    return bool(updated_at) and updated_at > (current.get("updated_at") or "")
+
+
+def resolve_sync_change(change, current):
+    """Resolve an edit posted by a viewer against the server's ``current``.
+
+    Besides the delta fields, sync changes carry the edited ``annotation``
+    in full and its ``updated_at``. Updates of annotations the server has
+    not seen (e.g. ones passed to the viewer through props) are taken as
+    they are, and conflicting edits made after ``current`` win, with the
+    version bumped past it. Older conflicting edits raise ``VersionConflict``.
+    """
+    if current is None and change["op"] == "update" and change.get("annotation"):
+        return dict(change["annotation"])
+    try:
+        return resolve_change(change, current)
+    except VersionConflict:
+        if current is None or not _is_newer(change, current):
+            raise
+    if change["op"] == "delete":
+        return None
+    annotation = change.get("annotation") or {**current, **change["patch"]}
+    return {**annotation, "version": current.get("version", 1) + 1}
+
+
+class SyncHub:
+    """Annotations of synced documents and the viewers subscribed to them.
+
+    Documents are identified by the viewer's ``doc_key``, or the pdf.js
+    fingerprint of the document when it has none. The annotations of a
+    document are dropped once it has had no subscribers for ``idle_timeout``
+    seconds.
+    """
+
+    def __init__(self, broker=None, idle_timeout=STORE_IDLE_TIMEOUT):
+        self.broker = broker or LocalBroker()
+        self.url_prefix = "/{}".format(ROUTE_NAME)
+        self.idle_timeout = idle_timeout
+        self._stores = {}
+        # doc_key -> number of subscribers
+        self._subscribers = {}
+        # doc_key -> time the store was last used
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    def _channel(self, doc_key):
+        return "dash-pdf:{}".format(doc_key)
+
+    def _drop_idle_stores(self, now):
+        for doc_key, last_used in list(self._last_used.items()):
+            if (
+                not self._subscribers.get(doc_key)
+                and now - last_used > self.idle_timeout
+            ):
+                del self._stores[doc_key]
+                del self._last_used[doc_key]
+
+    def store(self, doc_key, annotations=()):
+        """Return the ``AnnotationStore`` of ``doc_key``.
+
+        ``annotations`` seed the store when it is created.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._drop_idle_stores(now)
+            store = self._stores.get(doc_key)
+            if store is None:
+                store = self._stores[doc_key] = AnnotationStore(annotations)
+            self._last_used[doc_key] = now
+            return store
+
+    def apply(self, doc_key, session, changes):
+        """Apply edits posted by viewer ``session`` and broadcast the result.
+
+        Returns the resulting state of each edited annotation as
+        ``{"id", "annotation"}``, with ``annotation`` None once deleted.
+        Rejected edits are not broadcast; their state is the annotation as
+        the server has it, marked ``"rejected": True``. Raises
+        ``ValueError``, before applying anything, if a change is malformed.
+        """
+        for change in changes:
+            check_change(change)
+        store = self.store(doc_key)
+        results = []
+        accepted = []
+        for change in changes:
+            try:
+                annotation = store.apply_change(change, resolve=resolve_sync_change)
+            except VersionConflict:
+                state = {"id": change["id"], "annotation": store.get(change["id"])}
+                results.append({**state, "rejected": True})
+            else:
+                state = {"id": change["id"], "annotation": annotation}
+                results.append(state)
+                accepted.append(state)
+        if accepted:
+            self.publish(doc_key, {"session": session, "changes": accepted})
+        return results
+
+    def publish(self, doc_key, message):
+        """Broadcast ``message`` to the viewers of ``doc_key``."""
+        return self.broker.publish(self._channel(doc_key), json.dumps(message))
+
+    def subscribe(self, doc_key):
+        """Subscribe to the broadcasts for ``doc_key``.
+
+        The first message is a snapshot of the annotations in the store.
+        """
+        subscription = self.broker.subscribe(self._channel(doc_key))
+        with self._lock:
+            self._subscribers[doc_key] = self._subscribers.get(doc_key, 0) + 1
+        snapshot = [
+            {"id": annotation["id"], "annotation": annotation}
+            for annotation in self.store(doc_key).annotations()
+        ]
+        subscription.put(json.dumps({"session": None, "changes": snapshot}))
+        return subscription
+
+    def unsubscribe(self, doc_key, subscription):
+        subscription.close()
+        with self._lock:
+            count = self._subscribers.get(doc_key, 0) - 1
+            if count > 0:
+                self._subscribers[doc_key] = count
+            else:
+                self._subscribers.pop(doc_key, None)
+                if doc_key in self._last_used:
+                    self._last_used[doc_key] = time.monotonic()
+
+
+default_hub = SyncHub()
+
+
+def _event_stream(hub, doc_key):
+    subscription = hub.subscribe(doc_key)
+    try:
+        while True:
+            message = subscription.get(timeout=HEARTBEAT_INTERVAL)
+            if message is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield "data: {}\n\n".format(message)
+    finally:
+        hub.unsubscribe(doc_key, subscription)
+
+
+def init_sync(app, hub=None):
+    """Add the annotation sync routes to a Dash app's Flask server.
+
+    Viewers post their edits to ``<routes_pathname_prefix>_dash-pdf/sync/<doc_key>``
+    and receive those of other viewers from ``.../<doc_key>/events``.
+    """
+    from flask import Response, abort, jsonify, request
+
+    hub = hub or default_hub
+    hub.url_prefix = "{}{}".format(app.config.requests_pathname_prefix, ROUTE_NAME)
+    route = "{}{}/<path:doc_key>".format(app.config.routes_pathname_prefix, ROUTE_NAME)
+
+    def post_changes(doc_key):
+        body = request.get_json(silent=True)
+        if (
+            not isinstance(body, dict)
+            or not isinstance(body.get("changes"), list)
+            or not isinstance(body.get("session") or "", str)
+        ):
+            abort(400)
+        try:
+            results = hub.apply(doc_key, body.get("session"), body["changes"])
+        except ValueError as e:
+            abort(400, description=str(e))
+        return jsonify({"changes": results})
+
+    def stream_events(doc_key):
+        return Response(
+            _event_stream(hub, doc_key),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    app.server.add_url_rule(
+        route,
+        endpoint="dash_pdf_plus_sync",
+        view_func=post_changes,
+        methods=["POST"],
+    )
+    app.server.add_url_rule(
+        route + "/events",
+        endpoint="dash_pdf_plus_sync_events",
+        view_func=stream_events,
+        methods=["GET"],
+    )
+    return hub
@@ -0,0 +1,359 @@
+"""Server-side text and layout extraction for PDFs.
+
+A document is parsed once into per-page text runs (words with their bounding
+boxes) in the coordinate space of the component at scale 1.0: points from the
+top-left corner of the page. The result is cached in memory and on disk, keyed
+by a hash of the document content, so callbacks can look up the text under
+annotations without a browser::
+
+    annotations = dash_pdf_plus.fill_selected_text(pdf_bytes, annotations)
+
+Extraction uses ``pdfminer.six``, installed with ``pip install
+dash-pdf-plus[text]``.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bumped whenever the layout or meaning of the cached files changes
+CACHE_FORMAT = 2
+CELL_SIZE = 64
+
+# Annotation types whose rectangle covers text
+TEXT_ANNOTATION_TYPES = ("rectangle", "highlight")
+
+
+def _read_source(source):
+    """Return the bytes of ``source`` (bytes or a file path)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    raise TypeError(
+        "expected bytes or a file path, got {}".format(type(source).__name__)
+    )
+
+
+def content_hash(content):
+    """Hash of the document bytes used as its cache key."""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _crop_box(page):
+    """Return the cropbox of ``page`` in the coordinates of its layout.
+
+    pdfminer lays pages out relative to their mediabox, while viewers (and
+    ``export``) position annotations relative to the cropbox.
+    """
+    from pdfminer.utils import apply_matrix_pt
+
+    # The transform PDFPageInterpreter.process_page applies
+    x0, y0, x1, y1 = page.mediabox
+    ctm = {
+        90: (0, -1, 1, 0, -y0, x1),
+        180: (-1, 0, 0, -1, x1, y1),
+        270: (0, 1, -1, 0, y1, -x0),
+    }.get(page.rotate, (1, 0, 0, 1, -x0, -y0))
+    left, bottom, right, top = page.cropbox
+    (ax, ay), (bx, by) = (
+        apply_matrix_pt(ctm, (left, bottom)),
+        apply_matrix_pt(ctm, (right, top)),
+    )
+    return min(ax, bx), min(ay, by), max(ax, bx), max(ay, by)
+
+
+def _page_runs(layout, box):
+    from pdfminer.layout import LTChar, LTContainer, LTTextLine
+
+    runs = []
+    box_left, _, _, box_top = box
+
+    def add_run(chars):
+        if not chars:
+            return
+        left = min(c.x0 for c in chars) - box_left
+        right = max(c.x1 for c in chars) - box_left
+        top = box_top - max(c.y1 for c in chars)
+        bottom = box_top - min(c.y0 for c in chars)
+        runs.append(
+            [
+                "".join(c.get_text() for c in chars),
+                round(left, 2),
+                round(top, 2),
+                round(right - left, 2),
+                round(bottom - top, 2),
+            ]
+        )
+
+    def walk(item):
+        if isinstance(item, LTTextLine):
+            word = []
+            for char in item:
+                if isinstance(char, LTChar) and not char.get_text().isspace():
+                    word.append(char)
+                else:
+                    add_run(word)
+                    word = []
+            add_run(word)
+        elif isinstance(item, LTContainer):
+            for child in item:
+                walk(child)
+
+    walk(layout)
+    return runs
+
+
+def extract_runs(content):
+    """Parse PDF bytes into a list of pages of ``[text, x, y, w, h]`` runs.
+
+    Positions are relative to the top left corner of each page's cropbox.
+    """
+    try:
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+    except ImportError as e:
+        raise ImportError(
+            "text extraction requires pdfminer.six; install it with "
+            "`pip install dash-pdf-plus[text]`"
+        ) from e
+    manager = PDFResourceManager()
+    device = PDFPageAggregator(manager, laparams=LAParams())
+    interpreter = PDFPageInterpreter(manager, device)
+    pages = []
+    for page in PDFPage.get_pages(io.BytesIO(content)):
+        interpreter.process_page(page)
+        pages.append(_page_runs(device.get_result(), _crop_box(page)))
+    return pages
+
+
+class DocumentText:
+    """Extracted text runs of a document, with lookups by page and region.
+
+    Pages are numbered from 1 like ``page_number``. Each run is a dict with
+    ``text``, ``x``, ``y``, ``width`` and ``height``.
+    """
+
+    def __init__(self, doc_hash, pages):
+        self.doc_hash = doc_hash
+        self._pages = pages
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def _page(self, page):
+        if not 1 <= page <= len(self._pages):
+            raise IndexError(
+                "page {} out of range for a {}-page document".format(
+                    page, len(self._pages)
+                )
+            )
+        return self._pages[page - 1]
+
+    def runs(self, page):
+        """Return the text runs of ``page`` in document order."""
+        return [
+            {"text": text, "x": x, "y": y, "width": width, "height": height}
+            for text, x, y, width, height in self._page(page)
+        ]
+
+    def text(self, page):
+        """Return the text of ``page``."""
+        return " ".join(run[0] for run in self._page(page))
+
+    def _index(self, page):
+        # Uniform grid of run positions, as built by the component's text
+        # index, so that a lookup only checks the runs near the rectangle
+        with self._lock:
+            cells = self._indexes.get(page)
+            if cells is not None:
+                return cells
+            cells = {}
+            for position, run in enumerate(self._page(page)):
+                _, x, y, width, height = run
+                for cell in _cells(x, y, x + width, y + height):
+                    cells.setdefault(cell, []).append(position)
+            self._indexes[page] = cells
+            return cells
+
+    def text_in_rect(self, page, x, y, width, height):
+        """Text of the runs overlapping a rectangle, joined in document order.
+
+        Matches the text the component stores in ``selected_text``.
+        """
+        left, right = sorted((x, x + width))
+        top, bottom = sorted((y, y + height))
+        cells = self._index(page)
+        runs = self._page(page)
+        candidates = set()
+        for cell in _cells(left, top, right, bottom):
+            candidates.update(cells.get(cell, ()))
+        return " ".join(
+            runs[position][0]
+            for position in sorted(candidates)
+            if not (
+                runs[position][1] + runs[position][3] < left
+                or runs[position][1] > right
+                or runs[position][2] + runs[position][4] < top
+                or runs[position][2] > bottom
+            )
+        ).strip()
+
+    def to_json(self):
+        return {
+            "format": CACHE_FORMAT,
+            "hash": self.doc_hash,
+            "pages": self._pages,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get("format") != CACHE_FORMAT:
+            raise ValueError(
+                "unsupported cache format {!r}".format(data.get("format"))
+            )
+        return cls(data["hash"], data["pages"])
+
+
+def _cells(left, top, right, bottom):
+    for column in range(int(left // CELL_SIZE), int(right // CELL_SIZE) + 1):
+        for row in range(int(top // CELL_SIZE), int(bottom // CELL_SIZE) + 1):
+            yield column, row
+
+
+class TextExtractor:
+    """Extracts document text once and caches it by content hash.
+
+    Extracted documents are kept in a bounded in-memory LRU and written as
+    JSON to ``cache_dir`` (a directory under the system temp dir by default;
+    ``cache_dir=False`` disables the disk cache). Extractions of the same
+    document running at the same time share one parse.
+    """
+
+    def __init__(self, cache_dir=None, max_documents=16):
+        if cache_dir is None:
+            cache_dir = os.path.join(tempfile.gettempdir(), "dash-pdf-text")
+        self.cache_dir = cache_dir or None
+        self.max_documents = max_documents
+        self._documents = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, doc_hash):
+        return os.path.join(self.cache_dir, "{}.json".format(doc_hash))
+
+    def _load(self, doc_hash):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(doc_hash), encoding="utf-8") as f:
+                return DocumentText.from_json(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _store(self, document):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(document.to_json(), f, separators=(",", ":"))
+            os.replace(tmp_path, self._cache_path(document.doc_hash))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def extract(self, source):
+        """Return the ``DocumentText`` of ``source`` (bytes or a file path)."""
+        content = _read_source(source)
+        doc_hash = content_hash(content)
+        with self._lock:
+            document = self._documents.get(doc_hash)
+            if document is not None:
+                self._documents.move_to_end(doc_hash)
+                return document
+            event = self._inflight.get(doc_hash)
+            owner = event is None
+            if owner:
+                event = self._inflight[doc_hash] = threading.Event()
+        if not owner:
+            event.wait()
+            return self.extract(content)
+
+        try:
+            document = self._load(doc_hash)
+            if document is None:
+                document = DocumentText(doc_hash, extract_runs(content))
+                self._store(document)
+            with self._lock:
+                self._documents[doc_hash] = document
+                while len(self._documents) > self.max_documents:
+                    self._documents.popitem(last=False)
+            return document
+        finally:
+            with self._lock:
+                del self._inflight[doc_hash]
+            event.set()
+
+    def invalidate(self, source):
+        """Drop the cached text of ``source`` from memory and disk."""
+        doc_hash = content_hash(_read_source(source))
+        with self._lock:
+            self._documents.pop(doc_hash, None)
+        if self.cache_dir is not None:
+            try:
+                os.unlink(self._cache_path(doc_hash))
+            except FileNotFoundError:
+                pass
+
+
+default_extractor = TextExtractor()
+
+
+def extract_text(source, extractor=None):
+    """Return the ``DocumentText`` of ``source`` using ``extractor``."""
+    return (extractor or default_extractor).extract(source)
+
+
+def text_in_rect(doc, page, x, y, width, height, extractor=None):
+    """Return the text of ``doc`` under a rectangle on ``page``."""
+    return extract_text(doc, extractor=extractor).text_in_rect(
+        page, x, y, width, height
+    )
+
+
+def fill_selected_text(doc, annotations, overwrite=False, extractor=None):
+    """Return ``annotations`` with ``selected_text`` filled in from ``doc``.
+
+    Only rectangle and highlight annotations are filled, and unless
+    ``overwrite`` is set only those without any ``selected_text`` yet.
+    """
+    document = extract_text(doc, extractor=extractor)
+    filled = []
+    for annotation in annotations:
+        if annotation.get("type") in TEXT_ANNOTATION_TYPES and (
+            overwrite or not annotation.get("selected_text")
+        ):
+            annotation = {
+                **annotation,
+                "selected_text": document.text_in_rect(
+                    annotation.get("page") or 1,
+                    annotation["x"],
+                    annotation["y"],
+                    annotation["width"],
+                    annotation["height"],
+                ),
+            }
+        filled.append(annotation)
+    return filled
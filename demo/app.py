@@ -1,8 +1,7 @@
-import base64
+import hashlib
 import json
 
 import dash
-import requests
 from dash import Dash, Input, Output, State, html
 import dash_bootstrap_components as dbc
 
@@ -15,16 +14,20 @@ app = Dash(
 )
 server = app.server
 
+# Serve PDFs by reference from the Flask server instead of base64 data URIs
+dash_pdf_plus.init_app(app)
+
 # Default PDF URL
 DEFAULT_URL = "https://css4.pub/2015/textbook/somatosensory.pdf"
 
 
-# Function to load PDF data
+# Function to load PDF data. Documents are downloaded through the shared
+# fetcher, which caches and revalidates them, and registered under a key
+# derived from their URL, so loading a URL again replaces its entry instead
+# of adding another one.
 def load_pdf(url):
-    response = requests.get(url)
-    pdf_content = response.content
-    pdf_base64 = base64.b64encode(pdf_content).decode("utf-8")
-    return f"data:application/pdf;base64,{pdf_base64}"
+    doc_id = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return dash_pdf_plus.register_document(dash_pdf_plus.fetch(url), doc_id=doc_id)
 
 
 # App layout
@@ -220,6 +223,7 @@ app.layout = html.Div(
                     dash_pdf_plus.DashPDF(
                         id="pdf-viewer",
                         data=load_pdf(DEFAULT_URL),
+                        stream=True,
                         enable_annotations=True,
                         selected_annotation_tool="none",
                         annotations=[],
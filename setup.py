@@ -25,6 +25,14 @@ setup(
     install_requires=[
         "requests",
     ],
+    extras_require={
+        "text": ["pdfminer.six"],
+        "render": ["pypdfium2", "Pillow"],
+        "export": ["pypdf>=3.17"],
+    },
+    entry_points={
+        "console_scripts": ["dash-pdf-render=dash_pdf_plus.render:main"],
+    },
     classifiers=[
         "Framework :: Dash",
     ],
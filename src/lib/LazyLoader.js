@@ -0,0 +1,4 @@
+export default {
+    viewer: () =>
+        import(/* webpackChunkName: "viewer" */ './fragments/_DashPdf.react'),
+};
@@ -1,1484 +1,40 @@
-import React, {useState, useRef, useCallback, useEffect} from 'react';
+import React, {Suspense, useEffect} from 'react';
 import PropTypes from 'prop-types';
-import {pdfjs, Document, Page} from 'react-pdf';
+import {asyncDecorator} from '@plotly/dash-component-plugins';
 
-import 'react-pdf/dist/esm/Page/TextLayer.css';
-import './_DashPdf.react.css';
-
-// pdfjs.GlobalWorkerOptions.workerSrc = `https://unpkg.com/pdfjs-dist@${pdfjs.version}/build/pdf.worker.min.mjs`;
-pdfjs.GlobalWorkerOptions.workerSrc =
-    '/_dash-component-suites/dash_pdf_plus/pdf.worker.min.mjs';
-
-const DEFAULT_OPACITY = 0.3;
-const DISABLED_OPACITY = 0.7;
-const MIN_DRAG_DISTANCE = 10;
-const MIN_HIGHLIGHT_DISTANCE = 5;
-const TEXT_SELECTION_DELAY = 50;
-const DELETE_BUTTON_OFFSET_X = 8;
-const DELETE_BUTTON_OFFSET_Y = 8;
-const COMMENT_FONT_SIZE = 14;
-const COMMENT_MIN_WIDTH = 80;
-const MIN_RESIZE_SIZE = 20;
-
-// Annotation rendering configurations
-const ANNOTATION_STYLES = {
-    rectangle: {
-        border: '2px solid #dc2626',
-        backgroundColor: 'rgba(239, 68, 68, 0.1)',
-        selected: {
-            border: '2px solid #991b1b',
-            backgroundColor: 'rgba(185, 28, 28, 0.2)',
-        },
-    },
-    comment: {
-        backgroundColor: '#dbeafe',
-        border: '1px solid #3b82f6',
-        selected: {
-            backgroundColor: '#bfdbfe',
-            border: '2px solid #1d4ed8',
-        },
-    },
-    highlight: {
-        defaultColor: '#ffff00',
-        borderRadius: '2px',
-        selected: {
-            defaultColor: '#fbbf24',
-            border: '1px solid #d97706',
-        },
-    },
-};
-
-const DELETE_BUTTON_STYLE = {
-    position: 'absolute',
-    width: '16px',
-    height: '16px',
-    backgroundColor: '#dc2626',
-    color: 'white',
-    border: 'none',
-    borderRadius: '50%',
-    fontSize: '10px',
-    cursor: 'pointer',
-    top: '-8px',
-    right: '-8px',
-};
-
-// Delete Button Component
-const DeleteButton = ({
-    annotationId,
-    onDelete,
-    selectedAnnotationTool,
-    style = {},
-}) => {
-    if (selectedAnnotationTool === 'none') {
-        return null;
-    }
-
-    return (
-        <button
-            onClick={(e) => {
-                e.stopPropagation();
-                onDelete(annotationId);
-            }}
-            style={{...DELETE_BUTTON_STYLE, ...style}}
-        >
-            ×
-        </button>
-    );
-};
-
-DeleteButton.propTypes = {
-    annotationId: PropTypes.string.isRequired,
-    onDelete: PropTypes.func.isRequired,
-    selectedAnnotationTool: PropTypes.string.isRequired,
-    style: PropTypes.object,
-};
-
-// Rectangle Annotation Component
-const RectangleAnnotation = ({
-    annotation,
-    onDelete,
-    onUpdate,
-    onSelect,
-    selectedAnnotationTool,
-    isSelected = false,
-    scale = 1.0,
-}) => {
-    const [isDragging, setIsDragging] = useState(false);
-    const [isResizing, setIsResizing] = useState(false);
-    const [resizeHandle, setResizeHandle] = useState(null);
-    const [dragStart, setDragStart] = useState({x: 0, y: 0});
-    const [initialPosition, setInitialPosition] = useState({x: 0, y: 0});
-    const [initialSize, setInitialSize] = useState({width: 0, height: 0});
-
-    // Text extraction utility for rectangles
-    const extractTextFromRectangle = useCallback(
-        (x, y, width, height) => {
-            try {
-                const container = document.querySelector('.pdf-container');
-                const textLayer = container?.querySelector(
-                    '.react-pdf__Page__textContent'
-                );
-                if (!textLayer) {
-                    return '';
-                }
-
-                const textElements = textLayer.querySelectorAll('span');
-                const extractedTexts = [];
-
-                // Convert rectangle coordinates to absolute positions
-                const rectLeft = Math.min(x, x + width) * scale;
-                const rectTop = Math.min(y, y + height) * scale;
-                const rectRight = Math.max(x, x + width) * scale;
-                const rectBottom = Math.max(y, y + height) * scale;
-
-                textElements.forEach((span) => {
-                    const rect = span.getBoundingClientRect();
-                    const containerRect = container.getBoundingClientRect();
-
-                    // Convert to relative coordinates
-                    const spanLeft = rect.left - containerRect.left;
-                    const spanTop = rect.top - containerRect.top;
-                    const spanRight = rect.right - containerRect.left;
-                    const spanBottom = rect.bottom - containerRect.top;
-
-                    // Check if text element overlaps with rectangle
-                    const overlaps = !(
-                        spanRight < rectLeft ||
-                        spanLeft > rectRight ||
-                        spanBottom < rectTop ||
-                        spanTop > rectBottom
-                    );
-
-                    if (overlaps && span.textContent.trim()) {
-                        extractedTexts.push(span.textContent.trim());
-                    }
-                });
-
-                return extractedTexts.join(' ').trim();
-            } catch (error) {
-                console.warn('Error extracting text from rectangle:', error);
-                return '';
-            }
-        },
-        [scale]
-    );
-
-    const handleMouseDown = (e) => {
-        if (selectedAnnotationTool === 'none') {
-            if (onSelect) {
-                onSelect(annotation.id);
-            }
-            return;
-        }
-
-        e.stopPropagation();
-        setIsDragging(true);
-        setDragStart({x: e.clientX, y: e.clientY});
-        setInitialPosition({x: annotation.x, y: annotation.y});
-    };
-
-    const handleResizeStart = (e, handle) => {
-        if (selectedAnnotationTool === 'none') {
-            return;
-        }
-
-        e.stopPropagation();
-        setIsResizing(true);
-        setResizeHandle(handle);
-        setDragStart({x: e.clientX, y: e.clientY});
-        setInitialPosition({x: annotation.x, y: annotation.y});
-        setInitialSize({width: annotation.width, height: annotation.height});
-    };
-
-    const handleMouseMove = useCallback(
-        (e) => {
-            if (!isDragging && !isResizing) {
-                return;
-            }
-
-            const deltaX = (e.clientX - dragStart.x) / scale;
-            const deltaY = (e.clientY - dragStart.y) / scale;
-
-            if (isDragging) {
-                const newX = initialPosition.x + deltaX;
-                const newY = initialPosition.y + deltaY;
-
-                // Extract text at the new position
-                const extractedText = extractTextFromRectangle(
-                    newX,
-                    newY,
-                    annotation.width,
-                    annotation.height
-                );
-
-                onUpdate(annotation.id, {
-                    x: newX,
-                    y: newY,
-                    selected_text: extractedText,
-                });
-            } else if (isResizing) {
-                // Calculate current normalized bounds
-                const currentLeft = Math.min(
-                    initialPosition.x,
-                    initialPosition.x + initialSize.width
-                );
-                const currentTop = Math.min(
-                    initialPosition.y,
-                    initialPosition.y + initialSize.height
-                );
-                const currentRight = Math.max(
-                    initialPosition.x,
-                    initialPosition.x + initialSize.width
-                );
-                const currentBottom = Math.max(
-                    initialPosition.y,
-                    initialPosition.y + initialSize.height
-                );
-
-                let newLeft = currentLeft;
-                let newTop = currentTop;
-                let newRight = currentRight;
-                let newBottom = currentBottom;
-
-                switch (resizeHandle) {
-                    case 'nw':
-                        newLeft = currentLeft + deltaX;
-                        newTop = currentTop + deltaY;
-                        break;
-                    case 'ne':
-                        newRight = currentRight + deltaX;
-                        newTop = currentTop + deltaY;
-                        break;
-                    case 'sw':
-                        newLeft = currentLeft + deltaX;
-                        newBottom = currentBottom + deltaY;
-                        break;
-                    case 'se':
-                        newRight = currentRight + deltaX;
-                        newBottom = currentBottom + deltaY;
-                        break;
-                    case 'n':
-                        newTop = currentTop + deltaY;
-                        break;
-                    case 's':
-                        newBottom = currentBottom + deltaY;
-                        break;
-                    case 'w':
-                        newLeft = currentLeft + deltaX;
-                        break;
-                    case 'e':
-                        newRight = currentRight + deltaX;
-                        break;
-                    default:
-                        break;
-                }
-
-                // Calculate new dimensions
-                const newWidth = newRight - newLeft;
-                const newHeight = newBottom - newTop;
-
-                // Ensure minimum size
-                const minSize = MIN_RESIZE_SIZE / scale;
-                if (
-                    Math.abs(newWidth) >= minSize &&
-                    Math.abs(newHeight) >= minSize
-                ) {
-                    // Extract text from the new rectangle area
-                    const extractedText = extractTextFromRectangle(
-                        newLeft,
-                        newTop,
-                        newWidth,
-                        newHeight
-                    );
-
-                    onUpdate(annotation.id, {
-                        x: newLeft,
-                        y: newTop,
-                        width: newWidth,
-                        height: newHeight,
-                        selected_text: extractedText,
-                    });
-                }
-            }
-        },
-        [
-            isDragging,
-            isResizing,
-            dragStart,
-            initialPosition,
-            initialSize,
-            resizeHandle,
-            scale,
-            annotation.id,
-            annotation.width,
-            annotation.height,
-            onUpdate,
-            extractTextFromRectangle,
-        ]
-    );
-
-    const handleMouseUp = useCallback(() => {
-        setIsDragging(false);
-        setIsResizing(false);
-        setResizeHandle(null);
-    }, []);
-
-    useEffect(() => {
-        if (isDragging || isResizing) {
-            document.addEventListener('mousemove', handleMouseMove);
-            document.addEventListener('mouseup', handleMouseUp);
-            return () => {
-                document.removeEventListener('mousemove', handleMouseMove);
-                document.removeEventListener('mouseup', handleMouseUp);
-            };
-        }
-        return () => {};
-    }, [isDragging, isResizing, handleMouseMove, handleMouseUp]);
-
-    // Calculate normalized rectangle bounds for proper positioning
-    const rectLeft = Math.min(annotation.x, annotation.x + annotation.width);
-    const rectTop = Math.min(annotation.y, annotation.y + annotation.height);
-    const rectWidth = Math.abs(annotation.width);
-    const rectHeight = Math.abs(annotation.height);
-
-    // Get styles based on selection state
-    const rectangleStyle = isSelected
-        ? ANNOTATION_STYLES.rectangle.selected
-        : ANNOTATION_STYLES.rectangle;
-
-    return (
-        <div
-            className="annotation-rectangle"
-            style={{
-                position: 'absolute',
-                left: rectLeft * scale,
-                top: rectTop * scale,
-                width: rectWidth * scale,
-                height: rectHeight * scale,
-                border: rectangleStyle.border,
-                backgroundColor: rectangleStyle.backgroundColor,
-                zIndex: 5,
-                cursor:
-                    selectedAnnotationTool !== 'none'
-                        ? isDragging
-                            ? 'grabbing'
-                            : isResizing
-                            ? 'nwse-resize'
-                            : 'grab'
-                        : 'pointer',
-            }}
-            onMouseDown={handleMouseDown}
-            title={
-                annotation.selected_text
-                    ? `"${annotation.selected_text}"`
-                    : 'Rectangle annotation'
-            }
-        >
-            <DeleteButton
-                annotationId={annotation.id}
-                onDelete={onDelete}
-                selectedAnnotationTool={selectedAnnotationTool}
-                style={{
-                    top: '-8px',
-                    right: '-8px',
-                    // eslint-disable-next-line no-inline-comments
-                    zIndex: 15, // Higher than resize handles
-                }}
-            />
-
-            {/* Resize handles - only show when annotation tool is active */}
-            {selectedAnnotationTool !== 'none' && (
-                <>
-                    {/* Corner handles */}
-                    <div
-                        className="resize-handle resize-handle-nw"
-                        style={{
-                            position: 'absolute',
-                            top: '-4px',
-                            left: '-4px',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'nw-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'nw')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-ne"
-                        style={{
-                            position: 'absolute',
-                            top: '-4px',
-                            right: '-4px',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'ne-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'ne')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-sw"
-                        style={{
-                            position: 'absolute',
-                            bottom: '-4px',
-                            left: '-4px',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'sw-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'sw')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-se"
-                        style={{
-                            position: 'absolute',
-                            bottom: '-4px',
-                            right: '-4px',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'se-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'se')}
-                    />
-
-                    {/* Edge handles */}
-                    <div
-                        className="resize-handle resize-handle-n"
-                        style={{
-                            position: 'absolute',
-                            top: '-4px',
-                            left: '50%',
-                            transform: 'translateX(-50%)',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'n-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'n')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-s"
-                        style={{
-                            position: 'absolute',
-                            bottom: '-4px',
-                            left: '50%',
-                            transform: 'translateX(-50%)',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 's-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 's')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-w"
-                        style={{
-                            position: 'absolute',
-                            top: '50%',
-                            left: '-4px',
-                            transform: 'translateY(-50%)',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'w-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'w')}
-                    />
-                    <div
-                        className="resize-handle resize-handle-e"
-                        style={{
-                            position: 'absolute',
-                            top: '50%',
-                            right: '-4px',
-                            transform: 'translateY(-50%)',
-                            width: '8px',
-                            height: '8px',
-                            backgroundColor: '#3b82f6',
-                            border: '1px solid white',
-                            cursor: 'e-resize',
-                            zIndex: 10,
-                        }}
-                        onMouseDown={(e) => handleResizeStart(e, 'e')}
-                    />
-                </>
-            )}
-        </div>
-    );
-};
-
-RectangleAnnotation.propTypes = {
-    annotation: PropTypes.object.isRequired,
-    onDelete: PropTypes.func.isRequired,
-    onUpdate: PropTypes.func.isRequired,
-    onSelect: PropTypes.func,
-    selectedAnnotationTool: PropTypes.string.isRequired,
-    isSelected: PropTypes.bool,
-    scale: PropTypes.number,
-};
-
-// Comment Annotation Component
-const CommentAnnotation = ({
-    annotation,
-    onDelete,
-    onUpdate,
-    onSelect,
-    selectedAnnotationTool,
-    isSelected = false,
-    scale = 1.0,
-}) => {
-    const [isDragging, setIsDragging] = useState(false);
-    const [dragStart, setDragStart] = useState({x: 0, y: 0});
-    const [initialPosition, setInitialPosition] = useState({x: 0, y: 0});
-
-    const handleMouseDown = (e) => {
-        if (e.target.tagName === 'INPUT') {
-            return;
-        }
-
-        if (selectedAnnotationTool === 'none') {
-            if (onSelect) {
-                onSelect(annotation.id);
-            }
-            return;
-        }
-
-        e.stopPropagation();
-        setIsDragging(true);
-        setDragStart({x: e.clientX, y: e.clientY});
-        setInitialPosition({x: annotation.x, y: annotation.y});
-    };
-
-    const handleMouseMove = useCallback(
-        (e) => {
-            if (!isDragging) {
-                return;
-            }
-
-            const deltaX = (e.clientX - dragStart.x) / scale;
-            const deltaY = (e.clientY - dragStart.y) / scale;
-
-            onUpdate(annotation.id, {
-                x: initialPosition.x + deltaX,
-                y: initialPosition.y + deltaY,
-            });
-        },
-        [isDragging, dragStart, initialPosition, scale, annotation.id, onUpdate]
-    );
-
-    const handleMouseUp = useCallback(() => {
-        setIsDragging(false);
-    }, []);
-
-    useEffect(() => {
-        if (isDragging) {
-            document.addEventListener('mousemove', handleMouseMove);
-            document.addEventListener('mouseup', handleMouseUp);
-            return () => {
-                document.removeEventListener('mousemove', handleMouseMove);
-                document.removeEventListener('mouseup', handleMouseUp);
-            };
-        }
-        return () => {};
-    }, [isDragging, handleMouseMove, handleMouseUp]);
-
-    // Get styles based on selection state
-    const commentStyle = isSelected
-        ? ANNOTATION_STYLES.comment.selected
-        : ANNOTATION_STYLES.comment;
-
-    return (
-        <div
-            className="annotation-comment"
-            style={{
-                position: 'absolute',
-                left: annotation.x * scale,
-                top: annotation.y * scale,
-                zIndex: 10,
-                cursor:
-                    selectedAnnotationTool !== 'none'
-                        ? isDragging
-                            ? 'grabbing'
-                            : 'grab'
-                        : 'pointer',
-            }}
-            onMouseDown={handleMouseDown}
-        >
-            <input
-                type="text"
-                value={annotation.comment}
-                onChange={(e) =>
-                    selectedAnnotationTool !== 'none' &&
-                    onUpdate(annotation.id, {
-                        comment: e.target.value,
-                    })
-                }
-                onClick={(e) => e.stopPropagation()}
-                disabled={selectedAnnotationTool === 'none'}
-                style={{
-                    backgroundColor: commentStyle.backgroundColor,
-                    border: commentStyle.border,
-                    padding: '4px 8px',
-                    fontSize: `${COMMENT_FONT_SIZE * scale}px`,
-                    borderRadius: '4px',
-                    minWidth: `${COMMENT_MIN_WIDTH * scale}px`,
-                    cursor:
-                        selectedAnnotationTool === 'none' ? 'default' : 'text',
-                    opacity:
-                        selectedAnnotationTool === 'none'
-                            ? DISABLED_OPACITY
-                            : 1,
-                }}
-            />
-            <DeleteButton
-                annotationId={annotation.id}
-                onDelete={onDelete}
-                selectedAnnotationTool={selectedAnnotationTool}
-            />
-        </div>
-    );
-};
-
-CommentAnnotation.propTypes = {
-    annotation: PropTypes.object.isRequired,
-    onDelete: PropTypes.func.isRequired,
-    onUpdate: PropTypes.func.isRequired,
-    onSelect: PropTypes.func,
-    selectedAnnotationTool: PropTypes.string.isRequired,
-    isSelected: PropTypes.bool,
-    scale: PropTypes.number,
-};
-
-// Highlight Annotation Component
-const HighlightAnnotation = ({
-    annotation,
-    onDelete,
-    onSelect,
-    selectedAnnotationTool,
-    isSelected = false,
-    scale = 1.0,
-}) => {
-    // Get styles based on selection state
-    const highlightStyle = isSelected
-        ? ANNOTATION_STYLES.highlight.selected
-        : ANNOTATION_STYLES.highlight;
-
-    const handleClick = (e) => {
-        if (selectedAnnotationTool === 'none' && onSelect) {
-            e.stopPropagation();
-            onSelect(annotation.id);
-        }
-    };
-
-    return (
-        <div>
-            <div
-                className="annotation-highlight"
-                style={{
-                    position: 'absolute',
-                    left: annotation.x * scale,
-                    top: annotation.y * scale,
-                    width: annotation.width * scale,
-                    height: annotation.height * scale,
-                    backgroundColor:
-                        annotation.color || highlightStyle.defaultColor,
-                    opacity: annotation.opacity || DEFAULT_OPACITY,
-                    pointerEvents:
-                        selectedAnnotationTool === 'none' ? 'auto' : 'none',
-                    borderRadius: ANNOTATION_STYLES.highlight.borderRadius,
-                    border: isSelected ? highlightStyle.border : 'none',
-                    zIndex: 1,
-                    cursor:
-                        selectedAnnotationTool === 'none' ? 'pointer' : 'auto',
-                }}
-                onClick={handleClick}
-                title={
-                    annotation.selected_text
-                        ? `"${annotation.selected_text}"`
-                        : 'Highlighted text'
-                }
-            />
-            <DeleteButton
-                annotationId={annotation.id}
-                onDelete={onDelete}
-                selectedAnnotationTool={selectedAnnotationTool}
-                style={{
-                    left:
-                        (annotation.x + annotation.width) * scale -
-                        DELETE_BUTTON_OFFSET_X,
-                    top: annotation.y * scale - DELETE_BUTTON_OFFSET_Y,
-                    zIndex: 10,
-                    pointerEvents: 'auto',
-                }}
-            />
-        </div>
-    );
-};
-
-HighlightAnnotation.propTypes = {
-    annotation: PropTypes.object.isRequired,
-    onDelete: PropTypes.func.isRequired,
-    onSelect: PropTypes.func,
-    selectedAnnotationTool: PropTypes.string.isRequired,
-    isSelected: PropTypes.bool,
-    scale: PropTypes.number,
-};
-
-// Drawing Preview Component
-const DrawingPreview = ({currentAnnotation, scale = 1.0}) => {
-    if (!currentAnnotation) {
-        return null;
-    }
-
-    const dragDistance = Math.sqrt(
-        Math.pow(currentAnnotation.width, 2) +
-            Math.pow(currentAnnotation.height, 2)
-    );
-
-    const isValidDrag = dragDistance >= MIN_DRAG_DISTANCE;
-
-    // Calculate normalized bounds for proper positioning
-    const previewLeft = Math.min(
-        currentAnnotation.x,
-        currentAnnotation.x + currentAnnotation.width
-    );
-    const previewTop = Math.min(
-        currentAnnotation.y,
-        currentAnnotation.y + currentAnnotation.height
-    );
-    const previewWidth = Math.abs(currentAnnotation.width);
-    const previewHeight = Math.abs(currentAnnotation.height);
-
-    return (
-        <div
-            className="annotation-drawing"
-            style={{
-                position: 'absolute',
-                left: previewLeft * scale,
-                top: previewTop * scale,
-                width: previewWidth * scale,
-                height: previewHeight * scale,
-                border: '2px dashed',
-                backgroundColor: 'rgba(156, 163, 175, 0.1)',
-                pointerEvents: 'none',
-                zIndex: 5,
-                opacity: isValidDrag ? 1 : 0.5,
-                borderColor: isValidDrag ? '#6b7280' : '#ef4444',
-            }}
-        />
-    );
-};
-
-DrawingPreview.propTypes = {
-    currentAnnotation: PropTypes.object,
-    scale: PropTypes.number,
-};
-
-// Annotation Factory Function
-const createAnnotationComponent = (annotation, handlers, scale = 1.0) => {
-    const {
-        onDelete,
-        onUpdate,
-        onSelect,
-        selectedAnnotationTool,
-        selectedAnnotation,
-    } = handlers;
-
-    const commonProps = {
-        key: annotation.id,
-        annotation,
-        onDelete,
-        onSelect,
-        selectedAnnotationTool,
-        isSelected: annotation.id === selectedAnnotation,
-        scale,
-    };
-
-    switch (annotation.type) {
-        case 'rectangle':
-            return <RectangleAnnotation {...commonProps} onUpdate={onUpdate} />;
-        case 'comment':
-            return <CommentAnnotation {...commonProps} onUpdate={onUpdate} />;
-        case 'highlight':
-            return <HighlightAnnotation {...commonProps} />;
-        default:
-            return null;
-    }
-};
+import LazyLoader from '../LazyLoader';
+import {preloadWorker} from '../utils/worker';
 
 /**
  * _DashPdf is a component that renders a PDF with annotation capabilities.
  */
-const _DashPdf = ({
-    id,
-    data,
-    enable_annotations = false,
-    annotations = [],
-    selected_annotation_tool = 'none',
-    selected_annotation = null,
-    scale = 1.0,
-    onAnnotationAdd = null,
-    onAnnotationDelete = null,
-    onAnnotationUpdate = null,
-    page_number = 1,
-    enable_pan = true,
-    enable_zoom = true,
-    min_scale = 0.5,
-    max_scale = 3.0,
-    // eslint-disable-next-line no-magic-numbers
-    zoom_step = 0.1,
-    setProps,
-}) => {
-    // const  = props;
-
-    const [isDrawing, setIsDrawing] = useState(false);
-    const [currentAnnotation, setCurrentAnnotation] = useState(null);
-    const [isTextSelecting, setIsTextSelecting] = useState(false);
-
-    // Pan state
-    const [isPanning, setIsPanning] = useState(false);
-    const [panOffset, setPanOffset] = useState({x: 0, y: 0});
-    const [lastPanPoint, setLastPanPoint] = useState({x: 0, y: 0});
-
-    const containerRef = useRef(null);
-
-    // Check if annotation tools are active (not 'none')
-    const isAnnotationToolActive =
-        enable_annotations && selected_annotation_tool !== 'none';
-
-    // Utility functions
-    const updateProps = useCallback(
-        (updates) => {
-            if (setProps) {
-                setProps(updates);
-            }
-        },
-        [setProps]
-    );
-
-    const updateAnnotations = useCallback(
-        (newAnnotations) => {
-            updateProps({annotations: newAnnotations});
-        },
-        [updateProps]
-    );
-
-    // Generate UUID with fallback for older browsers
-    const generateUUID = useCallback(() => {
-        if (typeof crypto !== 'undefined' && crypto.randomUUID) {
-            return crypto.randomUUID();
-        }
-        // Fallback for older browsers
-        return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(
-            /[xy]/g,
-            function (c) {
-                // eslint-disable-next-line no-magic-numbers
-                const r = (Math.random() * 16) | 0;
-                // eslint-disable-next-line no-magic-numbers
-                const v = c === 'x' ? r : (r & 0x3) | 0x8;
-                // eslint-disable-next-line no-magic-numbers
-                return v.toString(16);
-            }
-        );
-    }, []);
-
-    const createAnnotation = useCallback(
-        (baseProps) => ({
-            id: `${baseProps.type}-${generateUUID()}`,
-            version: 1,
-            created_at: new Date().toISOString(),
-            updated_at: new Date().toISOString(),
-            page: page_number,
-            ...baseProps,
-        }),
-        [page_number, generateUUID]
-    );
-
-    const getRelativePosition = useCallback(
-        (e) => {
-            const rect = containerRef.current.getBoundingClientRect();
-            return {
-                x: (e.clientX - rect.left) / scale,
-                y: (e.clientY - rect.top) / scale,
-            };
-        },
-        [scale]
-    );
-
-    // Pan handlers
-    const handlePanStart = useCallback(
-        (e) => {
-            if (!enable_pan || isAnnotationToolActive) {
-                return;
-            }
-
-            setIsPanning(true);
-            setLastPanPoint({x: e.clientX, y: e.clientY});
-            e.preventDefault();
-        },
-        [enable_pan, isAnnotationToolActive]
-    );
-
-    const handlePanMove = useCallback(
-        (e) => {
-            if (!isPanning || !enable_pan) {
-                return;
-            }
-
-            const deltaX = e.clientX - lastPanPoint.x;
-            const deltaY = e.clientY - lastPanPoint.y;
-
-            setPanOffset((prev) => ({
-                x: prev.x + deltaX,
-                y: prev.y + deltaY,
-            }));
-
-            setLastPanPoint({x: e.clientX, y: e.clientY});
-            e.preventDefault();
-        },
-        [isPanning, enable_pan, lastPanPoint]
-    );
-
-    const handlePanEnd = useCallback(() => {
-        setIsPanning(false);
-    }, []);
-
-    // Zoom handler
-    const handleWheel = useCallback(
-        (e) => {
-            if (!enable_zoom) {
-                return;
-            }
-
-            e.preventDefault();
-
-            const delta = e.deltaY > 0 ? -zoom_step : zoom_step;
-            const newScale = Math.max(
-                min_scale,
-                Math.min(max_scale, scale + delta)
-            );
-
-            if (newScale !== scale) {
-                updateProps({scale: newScale});
-            }
-        },
-        [enable_zoom, scale, zoom_step, min_scale, max_scale, updateProps]
-    );
-
-    const callCallback = useCallback((callback, ...args) => {
-        if (callback && typeof callback === 'function') {
-            callback(...args);
-        }
-    }, []);
-
-    // Document load handler
-    const onDocumentLoadSuccess = useCallback(
-        ({numPages}) => {
-            updateProps({num_pages: numPages, page_number: 1});
-        },
-        [updateProps]
-    );
-
-    // Generic annotation operations
-    const addAnnotation = useCallback(
-        (annotation) => {
-            const newAnnotations = [...annotations, annotation];
-            updateAnnotations(newAnnotations);
-            callCallback(onAnnotationAdd, annotation);
-        },
-        [annotations, updateAnnotations, onAnnotationAdd, callCallback]
-    );
-
-    const deleteAnnotation = useCallback(
-        (annotationId) => {
-            const newAnnotations = annotations.filter(
-                (ann) => ann.id !== annotationId
-            );
-            updateAnnotations(newAnnotations);
-            callCallback(onAnnotationDelete, annotationId);
-        },
-        [annotations, updateAnnotations, onAnnotationDelete, callCallback]
-    );
-
-    const updateAnnotation = useCallback(
-        (annotationId, updates) => {
-            const updatesWithVersionAndTimestamp = {
-                ...updates,
-                version:
-                    (annotations.find((ann) => ann.id === annotationId)
-                        ?.version || 1) + 1,
-                updated_at: new Date().toISOString(),
-            };
-            const newAnnotations = annotations.map((ann) =>
-                ann.id === annotationId
-                    ? {...ann, ...updatesWithVersionAndTimestamp}
-                    : ann
-            );
-            updateAnnotations(newAnnotations);
-            callCallback(
-                onAnnotationUpdate,
-                annotationId,
-                updatesWithVersionAndTimestamp
-            );
-        },
-        [annotations, updateAnnotations, onAnnotationUpdate, callCallback]
-    );
-
-    // Annotation selection handler
-    const handleAnnotationSelect = useCallback(
-        (annotationId) => {
-            const newSelectedAnnotation =
-                selected_annotation === annotationId ? null : annotationId;
-            updateProps({selected_annotation: newSelectedAnnotation});
-        },
-        [selected_annotation, updateProps]
-    );
-
-    // Text selection for highlighting
-    const handleTextSelection = useCallback(() => {
-        if (
-            !isAnnotationToolActive ||
-            selected_annotation_tool !== 'highlight'
-        ) {
-            return;
-        }
-
-        const selection = window.getSelection();
-        if (!selection || selection.rangeCount === 0) {
-            return;
-        }
-
-        const range = selection.getRangeAt(0);
-        const selectedText = selection.toString().trim();
-        if (!selectedText) {
-            return;
-        }
-
-        const containerRect = containerRef.current.getBoundingClientRect();
-        const rangeRect = range.getBoundingClientRect();
-
-        const x = (rangeRect.left - containerRect.left) / scale;
-        const y = (rangeRect.top - containerRect.top) / scale;
-        const width = rangeRect.width / scale;
-        const height = rangeRect.height / scale;
-
-        if (width > MIN_HIGHLIGHT_DISTANCE && height > MIN_HIGHLIGHT_DISTANCE) {
-            const highlightAnnotation = createAnnotation({
-                type: 'highlight',
-                x,
-                y,
-                width,
-                height,
-                selected_text: selectedText,
-                color: ANNOTATION_STYLES.highlight.defaultColor,
-                opacity: DEFAULT_OPACITY,
-            });
-
-            addAnnotation(highlightAnnotation);
-            selection.removeAllRanges();
-        }
-    }, [
-        isAnnotationToolActive,
-        selected_annotation_tool,
-        createAnnotation,
-        addAnnotation,
-    ]);
-
-    // Selection change listeners
-    useEffect(() => {
-        if (
-            !isAnnotationToolActive ||
-            selected_annotation_tool !== 'highlight'
-        ) {
-            return () => {};
-        }
-
-        const handleSelectionChange = () => {
-            const selection = window.getSelection();
-            setIsTextSelecting(selection && selection.toString().length > 0);
-        };
-
-        const handleMouseUp = () => {
-            setTimeout(() => {
-                if (selected_annotation_tool === 'highlight') {
-                    handleTextSelection();
-                }
-                setIsTextSelecting(false);
-            }, TEXT_SELECTION_DELAY);
-        };
-
-        document.addEventListener('selectionchange', handleSelectionChange);
-        document.addEventListener('mouseup', handleMouseUp);
-
-        return () => {
-            document.removeEventListener(
-                'selectionchange',
-                handleSelectionChange
-            );
-            document.removeEventListener('mouseup', handleMouseUp);
-        };
-    }, [isAnnotationToolActive, selected_annotation_tool, handleTextSelection]);
-
-    // Double-click handler for comment tool
-    const handleDoubleClick = useCallback(
-        (e) => {
-            if (
-                !isAnnotationToolActive ||
-                selected_annotation_tool !== 'comment' ||
-                e.target.closest('.annotation-comment, .annotation-rectangle')
-            ) {
-                return;
-            }
-
-            const {x, y} = getRelativePosition(e);
-            const commentAnnotation = createAnnotation({
-                type: 'comment',
-                x,
-                y,
-                width: 0,
-                height: 0,
-                comment: 'Edit this text',
-            });
-            addAnnotation(commentAnnotation);
-        },
-        [
-            isAnnotationToolActive,
-            selected_annotation_tool,
-            getRelativePosition,
-            createAnnotation,
-            addAnnotation,
-        ]
-    );
-
-    // Text extraction utility for rectangles
-    const extractTextFromRectangle = useCallback(
-        (x, y, width, height) => {
-            try {
-                const textLayer = containerRef.current?.querySelector(
-                    '.react-pdf__Page__textContent'
-                );
-                if (!textLayer) {
-                    return '';
-                }
-
-                const textElements = textLayer.querySelectorAll('span');
-                const extractedTexts = [];
-
-                // Convert rectangle coordinates to absolute positions
-                const rectLeft = Math.min(x, x + width) * scale;
-                const rectTop = Math.min(y, y + height) * scale;
-                const rectRight = Math.max(x, x + width) * scale;
-                const rectBottom = Math.max(y, y + height) * scale;
-
-                textElements.forEach((span) => {
-                    const rect = span.getBoundingClientRect();
-                    const containerRect =
-                        containerRef.current.getBoundingClientRect();
-
-                    // Convert to relative coordinates
-                    const spanLeft = rect.left - containerRect.left;
-                    const spanTop = rect.top - containerRect.top;
-                    const spanRight = rect.right - containerRect.left;
-                    const spanBottom = rect.bottom - containerRect.top;
-
-                    // Check if text element overlaps with rectangle
-                    const overlaps = !(
-                        spanRight < rectLeft ||
-                        spanLeft > rectRight ||
-                        spanBottom < rectTop ||
-                        spanTop > rectBottom
-                    );
-
-                    if (overlaps && span.textContent.trim()) {
-                        extractedTexts.push(span.textContent.trim());
-                    }
-                });
-
-                return extractedTexts.join(' ').trim();
-            } catch (error) {
-                console.warn('Error extracting text from rectangle:', error);
-                return '';
-            }
-        },
-        [scale]
-    );
-
-    // Drawing handlers for rectangle tool
-    const handleMouseDown = useCallback(
-        (e) => {
-            if (
-                !isAnnotationToolActive ||
-                selected_annotation_tool === 'highlight' ||
-                selected_annotation_tool === 'none' ||
-                selected_annotation_tool === 'comment' ||
-                e.target.closest('.annotation-comment, .annotation-rectangle')
-            ) {
-                return;
-            }
-
-            const {x, y} = getRelativePosition(e);
-
-            // Handle rectangle tool with drag
-            setIsDrawing(true);
-
-            const newAnnotation = createAnnotation({
-                type: selected_annotation_tool,
-                x,
-                y,
-                width: 0,
-                height: 0,
-            });
-
-            setCurrentAnnotation(newAnnotation);
-        },
-        [
-            isAnnotationToolActive,
-            selected_annotation_tool,
-            getRelativePosition,
-            createAnnotation,
-        ]
-    );
-
-    const handleMouseMove = useCallback(
-        (e) => {
-            if (
-                !isDrawing ||
-                !currentAnnotation ||
-                selected_annotation_tool === 'highlight' ||
-                selected_annotation_tool === 'none' ||
-                selected_annotation_tool === 'comment' ||
-                isTextSelecting
-            ) {
-                return;
-            }
-
-            const {x, y} = getRelativePosition(e);
-            setCurrentAnnotation((prev) => ({
-                ...prev,
-                width: x - prev.x,
-                height: y - prev.y,
-            }));
-        },
-        [
-            isDrawing,
-            currentAnnotation,
-            selected_annotation_tool,
-            isTextSelecting,
-            getRelativePosition,
-        ]
-    );
-
-    const handleMouseUp = useCallback(() => {
-        if (
-            selected_annotation_tool === 'highlight' ||
-            selected_annotation_tool === 'none' ||
-            selected_annotation_tool === 'comment' ||
-            isTextSelecting
-        ) {
-            return;
-        }
-
-        if (isDrawing && currentAnnotation) {
-            const draggedDistance = Math.sqrt(
-                Math.pow(currentAnnotation.width, 2) +
-                    Math.pow(currentAnnotation.height, 2)
-            );
-
-            if (draggedDistance >= MIN_DRAG_DISTANCE) {
-                // Extract text from the rectangle area for rectangle annotations
-                let annotationWithText = currentAnnotation;
-                if (selected_annotation_tool === 'rectangle') {
-                    const extractedText = extractTextFromRectangle(
-                        currentAnnotation.x,
-                        currentAnnotation.y,
-                        currentAnnotation.width,
-                        currentAnnotation.height
-                    );
-                    annotationWithText = {
-                        ...currentAnnotation,
-                        selected_text: extractedText,
-                    };
-                }
-
-                addAnnotation(annotationWithText);
-            }
-
-            setCurrentAnnotation(null);
-        }
-        setIsDrawing(false);
-    }, [
-        isDrawing,
-        currentAnnotation,
-        selected_annotation_tool,
-        isTextSelecting,
-        addAnnotation,
-        extractTextFromRectangle,
-    ]);
-
-    // Get appropriate mouse handlers based on selected tool and pan state
-    const getMouseHandlers = useCallback(() => {
-        // Pan handlers take priority when no annotation tool is active
-        if (!isAnnotationToolActive && enable_pan) {
-            return {
-                onMouseDown: handlePanStart,
-                onMouseMove: handlePanMove,
-                onMouseUp: handlePanEnd,
-                onMouseLeave: handlePanEnd,
-            };
-        }
-
-        // Annotation handlers
-        if (isAnnotationToolActive && selected_annotation_tool !== 'none') {
-            switch (selected_annotation_tool) {
-                case 'highlight':
-                    return {};
-                case 'comment':
-                    return {
-                        onDoubleClick: handleDoubleClick,
-                    };
-                default:
-                    return {
-                        onMouseDown: handleMouseDown,
-                        onMouseMove: handleMouseMove,
-                        onMouseUp: handleMouseUp,
-                    };
-            }
-        }
-
-        return {};
-    }, [
-        isAnnotationToolActive,
-        enable_pan,
-        selected_annotation_tool,
-        handlePanStart,
-        handlePanMove,
-        handlePanEnd,
-        handleDoubleClick,
-        handleMouseDown,
-        handleMouseMove,
-        handleMouseUp,
-    ]);
-
-    // Filter annotations for current page
-    const currentPageAnnotations = annotations.filter(
-        (ann) => ann.page === page_number
-    );
-    const mouseHandlers = getMouseHandlers();
-
-    // Annotation handlers object
-    const annotationHandlers = {
-        onDelete: deleteAnnotation,
-        onUpdate: updateAnnotation,
-        onSelect: handleAnnotationSelect,
-        selectedAnnotationTool: selected_annotation_tool,
-        selectedAnnotation: selected_annotation,
-    };
+const _DashPdf = (props) => {
+    useEffect(preloadWorker, []);
 
     return (
-        <div id={id} className="dash-pdf-container">
-            <div style={{display: 'flex'}}>
-                <div style={{flex: 1}}>
-                    <div
-                        ref={containerRef}
-                        className={`pdf-container ${
-                            selected_annotation_tool === 'highlight'
-                                ? 'highlight-mode'
-                                : ''
-                        } ${
-                            enable_pan && !isAnnotationToolActive
-                                ? 'pan-enabled'
-                                : ''
-                        }`}
-                        style={{
-                            position: 'relative',
-                            display: 'inline-block',
-                            userSelect:
-                                selected_annotation_tool === 'highlight'
-                                    ? 'text'
-                                    : 'none',
-                            cursor: isPanning
-                                ? 'grabbing'
-                                : enable_pan && !isAnnotationToolActive
-                                ? 'grab'
-                                : selected_annotation_tool === 'none'
-                                ? 'default'
-                                : 'auto',
-                            transform: `translate(${panOffset.x}px, ${panOffset.y}px)`,
-                            transition: isPanning
-                                ? 'none'
-                                : 'transform 0.1s ease-out',
-                        }}
-                        onWheel={handleWheel}
-                        {...mouseHandlers}
-                    >
-                        <Document
-                            file={data}
-                            onLoadSuccess={onDocumentLoadSuccess}
-                            onLoadError={(error) =>
-                                console.error('Error loading PDF:', error)
-                            }
-                        >
-                            <Page
-                                pageNumber={page_number}
-                                scale={scale}
-                                renderTextLayer={true}
-                                renderAnnotationLayer={false}
-                            />
-                        </Document>
-
-                        {/* Render existing annotations */}
-                        {enable_annotations &&
-                            currentPageAnnotations.map((annotation) =>
-                                createAnnotationComponent(
-                                    annotation,
-                                    annotationHandlers,
-                                    scale
-                                )
-                            )}
-
-                        {/* Current drawing annotation preview */}
-                        {isAnnotationToolActive &&
-                            currentAnnotation &&
-                            selected_annotation_tool !== 'highlight' &&
-                            selected_annotation_tool !== 'none' &&
-                            selected_annotation_tool !== 'comment' && (
-                                <DrawingPreview
-                                    currentAnnotation={currentAnnotation}
-                                    scale={scale}
-                                />
-                            )}
-                    </div>
-                </div>
-            </div>
-        </div>
+        <Suspense fallback={null}>
+            <RealDashPdf {...props} />
+        </Suspense>
     );
 };
 
+// react-pdf and pdf.js are only loaded, as a separate chunk, once a viewer
+// is rendered, so pages of an app without a viewer do not pay for them
+const RealDashPdf = asyncDecorator(_DashPdf, LazyLoader.viewer);
+
 _DashPdf.propTypes = {
     /** Unique identifier for the component */
     id: PropTypes.string,
 
-    /** PDF data source - can be a URL string, ArrayBuffer, or Uint8Array */
+    /**
+     * PDF data source - can be a URL string, ArrayBuffer, or Uint8Array.
+     * May be left out when `doc_key` is in `stored_doc_keys`.
+     */
     data: PropTypes.oneOfType([
         PropTypes.string,
         PropTypes.instanceOf(ArrayBuffer),
         PropTypes.instanceOf(Uint8Array),
-    ]).isRequired,
+    ]),
 
     /** Callback function to update component props (used by Dash framework) */
     setProps: PropTypes.func,
@@ -1495,8 +51,23 @@ _DashPdf.propTypes = {
     /** Whether annotation functionality is enabled */
     enable_annotations: PropTypes.bool,
 
-    /** Array of annotation objects containing position, type, and content data */
-    annotations: PropTypes.arrayOf(PropTypes.object),
+    /**
+     * Array of annotation objects containing position, type, and content
+     * data, or a columnar batch of annotations built with
+     * `dash_pdf_plus.annotations.from_arrays`. Edits in the viewer always
+     * report an array.
+     */
+    annotations: PropTypes.oneOfType([
+        PropTypes.arrayOf(PropTypes.object),
+        PropTypes.shape({
+            format: PropTypes.oneOf(['dash-pdf-columnar']),
+            count: PropTypes.number,
+            decimals: PropTypes.number,
+            fields: PropTypes.object,
+            id_prefix: PropTypes.string,
+            columns: PropTypes.object,
+        }),
+    ]),
 
     /** Currently selected annotation tool type */
     selected_annotation_tool: PropTypes.oneOf([
@@ -1532,6 +103,254 @@ _DashPdf.propTypes = {
 
     /** Step size for zoom increments (default: 0.1) */
     zoom_step: PropTypes.number,
+
+    /**
+     * Page layout: 'single' shows `page_number` only, 'continuous' renders
+     * every page in a virtualized scroller that only mounts pages near the
+     * viewport and reports the current page back through `page_number`.
+     * In continuous mode the wheel scrolls and ctrl/cmd+wheel zooms; give
+     * the component's parent a height for the scroller to fill.
+     */
+    view_mode: PropTypes.oneOf(['single', 'continuous']),
+
+    /**
+     * Dragging and resizing annotations is applied locally and committed to
+     * `annotations` once on mouse up. Set this to a number of milliseconds
+     * to also commit throttled intermediate updates while dragging
+     * (default: 0, no intermediate updates)
+     */
+    live_update_interval: PropTypes.number,
+
+    /**
+     * How wheel zoom is applied. 'rerender' (default) commits `scale` on
+     * every wheel step. 'composited' scales the already rendered page with a
+     * CSS transform while the wheel moves and commits `scale` once, re-
+     * rendering sharply, after `zoom_settle_delay` ms without wheel events.
+     * The CSS scale is dropped as soon as a new `scale` comes back, or after
+     * a second if the app's callbacks don't echo the committed `scale`.
+     * Zoom is anchored at the cursor in both modes. Continuous view mode
+     * always uses 'rerender'.
+     */
+    interaction_mode: PropTypes.oneOf(['rerender', 'composited']),
+
+    /** Delay in ms after the last wheel event before a composited zoom is committed (default: 150) */
+    zoom_settle_delay: PropTypes.number,
+
+    /**
+     * Log of recent annotation edits as {seq, session, op, id, patch,
+     * version} deltas, where `op` is 'add', 'update' or 'delete' and `seq`
+     * increases monotonically within a `session`. Only the most recent
+     * deltas are kept. Set to an empty list to start recording; `None`
+     * (the default) disables the log. See `dash_pdf_plus.AnnotationStore`
+     * for applying the deltas on the server.
+     */
+    annotation_changes: PropTypes.arrayOf(
+        PropTypes.shape({
+            seq: PropTypes.number,
+            session: PropTypes.string,
+            op: PropTypes.oneOf(['add', 'update', 'delete']),
+            id: PropTypes.string,
+            patch: PropTypes.object,
+            version: PropTypes.number,
+        })
+    ),
+
+    /**
+     * Whether edits are written back to `annotations` (default: true). Set
+     * to false together with `annotation_changes` so that an edit only
+     * sends its delta instead of the full annotation list.
+     */
+    echo_annotations: PropTypes.bool,
+
+    /**
+     * Options passed to pdf.js when loading the document, e.g.
+     * `disableAutoFetch`, `disableStream` and `rangeChunkSize` for loading
+     * large documents through HTTP range requests
+     */
+    document_options: PropTypes.object,
+
+    /**
+     * Memory budget in megabytes for rendered page bitmaps (default: 64).
+     * Flipping back to a cached page shows it immediately while it
+     * re-renders. Set to 0 to disable the cache.
+     */
+    render_cache_mb: PropTypes.number,
+
+    /**
+     * Number of pages before and after the current page that are rendered
+     * into the page cache while the browser is idle (default: 1). With
+     * annotations enabled, the text of these pages is extracted as well.
+     */
+    prefetch_pages: PropTypes.number,
+
+    /**
+     * Whether to render the selectable text layer over pages (default:
+     * true). Text for rectangle annotations is taken from the extracted
+     * page text, so the text layer can be turned off to render faster; it
+     * is still rendered while the highlight tool is selected.
+     */
+    render_text_layer: PropTypes.bool,
+
+    /**
+     * Text to search for in the document. Matching is case-insensitive and
+     * hits are highlighted on the pages.
+     */
+    search_query: PropTypes.string,
+
+    /**
+     * Hits of `search_query`, each with its `page`, bounding `rect`
+     * (`x`, `y`, `width`, `height` at scale 1.0) and a text `snippet`.
+     * Updated incrementally while the document is being searched.
+     */
+    search_results: PropTypes.arrayOf(
+        PropTypes.shape({
+            page: PropTypes.number,
+            rect: PropTypes.shape({
+                x: PropTypes.number,
+                y: PropTypes.number,
+                width: PropTypes.number,
+                height: PropTypes.number,
+            }),
+            snippet: PropTypes.string,
+        })
+    ),
+
+    /**
+     * Page images shown in a thumbnail strip next to the document: either a
+     * URL template containing `{page}` or a list of URLs, one per page.
+     * `DashPDF(thumbnails=True)` fills this in with images rendered on the
+     * server.
+     */
+    thumbnails: PropTypes.oneOfType([
+        PropTypes.string,
+        PropTypes.arrayOf(PropTypes.string),
+    ]),
+
+    /**
+     * Whether to show the annotations stored in the PDF (default: false).
+     * A page's annotations are only read when the page is displayed, and
+     * are shown read-only unless an annotation with the same id is in
+     * `annotations`.
+     */
+    import_annotations: PropTypes.bool,
+
+    /**
+     * How the document at a `data` URL is loaded: 'auto' lets pdf.js fetch
+     * it, 'chunked' loads it in `chunk_size` byte chunks through HTTP Range
+     * requests, so the first page renders once the first chunks arrive.
+     * `DashPDF(stream="chunked")` serves the document for this mode.
+     */
+    transfer: PropTypes.oneOf(['auto', 'chunked']),
+
+    /**
+     * Chunk size in bytes used with `transfer='chunked'` (default: 256 KiB)
+     */
+    chunk_size: PropTypes.number,
+
+    /**
+     * Maximum number of pdf.js workers shared by all viewers on the page
+     * (default: 4). Viewers showing the same document share one parsed
+     * copy of it; different documents are spread over the workers.
+     */
+    worker_pool_size: PropTypes.number,
+
+    /**
+     * Bytes of the document loaded so far (read-only)
+     */
+    bytes_loaded: PropTypes.number,
+
+    /**
+     * Fraction of the document loaded so far, between 0 and 1, or null when
+     * the size is not known (read-only)
+     */
+    load_progress: PropTypes.number,
+
+    /**
+     * Annotations read from the PDF so far when `import_annotations` is on,
+     * converted to the annotation format with ids prefixed by `pdf-` and
+     * `imported: true`. Only pages that have been displayed are included.
+     */
+    imported_annotations: PropTypes.arrayOf(PropTypes.object),
+
+    /**
+     * Whether to collect performance metrics and report them through
+     * `metrics` (default: false)
+     */
+    collect_metrics: PropTypes.bool,
+
+    /**
+     * Interval in milliseconds at which collected metrics are reported
+     * (default: 5000)
+     */
+    metrics_interval: PropTypes.number,
+
+    /**
+     * How a page is rasterized outside continuous mode: 'page' renders it
+     * into one canvas, 'tiled' into `tile_size` pixel tiles of which only
+     * those on screen are rendered, with a low-resolution copy of the page
+     * underneath until they are. 'auto' tiles pages whose canvas would be
+     * larger than 4096x4096 device pixels, e.g. large-format drawings at
+     * high zoom. Tiles are cached per scale (in at least 64 MB).
+     */
+    render_mode: PropTypes.oneOf(['page', 'tiled', 'auto']),
+
+    /**
+     * Size in CSS pixels of the square tiles used by tiled rendering
+     * (default: 512)
+     */
+    tile_size: PropTypes.number,
+
+    /**
+     * Stable key of the document in `data`, e.g. a database id or content
+     * hash. Identifies the document in the browser cache; inline documents
+     * without one are keyed by a SHA-256 of their bytes.
+     */
+    doc_key: PropTypes.string,
+
+    /**
+     * Size in megabytes of the persistent browser cache (IndexedDB) that
+     * loaded documents are kept in, evicting the least recently used ones
+     * first. Documents stored there are reopened without being transferred
+     * again. 0 disables the cache (default: 0)
+     */
+    browser_cache_mb: PropTypes.number,
+
+    /**
+     * Keys of the documents in the browser cache (read-only). Callbacks can
+     * leave `data` out for these and only set `doc_key`.
+     */
+    stored_doc_keys: PropTypes.arrayOf(PropTypes.string),
+
+    /**
+     * Base URL of the annotation sync routes added by
+     * `dash_pdf_plus.init_sync`. When set, annotation edits are exchanged
+     * live with the other viewers of the same document (by `doc_key`, or
+     * the document fingerprint), resolving concurrent edits by `version`
+     * and `updated_at`. Edits received from other viewers are shown but
+     * never written back through `annotations` or `annotation_changes`;
+     * only this viewer's own edits are, so each edit reaches the Dash
+     * server once. `annotations` sent by a later local edit includes the
+     * remote edits merged so far.
+     */
+    sync_url: PropTypes.string,
+
+    /**
+     * Performance metrics collected since the previous report (read-only):
+     * `timings` maps names such as `document_load_ms`, `page_render_ms` and
+     * `text_layer_ms` to the durations measured, `counters` holds counts
+     * such as `set_props_calls` and `annotations_rendered` (renders of
+     * annotation components that memoization did not skip), and `gauges`
+     * memory estimates such as `render_cache_bytes`. Pass it to
+     * `dash_pdf_plus.record_metrics` to aggregate it on the server.
+     */
+    metrics: PropTypes.shape({
+        timestamp: PropTypes.number,
+        timings: PropTypes.objectOf(PropTypes.arrayOf(PropTypes.number)),
+        counters: PropTypes.objectOf(PropTypes.number),
+        gauges: PropTypes.objectOf(PropTypes.number),
+    }),
 };
 
+export const propTypes = _DashPdf.propTypes;
+
 export default _DashPdf;
@@ -0,0 +1,3310 @@
+import React, {
+    useState,
+    useRef,
+    useCallback,
+    useEffect,
+    useLayoutEffect,
+    useMemo,
+} from 'react';
+import PropTypes from 'prop-types';
+import {pdfjs, Page} from 'react-pdf';
+
+import {propTypes} from '../components/_DashPdf.react';
+
+import {buildTextIndex, queryTextIndex} from '../utils/textIndex';
+import {
+    PageBitmapCache,
+    cancelIdle,
+    capturePageBitmap,
+    pageCacheKey,
+    renderPageBitmap,
+    requestIdle,
+} from '../utils/renderCache';
+import {SearchIndex} from '../utils/searchIndex';
+import {readPageAnnotations} from '../utils/nativeAnnotations';
+import {chunkedFile, useSharedDocument} from '../utils/documentCache';
+import {hashDocument, isInlineDocument} from '../utils/contentHash';
+import {decodeAnnotations} from '../utils/columnarAnnotations';
+import {
+    AnnotationSync,
+    mergeAnnotationStates,
+    pendingSyncStates,
+} from '../utils/annotationSync';
+import {
+    canStoreDocuments,
+    getStoredDocument,
+    storeDocument,
+    storedDocumentKeys,
+} from '../utils/documentStore';
+import {MetricsCollector, heapSize, payloadSize} from '../utils/metrics';
+import {WORKER_SRC} from '../utils/worker';
+import {
+    TILED_PIXELS,
+    renderTileBitmap,
+    tileCacheKey,
+    tilesInRect,
+    underlayScale,
+    visibleRect,
+} from '../utils/tiles';
+
+import 'react-pdf/dist/esm/Page/TextLayer.css';
+import './_DashPdf.react.css';
+
+pdfjs.GlobalWorkerOptions.workerSrc = WORKER_SRC;
+
+const DEFAULT_OPACITY = 0.3;
+const DISABLED_OPACITY = 0.7;
+const MIN_DRAG_DISTANCE = 10;
+const MIN_HIGHLIGHT_DISTANCE = 5;
+const TEXT_SELECTION_DELAY = 50;
+const DELETE_BUTTON_OFFSET_X = 8;
+const DELETE_BUTTON_OFFSET_Y = 8;
+const COMMENT_FONT_SIZE = 14;
+const COMMENT_MIN_WIDTH = 80;
+const MIN_RESIZE_SIZE = 20;
+const CONTINUOUS_PAGE_GAP = 8;
+const CONTINUOUS_OVERSCAN = 2;
+const CONTINUOUS_ROOT_MARGIN = '200px 0px';
+const PAGE_REPORT_INTERVAL = 250;
+const TEXT_INDEX_CACHE_SIZE = 16;
+const BYTES_PER_MB = 1024 * 1024;
+const MIN_TILE_CACHE_MB = 64;
+// Tiles rendered around the visible ones, so that short pans stay sharp
+const TILE_MARGIN = 1;
+const SEARCH_REPORT_INTERVAL = 250;
+// Time in ms a committed composited zoom waits for `scale` to come back
+// through props before its CSS scale is dropped
+const ZOOM_COMMIT_TIMEOUT = 1000;
+const NO_SEARCH_HITS = [];
+// Number of recent deltas kept in `annotation_changes`, so a server callback
+// that misses an intermediate value can still catch up
+const ANNOTATION_CHANGES_WINDOW = 50;
+// Shared default so that a missing `annotations` prop keeps its identity
+const NO_ANNOTATIONS = [];
+// Annotation states received through live sync, before any have arrived
+const NO_SYNCED_STATES = new Map();
+// Annotations read from the PDF, by page, before any have been imported
+const NO_IMPORTED_ANNOTATIONS = new Map();
+// Edit handler of read-only annotations
+const ignoreEdit = () => {};
+// Fallback cache key for documents without a pdf.js fingerprint
+let documentCounter = 0;
+// US Letter at scale 1.0, used until the first page has been measured
+const DEFAULT_PAGE_SIZE = {width: 612, height: 792};
+
+// Annotation rendering configurations
+const ANNOTATION_STYLES = {
+    rectangle: {
+        border: '2px solid #dc2626',
+        backgroundColor: 'rgba(239, 68, 68, 0.1)',
+        selected: {
+            border: '2px solid #991b1b',
+            backgroundColor: 'rgba(185, 28, 28, 0.2)',
+        },
+    },
+    comment: {
+        backgroundColor: '#dbeafe',
+        border: '1px solid #3b82f6',
+        selected: {
+            backgroundColor: '#bfdbfe',
+            border: '2px solid #1d4ed8',
+        },
+    },
+    highlight: {
+        defaultColor: '#ffff00',
+        borderRadius: '2px',
+        selected: {
+            defaultColor: '#fbbf24',
+            border: '1px solid #d97706',
+        },
+    },
+};
+
+const DELETE_BUTTON_STYLE = {
+    position: 'absolute',
+    width: '16px',
+    height: '16px',
+    backgroundColor: '#dc2626',
+    color: 'white',
+    border: 'none',
+    borderRadius: '50%',
+    fontSize: '10px',
+    cursor: 'pointer',
+    top: '-8px',
+    right: '-8px',
+};
+
+// Delete Button Component
+const DeleteButton = ({
+    annotationId,
+    onDelete,
+    selectedAnnotationTool,
+    style = {},
+}) => {
+    if (selectedAnnotationTool === 'none') {
+        return null;
+    }
+
+    return (
+        <button
+            onClick={(e) => {
+                e.stopPropagation();
+                onDelete(annotationId);
+            }}
+            style={{...DELETE_BUTTON_STYLE, ...style}}
+        >
+            ×
+        </button>
+    );
+};
+
+DeleteButton.propTypes = {
+    annotationId: PropTypes.string.isRequired,
+    onDelete: PropTypes.func.isRequired,
+    selectedAnnotationTool: PropTypes.string.isRequired,
+    style: PropTypes.object,
+};
+
+// Keeps in-progress drag/resize geometry local to an annotation component.
+// Pointer moves are coalesced into one state update per animation frame and
+// the geometry is committed once through `onCommit`, optionally with
+// throttled intermediate commits every `liveUpdateInterval` ms.
+const useDraftGeometry = (annotation, onCommit, liveUpdateInterval = 0) => {
+    const [draft, setDraft] = useState(null);
+    const pendingRef = useRef(null);
+    const frameRef = useRef(null);
+    const lastLiveUpdateRef = useRef(0);
+
+    useEffect(
+        () => () => {
+            if (frameRef.current !== null) {
+                cancelAnimationFrame(frameRef.current);
+            }
+        },
+        []
+    );
+
+    // Drop the draft once the committed geometry comes back through props
+    useEffect(() => {
+        if (pendingRef.current === null) {
+            setDraft(null);
+        }
+    }, [annotation]);
+
+    const update = useCallback(
+        (geometry) => {
+            pendingRef.current = geometry;
+            if (frameRef.current === null) {
+                frameRef.current = requestAnimationFrame(() => {
+                    frameRef.current = null;
+                    setDraft(pendingRef.current);
+                });
+            }
+            if (liveUpdateInterval > 0) {
+                const now = Date.now();
+                if (now - lastLiveUpdateRef.current >= liveUpdateInterval) {
+                    lastLiveUpdateRef.current = now;
+                    onCommit(geometry);
+                }
+            }
+        },
+        [onCommit, liveUpdateInterval]
+    );
+
+    const commit = useCallback(() => {
+        const geometry = pendingRef.current;
+        pendingRef.current = null;
+        if (frameRef.current !== null) {
+            cancelAnimationFrame(frameRef.current);
+            frameRef.current = null;
+        }
+        if (geometry) {
+            setDraft(geometry);
+            onCommit(geometry);
+        }
+    }, [onCommit]);
+
+    return [draft, update, commit];
+};
+
+// Rectangle Annotation Component
+const RectangleAnnotation = ({
+    annotation,
+    onDelete,
+    onUpdate,
+    onExtractText,
+    onSelect,
+    selectedAnnotationTool,
+    isSelected = false,
+    scale = 1.0,
+    liveUpdateInterval = 0,
+}) => {
+    const [isDragging, setIsDragging] = useState(false);
+    const [isResizing, setIsResizing] = useState(false);
+    const [resizeHandle, setResizeHandle] = useState(null);
+    const [dragStart, setDragStart] = useState({x: 0, y: 0});
+    const [initialPosition, setInitialPosition] = useState({x: 0, y: 0});
+    const [initialSize, setInitialSize] = useState({width: 0, height: 0});
+
+    // Text is extracted once per commit rather than on every mousemove
+    const commitGeometry = useCallback(
+        (geometry) => {
+            const bounds = {
+                x: annotation.x,
+                y: annotation.y,
+                width: annotation.width,
+                height: annotation.height,
+                ...geometry,
+            };
+            onUpdate(annotation.id, {
+                ...geometry,
+                selected_text: onExtractText(
+                    bounds.x,
+                    bounds.y,
+                    bounds.width,
+                    bounds.height,
+                    annotation.page
+                ),
+            });
+        },
+        [annotation, onUpdate, onExtractText]
+    );
+
+    const [draft, updateDraft, commitDraft] = useDraftGeometry(
+        annotation,
+        commitGeometry,
+        liveUpdateInterval
+    );
+    const current = draft ? {...annotation, ...draft} : annotation;
+
+    const handleMouseDown = (e) => {
+        if (selectedAnnotationTool === 'none') {
+            if (onSelect) {
+                onSelect(annotation.id);
+            }
+            return;
+        }
+
+        e.stopPropagation();
+        setIsDragging(true);
+        setDragStart({x: e.clientX, y: e.clientY});
+        setInitialPosition({x: current.x, y: current.y});
+    };
+
+    const handleResizeStart = (e, handle) => {
+        if (selectedAnnotationTool === 'none') {
+            return;
+        }
+
+        e.stopPropagation();
+        setIsResizing(true);
+        setResizeHandle(handle);
+        setDragStart({x: e.clientX, y: e.clientY});
+        setInitialPosition({x: current.x, y: current.y});
+        setInitialSize({width: current.width, height: current.height});
+    };
+
+    const handleMouseMove = useCallback(
+        (e) => {
+            if (!isDragging && !isResizing) {
+                return;
+            }
+
+            const deltaX = (e.clientX - dragStart.x) / scale;
+            const deltaY = (e.clientY - dragStart.y) / scale;
+
+            if (isDragging) {
+                updateDraft({
+                    x: initialPosition.x + deltaX,
+                    y: initialPosition.y + deltaY,
+                });
+            } else if (isResizing) {
+                // Calculate current normalized bounds
+                const currentLeft = Math.min(
+                    initialPosition.x,
+                    initialPosition.x + initialSize.width
+                );
+                const currentTop = Math.min(
+                    initialPosition.y,
+                    initialPosition.y + initialSize.height
+                );
+                const currentRight = Math.max(
+                    initialPosition.x,
+                    initialPosition.x + initialSize.width
+                );
+                const currentBottom = Math.max(
+                    initialPosition.y,
+                    initialPosition.y + initialSize.height
+                );
+
+                let newLeft = currentLeft;
+                let newTop = currentTop;
+                let newRight = currentRight;
+                let newBottom = currentBottom;
+
+                switch (resizeHandle) {
+                    case 'nw':
+                        newLeft = currentLeft + deltaX;
+                        newTop = currentTop + deltaY;
+                        break;
+                    case 'ne':
+                        newRight = currentRight + deltaX;
+                        newTop = currentTop + deltaY;
+                        break;
+                    case 'sw':
+                        newLeft = currentLeft + deltaX;
+                        newBottom = currentBottom + deltaY;
+                        break;
+                    case 'se':
+                        newRight = currentRight + deltaX;
+                        newBottom = currentBottom + deltaY;
+                        break;
+                    case 'n':
+                        newTop = currentTop + deltaY;
+                        break;
+                    case 's':
+                        newBottom = currentBottom + deltaY;
+                        break;
+                    case 'w':
+                        newLeft = currentLeft + deltaX;
+                        break;
+                    case 'e':
+                        newRight = currentRight + deltaX;
+                        break;
+                    default:
+                        break;
+                }
+
+                // Calculate new dimensions
+                const newWidth = newRight - newLeft;
+                const newHeight = newBottom - newTop;
+
+                // Ensure minimum size
+                const minSize = MIN_RESIZE_SIZE / scale;
+                if (
+                    Math.abs(newWidth) >= minSize &&
+                    Math.abs(newHeight) >= minSize
+                ) {
+                    updateDraft({
+                        x: newLeft,
+                        y: newTop,
+                        width: newWidth,
+                        height: newHeight,
+                    });
+                }
+            }
+        },
+        [
+            isDragging,
+            isResizing,
+            dragStart,
+            initialPosition,
+            initialSize,
+            resizeHandle,
+            scale,
+            updateDraft,
+        ]
+    );
+
+    const handleMouseUp = useCallback(() => {
+        commitDraft();
+        setIsDragging(false);
+        setIsResizing(false);
+        setResizeHandle(null);
+    }, [commitDraft]);
+
+    useEffect(() => {
+        if (isDragging || isResizing) {
+            document.addEventListener('mousemove', handleMouseMove);
+            document.addEventListener('mouseup', handleMouseUp);
+            return () => {
+                document.removeEventListener('mousemove', handleMouseMove);
+                document.removeEventListener('mouseup', handleMouseUp);
+            };
+        }
+        return () => {};
+    }, [isDragging, isResizing, handleMouseMove, handleMouseUp]);
+
+    // Calculate normalized rectangle bounds for proper positioning
+    const rectLeft = Math.min(current.x, current.x + current.width);
+    const rectTop = Math.min(current.y, current.y + current.height);
+    const rectWidth = Math.abs(current.width);
+    const rectHeight = Math.abs(current.height);
+
+    // Get styles based on selection state
+    const rectangleStyle = isSelected
+        ? ANNOTATION_STYLES.rectangle.selected
+        : ANNOTATION_STYLES.rectangle;
+
+    return (
+        <div
+            className="annotation-rectangle"
+            style={{
+                position: 'absolute',
+                left: rectLeft * scale,
+                top: rectTop * scale,
+                width: rectWidth * scale,
+                height: rectHeight * scale,
+                border: rectangleStyle.border,
+                backgroundColor: rectangleStyle.backgroundColor,
+                zIndex: 5,
+                cursor:
+                    selectedAnnotationTool !== 'none'
+                        ? isDragging
+                            ? 'grabbing'
+                            : isResizing
+                            ? 'nwse-resize'
+                            : 'grab'
+                        : 'pointer',
+            }}
+            onMouseDown={handleMouseDown}
+            title={
+                annotation.selected_text
+                    ? `"${annotation.selected_text}"`
+                    : 'Rectangle annotation'
+            }
+        >
+            <DeleteButton
+                annotationId={annotation.id}
+                onDelete={onDelete}
+                selectedAnnotationTool={selectedAnnotationTool}
+                style={{
+                    top: '-8px',
+                    right: '-8px',
+                    // eslint-disable-next-line no-inline-comments
+                    zIndex: 15, // Higher than resize handles
+                }}
+            />
+
+            {/* Resize handles - only show when annotation tool is active */}
+            {selectedAnnotationTool !== 'none' && (
+                <>
+                    {/* Corner handles */}
+                    <div
+                        className="resize-handle resize-handle-nw"
+                        style={{
+                            position: 'absolute',
+                            top: '-4px',
+                            left: '-4px',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'nw-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'nw')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-ne"
+                        style={{
+                            position: 'absolute',
+                            top: '-4px',
+                            right: '-4px',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'ne-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'ne')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-sw"
+                        style={{
+                            position: 'absolute',
+                            bottom: '-4px',
+                            left: '-4px',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'sw-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'sw')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-se"
+                        style={{
+                            position: 'absolute',
+                            bottom: '-4px',
+                            right: '-4px',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'se-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'se')}
+                    />
+
+                    {/* Edge handles */}
+                    <div
+                        className="resize-handle resize-handle-n"
+                        style={{
+                            position: 'absolute',
+                            top: '-4px',
+                            left: '50%',
+                            transform: 'translateX(-50%)',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'n-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'n')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-s"
+                        style={{
+                            position: 'absolute',
+                            bottom: '-4px',
+                            left: '50%',
+                            transform: 'translateX(-50%)',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 's-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 's')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-w"
+                        style={{
+                            position: 'absolute',
+                            top: '50%',
+                            left: '-4px',
+                            transform: 'translateY(-50%)',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'w-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'w')}
+                    />
+                    <div
+                        className="resize-handle resize-handle-e"
+                        style={{
+                            position: 'absolute',
+                            top: '50%',
+                            right: '-4px',
+                            transform: 'translateY(-50%)',
+                            width: '8px',
+                            height: '8px',
+                            backgroundColor: '#3b82f6',
+                            border: '1px solid white',
+                            cursor: 'e-resize',
+                            zIndex: 10,
+                        }}
+                        onMouseDown={(e) => handleResizeStart(e, 'e')}
+                    />
+                </>
+            )}
+        </div>
+    );
+};
+
+RectangleAnnotation.propTypes = {
+    annotation: PropTypes.object.isRequired,
+    onDelete: PropTypes.func.isRequired,
+    onUpdate: PropTypes.func.isRequired,
+    onExtractText: PropTypes.func.isRequired,
+    onSelect: PropTypes.func,
+    selectedAnnotationTool: PropTypes.string.isRequired,
+    isSelected: PropTypes.bool,
+    scale: PropTypes.number,
+    liveUpdateInterval: PropTypes.number,
+};
+
+// Comment Annotation Component
+const CommentAnnotation = ({
+    annotation,
+    onDelete,
+    onUpdate,
+    onSelect,
+    selectedAnnotationTool,
+    isSelected = false,
+    scale = 1.0,
+    liveUpdateInterval = 0,
+}) => {
+    const [isDragging, setIsDragging] = useState(false);
+    const [dragStart, setDragStart] = useState({x: 0, y: 0});
+    const [initialPosition, setInitialPosition] = useState({x: 0, y: 0});
+
+    const commitGeometry = useCallback(
+        (geometry) => onUpdate(annotation.id, geometry),
+        [annotation.id, onUpdate]
+    );
+    const [draft, updateDraft, commitDraft] = useDraftGeometry(
+        annotation,
+        commitGeometry,
+        liveUpdateInterval
+    );
+    const current = draft ? {...annotation, ...draft} : annotation;
+
+    const handleMouseDown = (e) => {
+        if (e.target.tagName === 'INPUT') {
+            return;
+        }
+
+        if (selectedAnnotationTool === 'none') {
+            if (onSelect) {
+                onSelect(annotation.id);
+            }
+            return;
+        }
+
+        e.stopPropagation();
+        setIsDragging(true);
+        setDragStart({x: e.clientX, y: e.clientY});
+        setInitialPosition({x: current.x, y: current.y});
+    };
+
+    const handleMouseMove = useCallback(
+        (e) => {
+            if (!isDragging) {
+                return;
+            }
+
+            const deltaX = (e.clientX - dragStart.x) / scale;
+            const deltaY = (e.clientY - dragStart.y) / scale;
+
+            updateDraft({
+                x: initialPosition.x + deltaX,
+                y: initialPosition.y + deltaY,
+            });
+        },
+        [isDragging, dragStart, initialPosition, scale, updateDraft]
+    );
+
+    const handleMouseUp = useCallback(() => {
+        commitDraft();
+        setIsDragging(false);
+    }, [commitDraft]);
+
+    useEffect(() => {
+        if (isDragging) {
+            document.addEventListener('mousemove', handleMouseMove);
+            document.addEventListener('mouseup', handleMouseUp);
+            return () => {
+                document.removeEventListener('mousemove', handleMouseMove);
+                document.removeEventListener('mouseup', handleMouseUp);
+            };
+        }
+        return () => {};
+    }, [isDragging, handleMouseMove, handleMouseUp]);
+
+    // Get styles based on selection state
+    const commentStyle = isSelected
+        ? ANNOTATION_STYLES.comment.selected
+        : ANNOTATION_STYLES.comment;
+
+    return (
+        <div
+            className="annotation-comment"
+            style={{
+                position: 'absolute',
+                left: current.x * scale,
+                top: current.y * scale,
+                zIndex: 10,
+                cursor:
+                    selectedAnnotationTool !== 'none'
+                        ? isDragging
+                            ? 'grabbing'
+                            : 'grab'
+                        : 'pointer',
+            }}
+            onMouseDown={handleMouseDown}
+        >
+            <input
+                type="text"
+                value={annotation.comment}
+                onChange={(e) =>
+                    selectedAnnotationTool !== 'none' &&
+                    onUpdate(annotation.id, {
+                        comment: e.target.value,
+                    })
+                }
+                onClick={(e) => e.stopPropagation()}
+                disabled={selectedAnnotationTool === 'none'}
+                style={{
+                    backgroundColor: commentStyle.backgroundColor,
+                    border: commentStyle.border,
+                    padding: '4px 8px',
+                    fontSize: `${COMMENT_FONT_SIZE * scale}px`,
+                    borderRadius: '4px',
+                    minWidth: `${COMMENT_MIN_WIDTH * scale}px`,
+                    cursor:
+                        selectedAnnotationTool === 'none' ? 'default' : 'text',
+                    opacity:
+                        selectedAnnotationTool === 'none'
+                            ? DISABLED_OPACITY
+                            : 1,
+                }}
+            />
+            <DeleteButton
+                annotationId={annotation.id}
+                onDelete={onDelete}
+                selectedAnnotationTool={selectedAnnotationTool}
+            />
+        </div>
+    );
+};
+
+CommentAnnotation.propTypes = {
+    annotation: PropTypes.object.isRequired,
+    onDelete: PropTypes.func.isRequired,
+    onUpdate: PropTypes.func.isRequired,
+    onSelect: PropTypes.func,
+    selectedAnnotationTool: PropTypes.string.isRequired,
+    isSelected: PropTypes.bool,
+    scale: PropTypes.number,
+    liveUpdateInterval: PropTypes.number,
+};
+
+// Highlight Annotation Component
+const HighlightAnnotation = ({
+    annotation,
+    onDelete,
+    onSelect,
+    selectedAnnotationTool,
+    isSelected = false,
+    scale = 1.0,
+}) => {
+    // Get styles based on selection state
+    const highlightStyle = isSelected
+        ? ANNOTATION_STYLES.highlight.selected
+        : ANNOTATION_STYLES.highlight;
+
+    const handleClick = (e) => {
+        if (selectedAnnotationTool === 'none' && onSelect) {
+            e.stopPropagation();
+            onSelect(annotation.id);
+        }
+    };
+
+    return (
+        <div>
+            <div
+                className="annotation-highlight"
+                style={{
+                    position: 'absolute',
+                    left: annotation.x * scale,
+                    top: annotation.y * scale,
+                    width: annotation.width * scale,
+                    height: annotation.height * scale,
+                    backgroundColor:
+                        annotation.color || highlightStyle.defaultColor,
+                    opacity: annotation.opacity || DEFAULT_OPACITY,
+                    pointerEvents:
+                        selectedAnnotationTool === 'none' ? 'auto' : 'none',
+                    borderRadius: ANNOTATION_STYLES.highlight.borderRadius,
+                    border: isSelected ? highlightStyle.border : 'none',
+                    zIndex: 1,
+                    cursor:
+                        selectedAnnotationTool === 'none' ? 'pointer' : 'auto',
+                }}
+                onClick={handleClick}
+                title={
+                    annotation.selected_text
+                        ? `"${annotation.selected_text}"`
+                        : 'Highlighted text'
+                }
+            />
+            <DeleteButton
+                annotationId={annotation.id}
+                onDelete={onDelete}
+                selectedAnnotationTool={selectedAnnotationTool}
+                style={{
+                    left:
+                        (annotation.x + annotation.width) * scale -
+                        DELETE_BUTTON_OFFSET_X,
+                    top: annotation.y * scale - DELETE_BUTTON_OFFSET_Y,
+                    zIndex: 10,
+                    pointerEvents: 'auto',
+                }}
+            />
+        </div>
+    );
+};
+
+HighlightAnnotation.propTypes = {
+    annotation: PropTypes.object.isRequired,
+    onDelete: PropTypes.func.isRequired,
+    onSelect: PropTypes.func,
+    selectedAnnotationTool: PropTypes.string.isRequired,
+    isSelected: PropTypes.bool,
+    scale: PropTypes.number,
+};
+
+// Drawing Preview Component
+const DrawingPreview = ({currentAnnotation, scale = 1.0}) => {
+    if (!currentAnnotation) {
+        return null;
+    }
+
+    const dragDistance = Math.sqrt(
+        Math.pow(currentAnnotation.width, 2) +
+            Math.pow(currentAnnotation.height, 2)
+    );
+
+    const isValidDrag = dragDistance >= MIN_DRAG_DISTANCE;
+
+    // Calculate normalized bounds for proper positioning
+    const previewLeft = Math.min(
+        currentAnnotation.x,
+        currentAnnotation.x + currentAnnotation.width
+    );
+    const previewTop = Math.min(
+        currentAnnotation.y,
+        currentAnnotation.y + currentAnnotation.height
+    );
+    const previewWidth = Math.abs(currentAnnotation.width);
+    const previewHeight = Math.abs(currentAnnotation.height);
+
+    return (
+        <div
+            className="annotation-drawing"
+            style={{
+                position: 'absolute',
+                left: previewLeft * scale,
+                top: previewTop * scale,
+                width: previewWidth * scale,
+                height: previewHeight * scale,
+                border: '2px dashed',
+                backgroundColor: 'rgba(156, 163, 175, 0.1)',
+                pointerEvents: 'none',
+                zIndex: 5,
+                opacity: isValidDrag ? 1 : 0.5,
+                borderColor: isValidDrag ? '#6b7280' : '#ef4444',
+            }}
+        />
+    );
+};
+
+DrawingPreview.propTypes = {
+    currentAnnotation: PropTypes.object,
+    scale: PropTypes.number,
+};
+
+// Memoized so that unrelated re-renders of the viewer (e.g. while panning)
+// skip annotations whose props have not changed. Renders that do happen
+// are counted in the `annotations_rendered` metric.
+const memoAnnotation = (Annotation) => {
+    const Counted = ({metrics, ...props}) => {
+        metrics?.count('annotations_rendered');
+        return <Annotation {...props} />;
+    };
+    Counted.propTypes = {metrics: PropTypes.object};
+    return React.memo(Counted);
+};
+const MemoRectangleAnnotation = memoAnnotation(RectangleAnnotation);
+const MemoCommentAnnotation = memoAnnotation(CommentAnnotation);
+const MemoHighlightAnnotation = memoAnnotation(HighlightAnnotation);
+
+// Annotation Factory Function
+const createAnnotationComponent = (annotation, handlers, scale = 1.0) => {
+    const {
+        onDelete,
+        onUpdate,
+        onExtractText,
+        onSelect,
+        selectedAnnotationTool,
+        selectedAnnotation,
+        liveUpdateInterval,
+        metrics,
+    } = handlers;
+
+    const commonProps = {
+        key: annotation.id,
+        annotation,
+        onDelete,
+        onSelect,
+        selectedAnnotationTool,
+        isSelected: annotation.id === selectedAnnotation,
+        scale,
+        metrics,
+    };
+
+    switch (annotation.type) {
+        case 'rectangle':
+            return (
+                <MemoRectangleAnnotation
+                    {...commonProps}
+                    onUpdate={onUpdate}
+                    onExtractText={onExtractText}
+                    liveUpdateInterval={liveUpdateInterval}
+                />
+            );
+        case 'comment':
+            return (
+                <MemoCommentAnnotation
+                    {...commonProps}
+                    onUpdate={onUpdate}
+                    liveUpdateInterval={liveUpdateInterval}
+                />
+            );
+        case 'highlight':
+            return <MemoHighlightAnnotation {...commonProps} />;
+        default:
+            return null;
+    }
+};
+
+const BITMAP_ENTRY = PropTypes.shape({
+    bitmap: PropTypes.object,
+    width: PropTypes.number,
+    height: PropTypes.number,
+});
+
+// Bitmap Canvas Component
+//
+// Paints a cached bitmap into an absolutely positioned canvas
+const BitmapCanvas = ({entry, className, style}) => {
+    const canvasRef = useRef(null);
+
+    useEffect(() => {
+        const canvas = canvasRef.current;
+        // The bitmap may have been evicted and closed in the meantime
+        if (!canvas || !entry.bitmap.width) {
+            return;
+        }
+        canvas.width = entry.bitmap.width;
+        canvas.height = entry.bitmap.height;
+        canvas.getContext('2d').drawImage(entry.bitmap, 0, 0);
+    }, [entry]);
+
+    return (
+        <canvas
+            ref={canvasRef}
+            className={className}
+            style={{position: 'absolute', pointerEvents: 'none', ...style}}
+        />
+    );
+};
+
+BitmapCanvas.propTypes = {
+    entry: BITMAP_ENTRY.isRequired,
+    className: PropTypes.string,
+    style: PropTypes.object,
+};
+
+// Cached Page Preview Component
+//
+// Paints a cached bitmap of the current page over the page canvas while
+// react-pdf renders it, so page flips to a cached page show up immediately.
+const CachedPagePreview = ({entry}) => {
+    if (!entry) {
+        return null;
+    }
+
+    return (
+        <BitmapCanvas
+            entry={entry}
+            className="pdf-page-cached"
+            style={{left: 0, top: 0, width: entry.width, height: entry.height}}
+        />
+    );
+};
+
+CachedPagePreview.propTypes = {
+    entry: BITMAP_ENTRY,
+};
+
+// Tiled Page Component
+//
+// Renders a page as fixed-size tiles at the current scale instead of one
+// canvas, so that high zoom levels only rasterize what is on screen. Only
+// the tiles intersecting the visible part of the page are rendered; a
+// low-resolution bitmap of the whole page is shown underneath until they
+// are. The <Page> passed as children provides the text layer.
+// `onRenderSuccess` is called once the page is shown at `scale`, and
+// `onTilesRendered(ms)` each time missing visible tiles have been rendered,
+// with the time it took.
+const TiledPage = ({
+    pdf,
+    documentKey,
+    pageNumber,
+    scale,
+    tileSize,
+    cache,
+    panOffset,
+    onRenderSuccess,
+    onTilesRendered,
+    children,
+}) => {
+    const tilesRef = useRef(null);
+    const [page, setPage] = useState(null);
+    const [underlay, setUnderlay] = useState(null);
+    const [tiles, setTiles] = useState([]);
+    const [viewVersion, setViewVersion] = useState(0);
+
+    useEffect(() => {
+        let cancelled = false;
+        setPage(null);
+        pdf.getPage(pageNumber)
+            .then((loaded) => {
+                if (!cancelled) {
+                    setPage(loaded);
+                }
+            })
+            .catch(() => {});
+        return () => {
+            cancelled = true;
+        };
+    }, [pdf, pageNumber]);
+
+    // Window resizes and scrolling change which tiles are visible
+    useEffect(() => {
+        let frame = null;
+        const handleViewChange = () => {
+            if (frame === null) {
+                frame = requestAnimationFrame(() => {
+                    frame = null;
+                    setViewVersion((version) => version + 1);
+                });
+            }
+        };
+        window.addEventListener('resize', handleViewChange);
+        window.addEventListener('scroll', handleViewChange, true);
+        return () => {
+            cancelAnimationFrame(frame);
+            window.removeEventListener('resize', handleViewChange);
+            window.removeEventListener('scroll', handleViewChange, true);
+        };
+    }, []);
+
+    const size = page ? page.getViewport({scale: 1}) : null;
+
+    useEffect(() => {
+        if (!page || documentKey === null) {
+            setUnderlay(null);
+            return undefined;
+        }
+        const lowScale = underlayScale(size.width, size.height, scale);
+        const key = pageCacheKey(documentKey, pageNumber, lowScale);
+        const cached = cache.get(key);
+        setUnderlay(cached || null);
+        if (cached) {
+            onRenderSuccess?.();
+            return undefined;
+        }
+        let cancelled = false;
+        renderPageBitmap(pdf, pageNumber, lowScale)
+            .then((entry) => {
+                cache.set(key, entry);
+                if (!cancelled) {
+                    setUnderlay(entry);
+                    onRenderSuccess?.();
+                }
+            })
+            .catch(() => {});
+        return () => {
+            cancelled = true;
+        };
+    }, [page, documentKey, scale]);
+
+    useEffect(() => {
+        const element = tilesRef.current;
+        if (!page || !element || documentKey === null) {
+            setTiles([]);
+            return undefined;
+        }
+        const rect = visibleRect(element);
+        const wanted = (
+            rect
+                ? tilesInRect(
+                      size.width * scale,
+                      size.height * scale,
+                      tileSize,
+                      rect,
+                      TILE_MARGIN
+                  )
+                : []
+        ).map((tile) => ({
+            ...tile,
+            key: tileCacheKey(
+                documentKey,
+                pageNumber,
+                scale,
+                tileSize,
+                tile.column,
+                tile.row
+            ),
+        }));
+        setTiles(
+            wanted
+                .filter((tile) => cache.has(tile.key))
+                .map((tile) => ({...tile, entry: cache.get(tile.key)}))
+        );
+
+        // Render the missing tiles one at a time, nearest to the centre of
+        // the view first
+        let cancelled = false;
+        const renderMissing = async () => {
+            const start = performance.now();
+            let rendered = 0;
+            for (const tile of wanted) {
+                if (cancelled) {
+                    return;
+                }
+                if (!cache.has(tile.key)) {
+                    const entry = await renderTileBitmap(page, scale, tile);
+                    cache.set(tile.key, entry);
+                    rendered += 1;
+                    if (!cancelled) {
+                        setTiles((prev) => [...prev, {...tile, entry}]);
+                    }
+                }
+            }
+            if (rendered > 0 && !cancelled) {
+                onTilesRendered?.(performance.now() - start);
+            }
+        };
+        renderMissing().catch(() => {});
+        return () => {
+            cancelled = true;
+        };
+    }, [page, documentKey, scale, tileSize, panOffset, viewVersion]);
+
+    if (!size) {
+        return children;
+    }
+
+    const width = size.width * scale;
+    const height = size.height * scale;
+
+    return (
+        <div
+            className="pdf-page-tiled"
+            style={{position: 'relative', width, height}}
+        >
+            <div
+                ref={tilesRef}
+                className="pdf-page-tiles"
+                style={{
+                    position: 'absolute',
+                    left: 0,
+                    top: 0,
+                    width,
+                    height,
+                    overflow: 'hidden',
+                    backgroundColor: 'white',
+                }}
+            >
+                {underlay && (
+                    <BitmapCanvas
+                        entry={underlay}
+                        style={{left: 0, top: 0, width, height}}
+                    />
+                )}
+                {tiles.map((tile) => (
+                    <BitmapCanvas
+                        key={tile.key}
+                        entry={tile.entry}
+                        style={{
+                            left: tile.x,
+                            top: tile.y,
+                            width: tile.width,
+                            height: tile.height,
+                        }}
+                    />
+                ))}
+            </div>
+            {children}
+        </div>
+    );
+};
+
+TiledPage.propTypes = {
+    pdf: PropTypes.object.isRequired,
+    documentKey: PropTypes.string,
+    pageNumber: PropTypes.number.isRequired,
+    scale: PropTypes.number.isRequired,
+    tileSize: PropTypes.number.isRequired,
+    cache: PropTypes.instanceOf(PageBitmapCache).isRequired,
+    panOffset: PropTypes.object,
+    onRenderSuccess: PropTypes.func,
+    onTilesRendered: PropTypes.func,
+    children: PropTypes.node,
+};
+
+// Requests the import of a page's stored annotations once the page is
+// displayed; renders nothing
+const PageAnnotationImport = ({page, onImport}) => {
+    useEffect(() => {
+        onImport(page);
+    }, [page, onImport]);
+    return null;
+};
+
+PageAnnotationImport.propTypes = {
+    page: PropTypes.number.isRequired,
+    onImport: PropTypes.func.isRequired,
+};
+
+// Thumbnail Strip Component
+//
+// Lists page images rendered on the server; images are loaded lazily as the
+// strip is scrolled, so no pdf.js render tasks are spent on thumbnails.
+const ThumbnailStrip = ({thumbnails, numPages, pageNumber, onSelect}) => {
+    const activeRef = useRef(null);
+
+    const urls = useMemo(
+        () =>
+            Array.from({length: numPages}, (_, i) =>
+                Array.isArray(thumbnails)
+                    ? thumbnails[i]
+                    : thumbnails.replace(/\{page\}/g, String(i + 1))
+            ),
+        [thumbnails, numPages]
+    );
+
+    useEffect(() => {
+        if (activeRef.current) {
+            activeRef.current.scrollIntoView({block: 'nearest'});
+        }
+    }, [pageNumber]);
+
+    return (
+        <div className="pdf-thumbnails">
+            {urls.map((url, i) => {
+                const page = i + 1;
+                const isActive = page === pageNumber;
+                return (
+                    url && (
+                        <button
+                            key={page}
+                            type="button"
+                            ref={isActive ? activeRef : undefined}
+                            className={`pdf-thumbnail ${
+                                isActive ? 'active' : ''
+                            }`}
+                            onClick={() => onSelect(page)}
+                        >
+                            <img
+                                src={url}
+                                alt={`Page ${page}`}
+                                loading="lazy"
+                                decoding="async"
+                            />
+                            <span>{page}</span>
+                        </button>
+                    )
+                );
+            })}
+        </div>
+    );
+};
+
+ThumbnailStrip.propTypes = {
+    thumbnails: PropTypes.oneOfType([
+        PropTypes.string,
+        PropTypes.arrayOf(PropTypes.string),
+    ]).isRequired,
+    numPages: PropTypes.number.isRequired,
+    pageNumber: PropTypes.number,
+    onSelect: PropTypes.func.isRequired,
+};
+
+// Continuous Scroll Component
+//
+// Renders every page as a placeholder sized from the page viewport, but only
+// mounts a <Page> for pages in or near the scroller's viewport.
+const ContinuousPages = ({
+    pdf,
+    numPages,
+    scale = 1.0,
+    pageNumber = 1,
+    defaultPageSize = DEFAULT_PAGE_SIZE,
+    scrollerRef,
+    onPageChange,
+    renderOverlay,
+    onTextLayerRendered,
+    onPageLoad,
+    onPageRendered,
+    renderTextLayer = true,
+}) => {
+    const [visiblePages, setVisiblePages] = useState([]);
+    const [pageSizes, setPageSizes] = useState({});
+    const ratiosRef = useRef(new Map());
+    const slotsRef = useRef(new Map());
+    const observerRef = useRef(null);
+    const reportTimerRef = useRef(null);
+    const reportedPageRef = useRef(pageNumber);
+
+    const reportCurrentPage = useCallback(() => {
+        if (reportTimerRef.current) {
+            return;
+        }
+        reportTimerRef.current = setTimeout(() => {
+            reportTimerRef.current = null;
+            let currentPage = null;
+            let bestRatio = -1;
+            ratiosRef.current.forEach((ratio, page) => {
+                if (
+                    ratio > bestRatio ||
+                    (ratio === bestRatio && page < currentPage)
+                ) {
+                    bestRatio = ratio;
+                    currentPage = page;
+                }
+            });
+            if (
+                currentPage !== null &&
+                currentPage !== reportedPageRef.current
+            ) {
+                reportedPageRef.current = currentPage;
+                onPageChange(currentPage);
+            }
+        }, PAGE_REPORT_INTERVAL);
+    }, [onPageChange]);
+
+    useEffect(() => {
+        const observer = new IntersectionObserver(
+            (entries) => {
+                entries.forEach((entry) => {
+                    const page = Number(entry.target.dataset.page);
+                    if (entry.isIntersecting) {
+                        ratiosRef.current.set(page, entry.intersectionRatio);
+                    } else {
+                        ratiosRef.current.delete(page);
+                    }
+                });
+                setVisiblePages(Array.from(ratiosRef.current.keys()));
+                reportCurrentPage();
+            },
+            {
+                root: scrollerRef.current,
+                rootMargin: CONTINUOUS_ROOT_MARGIN,
+                // eslint-disable-next-line no-magic-numbers
+                threshold: [0, 0.25, 0.5, 0.75, 1],
+            }
+        );
+        slotsRef.current.forEach((slot) => observer.observe(slot));
+        observerRef.current = observer;
+        return () => {
+            observer.disconnect();
+            observerRef.current = null;
+        };
+    }, [scrollerRef, reportCurrentPage]);
+
+    useEffect(
+        () => () => {
+            clearTimeout(reportTimerRef.current);
+        },
+        []
+    );
+
+    // Scroll to pages requested from outside (e.g. a Dash callback)
+    useEffect(() => {
+        if (pageNumber === reportedPageRef.current) {
+            return;
+        }
+        const slot = slotsRef.current.get(pageNumber);
+        if (slot) {
+            reportedPageRef.current = pageNumber;
+            slot.scrollIntoView({block: 'start'});
+        }
+    }, [pageNumber]);
+
+    // Stable per-page ref callbacks, so slots are not re-observed on render
+    const slotRefCallbacksRef = useRef({});
+    const getSlotRef = (page) => {
+        if (!slotRefCallbacksRef.current[page]) {
+            slotRefCallbacksRef.current[page] = (slot) =>
+                setSlotRef(page, slot);
+        }
+        return slotRefCallbacksRef.current[page];
+    };
+
+    const setSlotRef = useCallback((page, slot) => {
+        if (slot) {
+            slotsRef.current.set(page, slot);
+            observerRef.current?.observe(slot);
+        } else {
+            const previous = slotsRef.current.get(page);
+            if (previous) {
+                observerRef.current?.unobserve(previous);
+            }
+            slotsRef.current.delete(page);
+            ratiosRef.current.delete(page);
+        }
+    }, []);
+
+    const handlePageLoad = useCallback(
+        (page) => {
+            const {width, height} = page.getViewport({scale: 1});
+            setPageSizes((prev) => {
+                const size = prev[page.pageNumber];
+                if (size && size.width === width && size.height === height) {
+                    return prev;
+                }
+                return {...prev, [page.pageNumber]: {width, height}};
+            });
+            if (onPageLoad) {
+                onPageLoad(page);
+            }
+        },
+        [onPageLoad]
+    );
+
+    // Pages in or near the viewport, plus a few on either side
+    const mountedPages = useMemo(() => {
+        const mounted = new Set();
+        visiblePages.forEach((page) => {
+            for (
+                let p = Math.max(1, page - CONTINUOUS_OVERSCAN);
+                p <= Math.min(numPages, page + CONTINUOUS_OVERSCAN);
+                p++
+            ) {
+                mounted.add(p);
+            }
+        });
+        if (mounted.size === 0) {
+            mounted.add(Math.min(Math.max(pageNumber, 1), numPages));
+        }
+        return mounted;
+    }, [visiblePages, numPages, pageNumber]);
+
+    const pages = [];
+    for (let page = 1; page <= numPages; page++) {
+        const size = pageSizes[page] || defaultPageSize;
+        pages.push(
+            <div
+                key={page}
+                ref={getSlotRef(page)}
+                className="pdf-page-slot"
+                data-page={page}
+                style={{
+                    position: 'relative',
+                    width: size.width * scale,
+                    height: size.height * scale,
+                    margin: `0 auto ${CONTINUOUS_PAGE_GAP}px`,
+                }}
+            >
+                {mountedPages.has(page) && (
+                    <>
+                        <Page
+                            pdf={pdf}
+                            pageNumber={page}
+                            scale={scale}
+                            renderTextLayer={renderTextLayer}
+                            renderAnnotationLayer={false}
+                            onLoadSuccess={handlePageLoad}
+                            onRenderSuccess={
+                                onPageRendered
+                                    ? () => onPageRendered(page)
+                                    : undefined
+                            }
+                            onRenderTextLayerSuccess={() =>
+                                onTextLayerRendered(page)
+                            }
+                        />
+                        {renderOverlay(page)}
+                    </>
+                )}
+            </div>
+        );
+    }
+
+    return <>{pages}</>;
+};
+
+ContinuousPages.propTypes = {
+    pdf: PropTypes.object.isRequired,
+    numPages: PropTypes.number.isRequired,
+    scale: PropTypes.number,
+    pageNumber: PropTypes.number,
+    defaultPageSize: PropTypes.object,
+    scrollerRef: PropTypes.object.isRequired,
+    onPageChange: PropTypes.func.isRequired,
+    renderOverlay: PropTypes.func.isRequired,
+    onTextLayerRendered: PropTypes.func.isRequired,
+    onPageLoad: PropTypes.func,
+    onPageRendered: PropTypes.func,
+};
+
+/**
+ * _DashPdf is a component that renders a PDF with annotation capabilities.
+ */
+const _DashPdf = ({
+    id,
+    data,
+    enable_annotations = false,
+    annotations: annotationsProp = NO_ANNOTATIONS,
+    selected_annotation_tool = 'none',
+    selected_annotation = null,
+    scale = 1.0,
+    onAnnotationAdd = null,
+    onAnnotationDelete = null,
+    onAnnotationUpdate = null,
+    page_number = 1,
+    enable_pan = true,
+    enable_zoom = true,
+    min_scale = 0.5,
+    max_scale = 3.0,
+    // eslint-disable-next-line no-magic-numbers
+    zoom_step = 0.1,
+    document_options = null,
+    view_mode = 'single',
+    live_update_interval = 0,
+    interaction_mode = 'rerender',
+    zoom_settle_delay = 150,
+    annotation_changes = null,
+    echo_annotations = true,
+    render_cache_mb = 64,
+    prefetch_pages = 1,
+    search_query = '',
+    thumbnails = null,
+    import_annotations = false,
+    transfer = 'auto',
+    chunk_size = 262144,
+    worker_pool_size = null,
+    collect_metrics = false,
+    metrics_interval = 5000,
+    render_mode = 'page',
+    tile_size = 512,
+    doc_key = null,
+    browser_cache_mb = 0,
+    sync_url = null,
+    render_text_layer = true,
+    setProps,
+}) => {
+    // const  = props;
+
+    const [isDrawing, setIsDrawing] = useState(false);
+    const [currentAnnotation, setCurrentAnnotation] = useState(null);
+    const [isTextSelecting, setIsTextSelecting] = useState(false);
+
+    // Pan state
+    const [isPanning, setIsPanning] = useState(false);
+    const [panOffset, setPanOffset] = useState({x: 0, y: 0});
+
+    // Continuous mode state
+    const [numPages, setNumPages] = useState(0);
+    const [defaultPageSize, setDefaultPageSize] = useState(DEFAULT_PAGE_SIZE);
+
+    // Loaded pdf.js document and the key its rendered pages are cached under
+    const pdfRef = useRef(null);
+    const [documentKey, setDocumentKey] = useState(null);
+
+    const containerRef = useRef(null);
+    const isContinuous = view_mode === 'continuous';
+
+    const isChunked = transfer === 'chunked' && typeof data === 'string';
+
+    // react-pdf reloads the document whenever `options` changes identity,
+    // so only rebuild it when its contents change.
+    const documentOptionsKey = JSON.stringify(document_options);
+    const documentOptions = useMemo(() => {
+        if (isChunked) {
+            // pdf.js requests ranges aligned to its chunk size
+            return {...document_options, rangeChunkSize: chunk_size};
+        }
+        return document_options ? {...document_options} : undefined;
+    }, [documentOptionsKey, isChunked, chunk_size]);
+
+    // Check if annotation tools are active (not 'none')
+    const isAnnotationToolActive =
+        enable_annotations && selected_annotation_tool !== 'none';
+
+    // Highlights are made by selecting text in the text layer
+    const renderTextLayer =
+        render_text_layer ||
+        (isAnnotationToolActive && selected_annotation_tool === 'highlight');
+
+    // Performance metrics, only collected while `collect_metrics` is set
+    const metricsRef = useRef(null);
+    if (collect_metrics !== Boolean(metricsRef.current)) {
+        metricsRef.current = collect_metrics ? new MetricsCollector() : null;
+    }
+
+    // Utility functions
+    const updateProps = useCallback(
+        (updates) => {
+            if (setProps) {
+                const metrics = metricsRef.current;
+                if (metrics) {
+                    metrics.count('set_props_calls');
+                    metrics.count('set_props_bytes', payloadSize(updates));
+                }
+                setProps(updates);
+            }
+        },
+        [setProps]
+    );
+
+    // Documents are identified by `doc_key` or, for inline data, by a hash
+    // of their bytes computed off the main thread. With `browser_cache_mb`
+    // set they are kept in the browser and reopened from there by key.
+    const browserCacheBytes = canStoreDocuments()
+        ? browser_cache_mb * 1024 * 1024
+        : 0;
+    const useBrowserCache = browserCacheBytes > 0;
+    const [resolvedSource, setResolvedSource] = useState(null);
+
+    useEffect(() => {
+        let cancelled = false;
+        setResolvedSource(null);
+        const resolve = async () => {
+            if (doc_key && useBrowserCache) {
+                const bytes = await getStoredDocument(doc_key).catch(
+                    () => null
+                );
+                if (bytes) {
+                    return {key: doc_key, bytes, stored: true};
+                }
+            }
+            if (data && isInlineDocument(data)) {
+                const hashed = await hashDocument(data);
+                return {
+                    key: doc_key || hashed.key,
+                    bytes: hashed.bytes,
+                    stored: false,
+                };
+            }
+            return {key: doc_key, bytes: null, stored: false};
+        };
+        resolve()
+            .catch((error) => {
+                console.error('Error loading PDF:', error);
+                return {key: doc_key, bytes: null, stored: false};
+            })
+            .then((source) => {
+                if (!cancelled) {
+                    setResolvedSource({...source, data});
+                }
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [data, doc_key, useBrowserCache]);
+
+    const currentSource =
+        resolvedSource && resolvedSource.data === data ? resolvedSource : null;
+    const fetchChunked =
+        isChunked && currentSource !== null && !currentSource.stored;
+
+    // In chunked transfer mode `data` is a URL that is loaded in chunks
+    // through a range transport instead of being handed to pdf.js as is.
+    // The transport is owned by the shared document cache, so viewers of
+    // the same document share one set of range requests.
+    const chunkedSource = useMemo(
+        () => (fetchChunked ? chunkedFile(data, chunk_size) : null),
+        [fetchChunked, data, chunk_size]
+    );
+
+    // Load progress, reported at most once per PAGE_REPORT_INTERVAL
+    const loadProgressRef = useRef({timer: null, latest: null, total: null});
+
+    const handleLoadProgress = useCallback(
+        ({loaded, total}) => {
+            loadProgressRef.current.total = total || null;
+            const metrics = metricsRef.current;
+            if (metrics && total && loaded >= total) {
+                // Everything is fetched, pdf.js is still parsing
+                metrics.measure('document_fetch_ms', 'document', true);
+                metrics.mark('document:parse');
+            }
+            const progress = loadProgressRef.current;
+            progress.latest = {
+                bytes_loaded: loaded,
+                load_progress: total ? Math.min(1, loaded / total) : null,
+            };
+            if (progress.timer === null) {
+                progress.timer = setTimeout(() => {
+                    progress.timer = null;
+                    updateProps(progress.latest);
+                }, PAGE_REPORT_INTERVAL);
+            }
+        },
+        [updateProps]
+    );
+
+    useEffect(() => () => clearTimeout(loadProgressRef.current.timer), []);
+
+    // Generate UUID with fallback for older browsers
+    const generateUUID = useCallback(() => {
+        if (typeof crypto !== 'undefined' && crypto.randomUUID) {
+            return crypto.randomUUID();
+        }
+        // Fallback for older browsers
+        return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(
+            /[xy]/g,
+            function (c) {
+                // eslint-disable-next-line no-magic-numbers
+                const r = (Math.random() * 16) | 0;
+                // eslint-disable-next-line no-magic-numbers
+                const v = c === 'x' ? r : (r & 0x3) | 0x8;
+                // eslint-disable-next-line no-magic-numbers
+                return v.toString(16);
+            }
+        );
+    }, []);
+
+    const createAnnotation = useCallback(
+        (baseProps) => ({
+            id: `${baseProps.type}-${generateUUID()}`,
+            version: 1,
+            created_at: new Date().toISOString(),
+            updated_at: new Date().toISOString(),
+            page: page_number,
+            ...baseProps,
+        }),
+        [page_number, generateUUID]
+    );
+
+    // Batches from `annotations.from_arrays` are expanded once per update
+    const annotations = useMemo(
+        () => decodeAnnotations(annotationsProp),
+        [annotationsProp]
+    );
+
+    // Annotations as edited locally when they are not echoed through props
+    const [localAnnotations, setLocalAnnotations] = useState(annotations);
+    useEffect(() => {
+        setLocalAnnotations(annotations);
+    }, [annotations]);
+    // Annotation states received through live sync, by id. They are merged
+    // over `annotations` but not written back, so that an edit of another
+    // viewer doesn't make every viewer send the full list to the server,
+    // and dropped once `annotations` catches up with them.
+    const [syncedStates, setSyncedStates] = useState(NO_SYNCED_STATES);
+    useEffect(() => {
+        setSyncedStates((previous) => pendingSyncStates(previous, annotations));
+    }, [annotations]);
+    const syncedAnnotations = useMemo(() => {
+        const pending = pendingSyncStates(syncedStates, annotations);
+        if (pending.size === 0) {
+            return annotations;
+        }
+        const entries = Array.from(pending.values());
+        const remote = entries.filter((e) => !e.own).map((e) => e.state);
+        const own = entries.filter((e) => e.own).map((e) => e.state);
+        return mergeAnnotationStates(
+            mergeAnnotationStates(annotations, remote),
+            own,
+            true
+        );
+    }, [annotations, syncedStates]);
+    const currentAnnotations = echo_annotations
+        ? syncedAnnotations
+        : localAnnotations;
+
+    // Latest annotations for the edit handlers below, which keep a stable
+    // identity so memoized annotation components don't re-render
+    const annotationsRef = useRef(currentAnnotations);
+    annotationsRef.current = currentAnnotations;
+
+    // Page -> annotations index, rebuilt only when the array changes
+    const annotationsByPage = useMemo(() => {
+        const byPage = new Map();
+        currentAnnotations.forEach((annotation) => {
+            const bucket = byPage.get(annotation.page);
+            if (bucket) {
+                bucket.push(annotation);
+            } else {
+                byPage.set(annotation.page, [annotation]);
+            }
+        });
+        return byPage;
+    }, [currentAnnotations]);
+
+    // Delta log: each edit is appended to `annotation_changes` as
+    // {seq, session, op, id, patch, version}, with `seq` increasing
+    // monotonically within a `session` (one per mounted component)
+    const [changeSession] = useState(() => generateUUID());
+    const changeSeqRef = useRef(0);
+    const changesRef = useRef(annotation_changes);
+    useEffect(() => {
+        changesRef.current = annotation_changes;
+    }, [annotation_changes]);
+
+    // Live sync with the other viewers of the document, keyed by `doc_key`
+    // or the document fingerprint
+    const syncRef = useRef(null);
+    const syncKey = doc_key || documentKey;
+
+    const applySyncStates = useCallback(
+        (states, own) => {
+            const current = annotationsRef.current;
+            const merged = mergeAnnotationStates(current, states, own);
+            if (merged === current) {
+                return;
+            }
+            annotationsRef.current = merged;
+            if (echo_annotations) {
+                const versions = new Map(
+                    current.map((a) => [a.id, a.version || 1])
+                );
+                setSyncedStates((previous) => {
+                    const next = new Map(previous);
+                    states.forEach((state) =>
+                        next.set(state.id, {
+                            state,
+                            own,
+                            version: versions.get(state.id),
+                        })
+                    );
+                    return next;
+                });
+            } else {
+                setLocalAnnotations(merged);
+            }
+        },
+        [echo_annotations]
+    );
+    const applySyncStatesRef = useRef(applySyncStates);
+    applySyncStatesRef.current = applySyncStates;
+
+    useEffect(() => {
+        if (!sync_url || !syncKey) {
+            return undefined;
+        }
+        setSyncedStates(NO_SYNCED_STATES);
+        const sync = new AnnotationSync(
+            `${sync_url}/${encodeURIComponent(syncKey)}`,
+            changeSession,
+            (states, own) => applySyncStatesRef.current(states, own)
+        );
+        syncRef.current = sync;
+        return () => {
+            syncRef.current = null;
+            sync.close();
+        };
+    }, [sync_url, syncKey, changeSession]);
+
+    const updateAnnotations = useCallback(
+        (newAnnotations, op, annotationId, patch, version) => {
+            const updates = {};
+            if (echo_annotations) {
+                updates.annotations = newAnnotations;
+            } else {
+                setLocalAnnotations(newAnnotations);
+            }
+            if (syncRef.current) {
+                const annotation =
+                    op === 'delete'
+                        ? null
+                        : newAnnotations.find((a) => a.id === annotationId);
+                syncRef.current.push({
+                    op,
+                    id: annotationId,
+                    patch,
+                    version,
+                    annotation,
+                    updated_at:
+                        annotation?.updated_at || new Date().toISOString(),
+                });
+            }
+            if (changesRef.current) {
+                changeSeqRef.current += 1;
+                const change = {
+                    seq: changeSeqRef.current,
+                    session: changeSession,
+                    op,
+                    id: annotationId,
+                    patch,
+                    version,
+                };
+                changesRef.current = [...changesRef.current, change].slice(
+                    -ANNOTATION_CHANGES_WINDOW
+                );
+                updates.annotation_changes = changesRef.current;
+            }
+            if (Object.keys(updates).length > 0) {
+                updateProps(updates);
+            }
+        },
+        [echo_annotations, changeSession, updateProps]
+    );
+
+    // Element annotations on `page` are positioned in
+    const getPageElement = useCallback(
+        (page) => {
+            if (!isContinuous) {
+                return containerRef.current;
+            }
+            return containerRef.current?.querySelector(
+                `.pdf-page-slot[data-page="${page}"]`
+            );
+        },
+        [isContinuous]
+    );
+
+    // Page under a DOM node (the displayed page outside continuous mode)
+    const getPageForNode = useCallback(
+        (node) => {
+            if (!isContinuous) {
+                return page_number;
+            }
+            const element =
+                node && node.nodeType === Node.ELEMENT_NODE
+                    ? node
+                    : node?.parentElement;
+            const slot = element?.closest('.pdf-page-slot');
+            return slot ? Number(slot.dataset.page) : null;
+        },
+        [isContinuous, page_number]
+    );
+
+    const getRelativePosition = useCallback(
+        (e, page) => {
+            const rect = getPageElement(page).getBoundingClientRect();
+            return {
+                x: (e.clientX - rect.left) / scale,
+                y: (e.clientY - rect.top) / scale,
+            };
+        },
+        [scale, getPageElement]
+    );
+
+    // Live view transform. Pan and (in composited mode) zoom gestures write
+    // the CSS transform directly instead of re-rendering on every event;
+    // React state is synced once the gesture ends. A composited `zoom` is
+    // relative to `baseScale`, and is kept until a new `scale` prop arrives
+    // after committing `pendingScale`, or ZOOM_COMMIT_TIMEOUT has passed.
+    const viewRef = useRef({
+        x: 0,
+        y: 0,
+        zoom: 1,
+        baseScale: scale,
+        pendingScale: null,
+    });
+    const lastPanPointRef = useRef({x: 0, y: 0});
+    const zoomTimerRef = useRef(null);
+    const scaleRef = useRef(scale);
+    scaleRef.current = scale;
+
+    const writeViewTransform = useCallback(() => {
+        const {x, y, zoom} = viewRef.current;
+        if (containerRef.current && !isContinuous) {
+            containerRef.current.style.transform =
+                zoom === 1
+                    ? `translate(${x}px, ${y}px)`
+                    : `translate(${x}px, ${y}px) scale(${zoom})`;
+        }
+    }, [isContinuous]);
+
+    // Renders write `panOffset` alone; keep the scale of a zoom in progress
+    useLayoutEffect(() => {
+        writeViewTransform();
+    }, [panOffset, writeViewTransform]);
+
+    useEffect(() => () => clearTimeout(zoomTimerRef.current), []);
+
+    // Pan handlers
+    const handlePanStart = useCallback(
+        (e) => {
+            if (!enable_pan || isAnnotationToolActive || isContinuous) {
+                return;
+            }
+
+            setIsPanning(true);
+            lastPanPointRef.current = {x: e.clientX, y: e.clientY};
+            e.preventDefault();
+        },
+        [enable_pan, isAnnotationToolActive, isContinuous]
+    );
+
+    const handlePanMove = useCallback(
+        (e) => {
+            if (!isPanning || !enable_pan) {
+                return;
+            }
+
+            const view = viewRef.current;
+            view.x += e.clientX - lastPanPointRef.current.x;
+            view.y += e.clientY - lastPanPointRef.current.y;
+            lastPanPointRef.current = {x: e.clientX, y: e.clientY};
+            writeViewTransform();
+            e.preventDefault();
+        },
+        [isPanning, enable_pan, writeViewTransform]
+    );
+
+    const handlePanEnd = useCallback(() => {
+        if (!isPanning) {
+            return;
+        }
+        setIsPanning(false);
+        setPanOffset({x: viewRef.current.x, y: viewRef.current.y});
+    }, [isPanning]);
+
+    const clampScale = useCallback(
+        (value) => Math.max(min_scale, Math.min(max_scale, value)),
+        [min_scale, max_scale]
+    );
+
+    // Drop the CSS scale of a composited zoom
+    const resetZoom = useCallback(() => {
+        clearTimeout(zoomTimerRef.current);
+        zoomTimerRef.current = null;
+        const view = viewRef.current;
+        view.pendingScale = null;
+        view.zoom = 1;
+        writeViewTransform();
+        setPanOffset({x: view.x, y: view.y});
+    }, [writeViewTransform]);
+
+    // The page, annotations and text layer are laid out at a new `scale` as
+    // soon as it arrives, whatever value the app settled on; drop the CSS
+    // scale before that layout is painted so nothing is scaled twice
+    useLayoutEffect(() => {
+        if (viewRef.current.zoom !== 1) {
+            resetZoom();
+        }
+    }, [scale]);
+
+    // Commit a composited zoom: re-render sharply at the final scale. The
+    // CSS scale stays until the new `scale` comes back through props, or is
+    // dropped if the app doesn't echo it in time.
+    const commitZoom = useCallback(() => {
+        zoomTimerRef.current = null;
+        const view = viewRef.current;
+        if (view.zoom === 1) {
+            return;
+        }
+        view.pendingScale = clampScale(view.baseScale * view.zoom);
+        if (view.pendingScale === view.baseScale) {
+            resetZoom();
+            return;
+        }
+        zoomTimerRef.current = setTimeout(resetZoom, ZOOM_COMMIT_TIMEOUT);
+        updateProps({scale: view.pendingScale});
+    }, [clampScale, resetZoom, updateProps]);
+
+    // Zoom handler (registered as a non-passive listener so that it can
+    // prevent the page from scrolling)
+    const handleWheel = useCallback(
+        (e) => {
+            // In continuous mode the wheel scrolls; zoom with ctrl/cmd+wheel
+            if (!enable_zoom || (isContinuous && !e.ctrlKey && !e.metaKey)) {
+                return;
+            }
+
+            e.preventDefault();
+
+            const view = viewRef.current;
+            if (view.zoom === 1) {
+                view.baseScale = scale;
+            }
+            const currentScale = view.baseScale * view.zoom;
+            const delta = e.deltaY > 0 ? -zoom_step : zoom_step;
+            const newScale = clampScale(currentScale + delta);
+            if (newScale === currentScale) {
+                return;
+            }
+
+            // Keep the point under the cursor in place
+            if (!isContinuous) {
+                const rect = containerRef.current.getBoundingClientRect();
+                const ratio = 1 - newScale / currentScale;
+                view.x += (e.clientX - rect.left) * ratio;
+                view.y += (e.clientY - rect.top) * ratio;
+            }
+
+            if (interaction_mode === 'composited' && !isContinuous) {
+                view.zoom = newScale / view.baseScale;
+                writeViewTransform();
+                clearTimeout(zoomTimerRef.current);
+                zoomTimerRef.current = setTimeout(
+                    commitZoom,
+                    zoom_settle_delay
+                );
+                return;
+            }
+
+            setPanOffset({x: view.x, y: view.y});
+            updateProps({scale: newScale});
+        },
+        [
+            enable_zoom,
+            isContinuous,
+            interaction_mode,
+            scale,
+            zoom_step,
+            zoom_settle_delay,
+            clampScale,
+            commitZoom,
+            writeViewTransform,
+            updateProps,
+        ]
+    );
+
+    useEffect(() => {
+        const container = containerRef.current;
+        if (!container) {
+            return () => {};
+        }
+        container.addEventListener('wheel', handleWheel, {passive: false});
+        return () => container.removeEventListener('wheel', handleWheel);
+    }, [handleWheel]);
+
+    const callCallback = useCallback((callback, ...args) => {
+        if (callback && typeof callback === 'function') {
+            callback(...args);
+        }
+    }, []);
+
+    // Document load handler
+    const onDocumentLoadSuccess = useCallback(
+        (pdf) => {
+            pdfRef.current = pdf;
+            setDocumentKey(
+                (pdf.fingerprints && pdf.fingerprints[0]) ||
+                    `document-${++documentCounter}`
+            );
+            setNumPages(pdf.numPages);
+            pdf.getPage(1)
+                .then((page) => {
+                    const {width, height} = page.getViewport({scale: 1});
+                    setDefaultPageSize({width, height});
+                })
+                .catch(() => {});
+            updateProps({num_pages: pdf.numPages, page_number: 1});
+        },
+        [updateProps]
+    );
+
+    // Documents are loaded through a cache shared by all viewers, so viewers
+    // showing the same document parse it once
+    let documentFile = null;
+    if (currentSource) {
+        documentFile =
+            currentSource.bytes || (isChunked ? chunkedSource : data);
+    }
+    const {pdf, error: loadError} = useSharedDocument(
+        documentFile,
+        documentOptions,
+        worker_pool_size,
+        handleLoadProgress,
+        currentSource ? currentSource.key : null
+    );
+    // Neither `data` nor a stored copy of `doc_key`
+    const missingDocument = currentSource !== null && !documentFile;
+
+    // Keep loaded documents in the browser, unless they would not fit
+    useEffect(() => {
+        if (!pdf || !useBrowserCache || !currentSource) {
+            return;
+        }
+        const {key, bytes, stored} = currentSource;
+        if (!key || stored) {
+            return;
+        }
+        const size = bytes ? bytes.byteLength : loadProgressRef.current.total;
+        if (!size || size > browserCacheBytes) {
+            return;
+        }
+        (bytes ? Promise.resolve(bytes) : pdf.getData())
+            .then((content) => storeDocument(key, content, browserCacheBytes))
+            .then((keys) => updateProps({stored_doc_keys: keys}))
+            .catch((error) => console.warn('Could not store PDF:', error));
+    }, [pdf]);
+
+    useEffect(() => {
+        if (useBrowserCache) {
+            storedDocumentKeys()
+                .then((keys) => updateProps({stored_doc_keys: keys}))
+                .catch(() => {});
+        }
+    }, [useBrowserCache]);
+
+    useEffect(() => {
+        metricsRef.current?.mark('document');
+    }, [data]);
+
+    useEffect(() => {
+        if (pdf) {
+            const metrics = metricsRef.current;
+            if (metrics) {
+                metrics.measure('document_parse_ms', 'document:parse');
+                metrics.measure('document_load_ms', 'document');
+            }
+            onDocumentLoadSuccess(pdf);
+        }
+    }, [pdf]);
+
+    useEffect(() => {
+        if (loadError) {
+            metricsRef.current?.count('document_load_errors');
+            console.error('Error loading PDF:', loadError);
+        }
+    }, [loadError]);
+
+    const handleContinuousPageChange = useCallback(
+        (page) => {
+            updateProps({page_number: page});
+        },
+        [updateProps]
+    );
+
+    const handleThumbnailSelect = useCallback(
+        (page) => {
+            updateProps({page_number: page});
+        },
+        [updateProps]
+    );
+
+    // Generic annotation operations
+    const addAnnotation = useCallback(
+        (annotation) => {
+            const newAnnotations = [...annotationsRef.current, annotation];
+            updateAnnotations(
+                newAnnotations,
+                'add',
+                annotation.id,
+                annotation,
+                annotation.version
+            );
+            callCallback(onAnnotationAdd, annotation);
+        },
+        [updateAnnotations, onAnnotationAdd, callCallback]
+    );
+
+    const deleteAnnotation = useCallback(
+        (annotationId) => {
+            const deleted = annotationsRef.current.find(
+                (ann) => ann.id === annotationId
+            );
+            const newAnnotations = annotationsRef.current.filter(
+                (ann) => ann.id !== annotationId
+            );
+            updateAnnotations(
+                newAnnotations,
+                'delete',
+                annotationId,
+                null,
+                deleted?.version || 1
+            );
+            callCallback(onAnnotationDelete, annotationId);
+        },
+        [updateAnnotations, onAnnotationDelete, callCallback]
+    );
+
+    const updateAnnotation = useCallback(
+        (annotationId, updates) => {
+            const updatesWithVersionAndTimestamp = {
+                ...updates,
+                version:
+                    (annotationsRef.current.find(
+                        (ann) => ann.id === annotationId
+                    )?.version || 1) + 1,
+                updated_at: new Date().toISOString(),
+            };
+            const newAnnotations = annotationsRef.current.map((ann) =>
+                ann.id === annotationId
+                    ? {...ann, ...updatesWithVersionAndTimestamp}
+                    : ann
+            );
+            updateAnnotations(
+                newAnnotations,
+                'update',
+                annotationId,
+                updatesWithVersionAndTimestamp,
+                updatesWithVersionAndTimestamp.version
+            );
+            callCallback(
+                onAnnotationUpdate,
+                annotationId,
+                updatesWithVersionAndTimestamp
+            );
+        },
+        [updateAnnotations, onAnnotationUpdate, callCallback]
+    );
+
+    // Annotation selection handler
+    const selectedAnnotationRef = useRef(selected_annotation);
+    selectedAnnotationRef.current = selected_annotation;
+
+    const handleAnnotationSelect = useCallback(
+        (annotationId) => {
+            const newSelectedAnnotation =
+                selectedAnnotationRef.current === annotationId
+                    ? null
+                    : annotationId;
+            updateProps({selected_annotation: newSelectedAnnotation});
+        },
+        [updateProps]
+    );
+
+    // Text selection for highlighting
+    const handleTextSelection = useCallback(() => {
+        if (
+            !isAnnotationToolActive ||
+            selected_annotation_tool !== 'highlight'
+        ) {
+            return;
+        }
+
+        const selection = window.getSelection();
+        if (!selection || selection.rangeCount === 0) {
+            return;
+        }
+
+        const range = selection.getRangeAt(0);
+        const selectedText = selection.toString().trim();
+        if (!selectedText) {
+            return;
+        }
+
+        const page = getPageForNode(range.startContainer);
+        const pageElement = page ? getPageElement(page) : null;
+        if (!pageElement) {
+            return;
+        }
+        const containerRect = pageElement.getBoundingClientRect();
+        const rangeRect = range.getBoundingClientRect();
+
+        const x = (rangeRect.left - containerRect.left) / scale;
+        const y = (rangeRect.top - containerRect.top) / scale;
+        const width = rangeRect.width / scale;
+        const height = rangeRect.height / scale;
+
+        if (width > MIN_HIGHLIGHT_DISTANCE && height > MIN_HIGHLIGHT_DISTANCE) {
+            const highlightAnnotation = createAnnotation({
+                type: 'highlight',
+                page,
+                x,
+                y,
+                width,
+                height,
+                selected_text: selectedText,
+                color: ANNOTATION_STYLES.highlight.defaultColor,
+                opacity: DEFAULT_OPACITY,
+            });
+
+            addAnnotation(highlightAnnotation);
+            selection.removeAllRanges();
+        }
+    }, [
+        isAnnotationToolActive,
+        selected_annotation_tool,
+        scale,
+        getPageForNode,
+        getPageElement,
+        createAnnotation,
+        addAnnotation,
+    ]);
+
+    // Selection change listeners
+    useEffect(() => {
+        if (
+            !isAnnotationToolActive ||
+            selected_annotation_tool !== 'highlight'
+        ) {
+            return () => {};
+        }
+
+        const handleSelectionChange = () => {
+            const selection = window.getSelection();
+            setIsTextSelecting(selection && selection.toString().length > 0);
+        };
+
+        const handleMouseUp = () => {
+            setTimeout(() => {
+                if (selected_annotation_tool === 'highlight') {
+                    handleTextSelection();
+                }
+                setIsTextSelecting(false);
+            }, TEXT_SELECTION_DELAY);
+        };
+
+        document.addEventListener('selectionchange', handleSelectionChange);
+        document.addEventListener('mouseup', handleMouseUp);
+
+        return () => {
+            document.removeEventListener(
+                'selectionchange',
+                handleSelectionChange
+            );
+            document.removeEventListener('mouseup', handleMouseUp);
+        };
+    }, [isAnnotationToolActive, selected_annotation_tool, handleTextSelection]);
+
+    // Double-click handler for comment tool
+    const handleDoubleClick = useCallback(
+        (e) => {
+            if (
+                !isAnnotationToolActive ||
+                selected_annotation_tool !== 'comment' ||
+                e.target.closest('.annotation-comment, .annotation-rectangle')
+            ) {
+                return;
+            }
+
+            const page = getPageForNode(e.target);
+            if (!page) {
+                return;
+            }
+            const {x, y} = getRelativePosition(e, page);
+            const commentAnnotation = createAnnotation({
+                type: 'comment',
+                page,
+                x,
+                y,
+                width: 0,
+                height: 0,
+                comment: 'Edit this text',
+            });
+            addAnnotation(commentAnnotation);
+        },
+        [
+            isAnnotationToolActive,
+            selected_annotation_tool,
+            getPageForNode,
+            getRelativePosition,
+            createAnnotation,
+            addAnnotation,
+        ]
+    );
+
+    // Text extraction for rectangles on pages whose text has not been
+    // extracted yet, backed by a per-page spatial index of the text layer
+    // that is rebuilt when the text layer re-renders
+    const textIndexesRef = useRef(new Map());
+
+    useEffect(() => {
+        textIndexesRef.current.clear();
+    }, [data, scale]);
+
+    const invalidateTextIndex = useCallback((page) => {
+        textIndexesRef.current.delete(page);
+    }, []);
+
+    // Pages whose canvas would be too large to rasterize at once are
+    // rendered in tiles, covering only the part of the page on screen
+    const pixelRatio = window.devicePixelRatio || 1;
+    const isTiled =
+        !isContinuous &&
+        typeof createImageBitmap === 'function' &&
+        (render_mode === 'tiled' ||
+            (render_mode === 'auto' &&
+                defaultPageSize.width *
+                    defaultPageSize.height *
+                    (scale * pixelRatio) ** 2 >
+                    TILED_PIXELS));
+
+    // Render and text layer durations of a page, measured from the moment
+    // the page has loaded to its first render. Tiled pages time their tiles
+    // themselves, as they have no single render to wait for.
+    const handlePageLoad = useCallback(
+        (page) => {
+            const metrics = metricsRef.current;
+            if (metrics) {
+                if (!isTiled) {
+                    metrics.mark(`render:${page.pageNumber}`);
+                }
+                metrics.mark(`text:${page.pageNumber}`);
+            }
+        },
+        [isTiled]
+    );
+
+    const handlePageRendered = useCallback((page) => {
+        metricsRef.current?.measure('page_render_ms', `render:${page}`);
+    }, []);
+
+    const handleTilesRendered = useCallback((milliseconds) => {
+        metricsRef.current?.timing('page_render_ms', milliseconds);
+    }, []);
+
+    // A page that switched to tiles before its canvas rendered never
+    // completes that render
+    useEffect(() => {
+        if (isTiled) {
+            metricsRef.current?.unmark(`render:${page_number}`);
+        }
+    }, [isTiled, page_number]);
+
+    const handleTextLayerRendered = useCallback(
+        (page) => {
+            invalidateTextIndex(page);
+            metricsRef.current?.measure('text_layer_ms', `text:${page}`);
+        },
+        [invalidateTextIndex]
+    );
+
+    // Rendered page bitmaps, keyed by document, page and scale. A cached
+    // bitmap is shown while the current page renders, and neighbouring
+    // pages are rendered into the cache ahead of time while idle.
+    const renderCacheBytes = Math.max(0, render_cache_mb) * BYTES_PER_MB;
+    const renderCacheRef = useRef(null);
+    if (!renderCacheRef.current) {
+        renderCacheRef.current = new PageBitmapCache(renderCacheBytes);
+    }
+    const canCacheRenders =
+        !isContinuous &&
+        !isTiled &&
+        renderCacheBytes > 0 &&
+        documentKey !== null &&
+        typeof createImageBitmap === 'function';
+    const currentPageKey = canCacheRenders
+        ? pageCacheKey(documentKey, page_number, scale)
+        : null;
+    const [cachedPreview, setCachedPreview] = useState(null);
+
+    useEffect(() => {
+        renderCacheRef.current.setMaxBytes(renderCacheBytes);
+    }, [renderCacheBytes]);
+
+    useEffect(() => () => renderCacheRef.current.clear(), []);
+
+    // Tiles of tiled pages, and their low-resolution underlays, kept per
+    // scale. Tiles are only rendered for what is on screen, so the cache
+    // always has room for at least a screenful of them.
+    const tileCacheBytes = Math.max(
+        renderCacheBytes,
+        MIN_TILE_CACHE_MB * BYTES_PER_MB
+    );
+    const tileCacheRef = useRef(null);
+    if (!tileCacheRef.current) {
+        tileCacheRef.current = new PageBitmapCache(tileCacheBytes);
+    }
+
+    useEffect(() => {
+        tileCacheRef.current.setMaxBytes(tileCacheBytes);
+    }, [tileCacheBytes]);
+
+    useEffect(() => () => tileCacheRef.current.clear(), []);
+
+    useEffect(() => {
+        pdfRef.current = null;
+        setDocumentKey(null);
+    }, [data]);
+
+    useLayoutEffect(() => {
+        setCachedPreview(
+            (currentPageKey && renderCacheRef.current.get(currentPageKey)) ||
+                null
+        );
+    }, [currentPageKey]);
+
+    const handlePageRenderSuccess = useCallback(() => {
+        setCachedPreview(null);
+        const canvas = currentPageKey
+            ? containerRef.current?.querySelector('.react-pdf__Page__canvas')
+            : null;
+        if (!canvas) {
+            return;
+        }
+        const cache = renderCacheRef.current;
+        capturePageBitmap(canvas)
+            .then((entry) => cache.set(currentPageKey, entry))
+            .catch(() => {});
+    }, [currentPageKey]);
+
+    useEffect(() => {
+        const pdf = pdfRef.current;
+        if (!canCacheRenders || !pdf || prefetch_pages <= 0) {
+            return undefined;
+        }
+        const cache = renderCacheRef.current;
+        const pending = [];
+        for (let offset = 1; offset <= prefetch_pages; offset++) {
+            pending.push(page_number + offset, page_number - offset);
+        }
+        let cancelled = false;
+        let handle = null;
+
+        // Render one page per idle period so prefetching never competes
+        // with rendering the page being shown
+        const prefetchNext = () => {
+            if (cancelled || pending.length === 0) {
+                return;
+            }
+            const page = pending.shift();
+            const key = pageCacheKey(documentKey, page, scale);
+            if (page < 1 || page > pdf.numPages || cache.has(key)) {
+                prefetchNext();
+                return;
+            }
+            renderPageBitmap(pdf, page, scale)
+                .then((entry) => cache.set(key, entry))
+                .catch(() => {})
+                .then(() => {
+                    if (!cancelled) {
+                        handle = requestIdle(prefetchNext);
+                    }
+                });
+        };
+
+        handle = requestIdle(prefetchNext);
+        return () => {
+            cancelled = true;
+            cancelIdle(handle);
+        };
+    }, [canCacheRenders, documentKey, page_number, scale, prefetch_pages]);
+
+    // Full-text search. The index is built once per document as pages are
+    // searched, and hits are reported in batches while the scan runs so the
+    // first matches show up before the whole document has been read.
+    const searchIndexRef = useRef(null);
+    const [searchHits, setSearchHits] = useState(NO_SEARCH_HITS);
+
+    // Text index of the loaded document, shared by search and annotation
+    // import
+    const getSearchIndex = useCallback(() => {
+        const pdf = pdfRef.current;
+        if (!searchIndexRef.current || searchIndexRef.current.pdf !== pdf) {
+            searchIndexRef.current = new SearchIndex(pdf);
+        }
+        return searchIndexRef.current;
+    }, []);
+    const hasSearchResultsRef = useRef(false);
+
+    // Text of the current page and its neighbours for annotations, extracted
+    // by pdf.js in its worker while the browser is idle. Rectangle text is
+    // looked up there, so it is available right away and does not depend on
+    // the text layer having rendered.
+    useEffect(() => {
+        const pdf = pdfRef.current;
+        if (!pdf || documentKey === null || !enable_annotations) {
+            return undefined;
+        }
+        const index = getSearchIndex();
+        const pending = [page_number];
+        for (let offset = 1; offset <= prefetch_pages; offset++) {
+            pending.push(page_number + offset, page_number - offset);
+        }
+        let cancelled = false;
+        let handle = null;
+
+        // One page per idle period, so that pages with large amounts of
+        // text don't hold up input
+        const indexNext = () => {
+            if (cancelled || pending.length === 0) {
+                return;
+            }
+            const page = pending.shift();
+            if (page < 1 || page > pdf.numPages || index.pages.has(page)) {
+                indexNext();
+                return;
+            }
+            index
+                .indexPage(page)
+                .catch(() => {})
+                .then(() => {
+                    if (!cancelled) {
+                        handle = requestIdle(indexNext);
+                    }
+                });
+        };
+
+        handle = requestIdle(indexNext);
+        return () => {
+            cancelled = true;
+            cancelIdle(handle);
+        };
+    }, [
+        documentKey,
+        page_number,
+        prefetch_pages,
+        enable_annotations,
+        getSearchIndex,
+    ]);
+
+    useEffect(() => {
+        const pdf = pdfRef.current;
+        const query = search_query ? search_query.trim() : '';
+        if (!query || !pdf || documentKey === null) {
+            setSearchHits(NO_SEARCH_HITS);
+            if (hasSearchResultsRef.current) {
+                hasSearchResultsRef.current = false;
+                updateProps({search_results: []});
+            }
+            return undefined;
+        }
+        let cancelled = false;
+        let hits = [];
+        let reportTimer = null;
+        const report = () => {
+            reportTimer = null;
+            hasSearchResultsRef.current = true;
+            setSearchHits(hits);
+            updateProps({
+                search_results: hits.map(({page, rect, snippet}) => ({
+                    page,
+                    rect,
+                    snippet,
+                })),
+            });
+        };
+
+        getSearchIndex()
+            .search(
+                query,
+                (pageHits) => {
+                    hits = hits.concat(pageHits);
+                    if (reportTimer === null) {
+                        reportTimer = setTimeout(report, SEARCH_REPORT_INTERVAL);
+                    }
+                },
+                () => cancelled
+            )
+            .then(() => {
+                if (!cancelled) {
+                    clearTimeout(reportTimer);
+                    report();
+                }
+            })
+            .catch((error) => console.warn('Error searching PDF:', error));
+
+        return () => {
+            cancelled = true;
+            clearTimeout(reportTimer);
+        };
+    }, [search_query, documentKey, getSearchIndex, updateProps]);
+
+    const searchHitsByPage = useMemo(() => {
+        const byPage = new Map();
+        searchHits.forEach((hit) => {
+            const bucket = byPage.get(hit.page);
+            if (bucket) {
+                bucket.push(hit);
+            } else {
+                byPage.set(hit.page, [hit]);
+            }
+        });
+        return byPage;
+    }, [searchHits]);
+
+    // Annotations stored in the PDF, read and converted one page at a time
+    // when the page is first displayed, and shown read-only in the overlay
+    const [importedAnnotations, setImportedAnnotations] = useState({
+        documentKey: null,
+        byPage: NO_IMPORTED_ANNOTATIONS,
+    });
+    const importedPagesRef = useRef({documentKey: null, pages: new Set()});
+    const importedByPage =
+        importedAnnotations.documentKey === documentKey
+            ? importedAnnotations.byPage
+            : NO_IMPORTED_ANNOTATIONS;
+
+    const importPageAnnotations = useCallback(
+        (page) => {
+            if (!pdfRef.current || documentKey === null) {
+                return;
+            }
+            if (importedPagesRef.current.documentKey !== documentKey) {
+                importedPagesRef.current = {documentKey, pages: new Set()};
+            }
+            const {pages} = importedPagesRef.current;
+            if (pages.has(page)) {
+                return;
+            }
+            pages.add(page);
+            readPageAnnotations(pdfRef.current, page, getSearchIndex())
+                .then((imported) => {
+                    // Ignore pages of a document that has been replaced
+                    if (importedPagesRef.current.documentKey !== documentKey) {
+                        return;
+                    }
+                    setImportedAnnotations((current) => ({
+                        documentKey,
+                        byPage: new Map(
+                            current.documentKey === documentKey
+                                ? current.byPage
+                                : undefined
+                        ).set(page, imported),
+                    }));
+                })
+                .catch((error) =>
+                    console.warn('Error importing PDF annotations:', error)
+                );
+        },
+        [documentKey, getSearchIndex]
+    );
+
+    useEffect(() => {
+        if (!import_annotations || importedByPage.size === 0) {
+            return undefined;
+        }
+        const timer = setTimeout(
+            () =>
+                updateProps({
+                    imported_annotations: Array.from(
+                        importedByPage.values()
+                    ).flat(),
+                }),
+            PAGE_REPORT_INTERVAL
+        );
+        return () => clearTimeout(timer);
+    }, [import_annotations, importedByPage, updateProps]);
+
+    const extractTextFromRectangle = useCallback(
+        (x, y, width, height, page = page_number) => {
+            try {
+                const searchIndex = searchIndexRef.current;
+                if (
+                    searchIndex &&
+                    searchIndex.pdf === pdfRef.current &&
+                    searchIndex.pages.has(page)
+                ) {
+                    return searchIndex.textInRect(page, {
+                        x: Math.min(x, x + width),
+                        y: Math.min(y, y + height),
+                        width: Math.abs(width),
+                        height: Math.abs(height),
+                    });
+                }
+                // Not extracted yet: measure the text layer instead
+                const indexes = textIndexesRef.current;
+                let index = indexes.get(page);
+                if (!index) {
+                    index = buildTextIndex(getPageElement(page), scale);
+                    if (!index) {
+                        return '';
+                    }
+                    indexes.set(page, index);
+                    if (indexes.size > TEXT_INDEX_CACHE_SIZE) {
+                        indexes.delete(indexes.keys().next().value);
+                    }
+                }
+                return queryTextIndex(index, x, y, width, height);
+            } catch (error) {
+                console.warn('Error extracting text from rectangle:', error);
+                return '';
+            }
+        },
+        [scale, page_number, getPageElement]
+    );
+
+    // Drawing handlers for rectangle tool
+    const handleMouseDown = useCallback(
+        (e) => {
+            if (
+                !isAnnotationToolActive ||
+                selected_annotation_tool === 'highlight' ||
+                selected_annotation_tool === 'none' ||
+                selected_annotation_tool === 'comment' ||
+                e.target.closest('.annotation-comment, .annotation-rectangle')
+            ) {
+                return;
+            }
+
+            const page = getPageForNode(e.target);
+            if (!page) {
+                return;
+            }
+            const {x, y} = getRelativePosition(e, page);
+
+            // Handle rectangle tool with drag
+            setIsDrawing(true);
+
+            const newAnnotation = createAnnotation({
+                type: selected_annotation_tool,
+                page,
+                x,
+                y,
+                width: 0,
+                height: 0,
+            });
+
+            setCurrentAnnotation(newAnnotation);
+        },
+        [
+            isAnnotationToolActive,
+            selected_annotation_tool,
+            getPageForNode,
+            getRelativePosition,
+            createAnnotation,
+        ]
+    );
+
+    const handleMouseMove = useCallback(
+        (e) => {
+            if (
+                !isDrawing ||
+                !currentAnnotation ||
+                selected_annotation_tool === 'highlight' ||
+                selected_annotation_tool === 'none' ||
+                selected_annotation_tool === 'comment' ||
+                isTextSelecting
+            ) {
+                return;
+            }
+
+            const {x, y} = getRelativePosition(e, currentAnnotation.page);
+            setCurrentAnnotation((prev) => ({
+                ...prev,
+                width: x - prev.x,
+                height: y - prev.y,
+            }));
+        },
+        [
+            isDrawing,
+            currentAnnotation,
+            selected_annotation_tool,
+            isTextSelecting,
+            getRelativePosition,
+        ]
+    );
+
+    const handleMouseUp = useCallback(() => {
+        if (
+            selected_annotation_tool === 'highlight' ||
+            selected_annotation_tool === 'none' ||
+            selected_annotation_tool === 'comment' ||
+            isTextSelecting
+        ) {
+            return;
+        }
+
+        if (isDrawing && currentAnnotation) {
+            const draggedDistance = Math.sqrt(
+                Math.pow(currentAnnotation.width, 2) +
+                    Math.pow(currentAnnotation.height, 2)
+            );
+
+            if (draggedDistance >= MIN_DRAG_DISTANCE) {
+                // Extract text from the rectangle area for rectangle annotations
+                let annotationWithText = currentAnnotation;
+                if (selected_annotation_tool === 'rectangle') {
+                    const extractedText = extractTextFromRectangle(
+                        currentAnnotation.x,
+                        currentAnnotation.y,
+                        currentAnnotation.width,
+                        currentAnnotation.height,
+                        currentAnnotation.page
+                    );
+                    annotationWithText = {
+                        ...currentAnnotation,
+                        selected_text: extractedText,
+                    };
+                }
+
+                addAnnotation(annotationWithText);
+            }
+
+            setCurrentAnnotation(null);
+        }
+        setIsDrawing(false);
+    }, [
+        isDrawing,
+        currentAnnotation,
+        selected_annotation_tool,
+        isTextSelecting,
+        addAnnotation,
+        extractTextFromRectangle,
+    ]);
+
+    // Get appropriate mouse handlers based on selected tool and pan state
+    const getMouseHandlers = useCallback(() => {
+        // Pan handlers take priority when no annotation tool is active
+        if (!isAnnotationToolActive && enable_pan && !isContinuous) {
+            return {
+                onMouseDown: handlePanStart,
+                onMouseMove: handlePanMove,
+                onMouseUp: handlePanEnd,
+                onMouseLeave: handlePanEnd,
+            };
+        }
+
+        // Annotation handlers
+        if (isAnnotationToolActive && selected_annotation_tool !== 'none') {
+            switch (selected_annotation_tool) {
+                case 'highlight':
+                    return {};
+                case 'comment':
+                    return {
+                        onDoubleClick: handleDoubleClick,
+                    };
+                default:
+                    return {
+                        onMouseDown: handleMouseDown,
+                        onMouseMove: handleMouseMove,
+                        onMouseUp: handleMouseUp,
+                    };
+            }
+        }
+
+        return {};
+    }, [
+        isAnnotationToolActive,
+        enable_pan,
+        isContinuous,
+        selected_annotation_tool,
+        handlePanStart,
+        handlePanMove,
+        handlePanEnd,
+        handleDoubleClick,
+        handleMouseDown,
+        handleMouseMove,
+        handleMouseUp,
+    ]);
+
+    const mouseHandlers = getMouseHandlers();
+
+    // Annotation handlers object
+    const annotationHandlers = {
+        onDelete: deleteAnnotation,
+        onUpdate: updateAnnotation,
+        onExtractText: extractTextFromRectangle,
+        onSelect: handleAnnotationSelect,
+        selectedAnnotationTool: selected_annotation_tool,
+        selectedAnnotation: selected_annotation,
+        liveUpdateInterval: live_update_interval,
+        metrics: metricsRef.current,
+    };
+
+    // Imported annotations can be selected but not edited
+    const importedAnnotationHandlers = {
+        onDelete: ignoreEdit,
+        onUpdate: ignoreEdit,
+        onExtractText: ignoreEdit,
+        onSelect: handleAnnotationSelect,
+        selectedAnnotationTool: 'none',
+        selectedAnnotation: selected_annotation,
+        liveUpdateInterval: 0,
+        metrics: metricsRef.current,
+    };
+
+    const renderImportedAnnotations = (page) => {
+        const own = annotationsByPage.get(page) || NO_ANNOTATIONS;
+        return (importedByPage.get(page) || NO_ANNOTATIONS)
+            .filter((imported) => !own.some((a) => a.id === imported.id))
+            .map((imported) =>
+                createAnnotationComponent(
+                    imported,
+                    importedAnnotationHandlers,
+                    scale
+                )
+            );
+    };
+
+    // Metrics are sent in batches, once per `metrics_interval`, together
+    // with estimates of the memory used by the viewer
+    useEffect(() => {
+        if (!collect_metrics || !setProps) {
+            return undefined;
+        }
+        const timer = setInterval(() => {
+            const metrics = metricsRef.current;
+            if (!metrics) {
+                return;
+            }
+            metrics.gauge('render_cache_bytes', renderCacheRef.current.bytes);
+            const heap = heapSize();
+            if (heap !== null) {
+                metrics.gauge('js_heap_bytes', heap);
+            }
+            const batch = metrics.flush();
+            if (batch) {
+                setProps({metrics: batch});
+            }
+        }, Math.max(metrics_interval, PAGE_REPORT_INTERVAL));
+        return () => clearInterval(timer);
+    }, [collect_metrics, metrics_interval, setProps]);
+
+    // Annotations and drawing preview for a single page
+    const renderPageOverlay = (page) => {
+        const pageAnnotations = enable_annotations
+            ? annotationsByPage.get(page) || NO_ANNOTATIONS
+            : NO_ANNOTATIONS;
+        return renderPageLayers(page, pageAnnotations);
+    };
+
+    const renderPageLayers = (page, pageAnnotations) => (
+        <>
+            {/* Search hits */}
+            {(searchHitsByPage.get(page) || NO_SEARCH_HITS).map((hit, i) =>
+                hit.rects.map((rect, j) => (
+                    <div
+                        key={`search-${i}-${j}`}
+                        className="pdf-search-hit"
+                        style={{
+                            left: rect.x * scale,
+                            top: rect.y * scale,
+                            width: rect.width * scale,
+                            height: rect.height * scale,
+                        }}
+                    />
+                ))
+            )}
+
+            {/* Annotations stored in the PDF */}
+            {import_annotations && (
+                <PageAnnotationImport
+                    page={page}
+                    onImport={importPageAnnotations}
+                />
+            )}
+            {import_annotations && renderImportedAnnotations(page)}
+
+            {/* Render existing annotations */}
+            {pageAnnotations.map((annotation) =>
+                createAnnotationComponent(annotation, annotationHandlers, scale)
+            )}
+
+            {/* Current drawing annotation preview */}
+            {isAnnotationToolActive &&
+                currentAnnotation &&
+                currentAnnotation.page === page &&
+                selected_annotation_tool !== 'highlight' &&
+                selected_annotation_tool !== 'none' &&
+                selected_annotation_tool !== 'comment' && (
+                    <DrawingPreview
+                        currentAnnotation={currentAnnotation}
+                        scale={scale}
+                    />
+                )}
+        </>
+    );
+
+    const isPanEnabled = enable_pan && !isAnnotationToolActive && !isContinuous;
+
+    return (
+        <div
+            id={id}
+            className="dash-pdf-container"
+            style={isContinuous ? {height: '100%'} : undefined}
+        >
+            <div
+                style={{
+                    display: 'flex',
+                    height: isContinuous ? '100%' : undefined,
+                }}
+            >
+                {thumbnails && numPages > 0 && (
+                    <ThumbnailStrip
+                        thumbnails={thumbnails}
+                        numPages={numPages}
+                        pageNumber={page_number}
+                        onSelect={handleThumbnailSelect}
+                    />
+                )}
+                <div style={{flex: 1, minWidth: 0}}>
+                    <div
+                        ref={containerRef}
+                        className={`pdf-container ${
+                            selected_annotation_tool === 'highlight'
+                                ? 'highlight-mode'
+                                : ''
+                        } ${isPanEnabled ? 'pan-enabled' : ''} ${
+                            isContinuous ? 'pdf-continuous' : ''
+                        }`}
+                        style={{
+                            position: 'relative',
+                            display: isContinuous ? 'block' : 'inline-block',
+                            userSelect:
+                                selected_annotation_tool === 'highlight'
+                                    ? 'text'
+                                    : 'none',
+                            cursor: isPanning
+                                ? 'grabbing'
+                                : isPanEnabled
+                                ? 'grab'
+                                : selected_annotation_tool === 'none'
+                                ? 'default'
+                                : 'auto',
+                            ...(isContinuous
+                                ? {
+                                      height: '100%',
+                                      maxHeight: '100vh',
+                                      overflowY: 'auto',
+                                  }
+                                : {
+                                      transform: `translate(${panOffset.x}px, ${panOffset.y}px)`,
+                                      transformOrigin: '0 0',
+                                      willChange: 'transform',
+                                  }),
+                        }}
+                        {...mouseHandlers}
+                    >
+                        <div className="react-pdf__Document">
+                            {!pdf ? (
+                                <div className="react-pdf__message">
+                                    {loadError || missingDocument
+                                        ? 'Failed to load PDF file.'
+                                        : 'Loading PDF…'}
+                                </div>
+                            ) : isContinuous ? (
+                                numPages > 0 && (
+                                    <ContinuousPages
+                                        pdf={pdf}
+                                        numPages={numPages}
+                                        scale={scale}
+                                        pageNumber={page_number}
+                                        defaultPageSize={defaultPageSize}
+                                        scrollerRef={containerRef}
+                                        onPageChange={
+                                            handleContinuousPageChange
+                                        }
+                                        renderOverlay={renderPageOverlay}
+                                        onTextLayerRendered={
+                                            handleTextLayerRendered
+                                        }
+                                        onPageLoad={handlePageLoad}
+                                        onPageRendered={handlePageRendered}
+                                        renderTextLayer={renderTextLayer}
+                                    />
+                                )
+                            ) : isTiled ? (
+                                <TiledPage
+                                    pdf={pdf}
+                                    documentKey={documentKey}
+                                    pageNumber={page_number}
+                                    scale={scale}
+                                    tileSize={tile_size}
+                                    cache={tileCacheRef.current}
+                                    panOffset={panOffset}
+                                    onTilesRendered={handleTilesRendered}
+                                >
+                                    <Page
+                                        pdf={pdf}
+                                        pageNumber={page_number}
+                                        scale={scale}
+                                        renderMode="none"
+                                        renderTextLayer={renderTextLayer}
+                                        renderAnnotationLayer={false}
+                                        onLoadSuccess={handlePageLoad}
+                                        onRenderTextLayerSuccess={() =>
+                                            handleTextLayerRendered(page_number)
+                                        }
+                                    />
+                                </TiledPage>
+                            ) : (
+                                <Page
+                                    pdf={pdf}
+                                    pageNumber={page_number}
+                                    scale={scale}
+                                    renderTextLayer={renderTextLayer}
+                                    renderAnnotationLayer={false}
+                                    onLoadSuccess={handlePageLoad}
+                                    onRenderSuccess={() => {
+                                        handlePageRenderSuccess();
+                                        handlePageRendered(page_number);
+                                    }}
+                                    onRenderTextLayerSuccess={() =>
+                                        handleTextLayerRendered(page_number)
+                                    }
+                                />
+                            )}
+                        </div>
+
+                        {!isContinuous && (
+                            <CachedPagePreview entry={cachedPreview} />
+                        )}
+
+                        {!isContinuous && renderPageOverlay(page_number)}
+                    </div>
+                </div>
+            </div>
+        </div>
+    );
+};
+
+_DashPdf.propTypes = propTypes;
+
+export default _DashPdf;
@@ -0,0 +1,142 @@
+// Live annotation sync with the other viewers of a document.
+//
+// Local edits are queued and posted to the server once per animation frame;
+// the server answers with the resulting state of each edited annotation and
+// broadcasts it to the other viewers, whose edits arrive through an
+// EventSource. Each state is `{id, annotation}`, with `annotation` null once
+// the annotation is deleted, and `rejected` set when the server refused an
+// edit of this viewer.
+
+/**
+ * Merge annotation states into `annotations`. States older than the local
+ * version of an annotation are skipped, as are states of the same version
+ * unless `own` is set (the server's answer to this viewer's edits).
+ * Rejected edits are always rolled back to the server's state.
+ */
+export const mergeAnnotationStates = (annotations, states, own = false) => {
+    const versions = new Map(annotations.map((a) => [a.id, a.version || 1]));
+    const updated = new Map();
+    states.forEach(({id, annotation, rejected}) => {
+        const local = versions.get(id);
+        const remote = annotation ? annotation.version || 1 : Infinity;
+        const newer = own ? remote >= local : remote > local;
+        if (local === undefined ? annotation : rejected || newer) {
+            updated.set(id, annotation);
+        }
+    });
+    if (updated.size === 0) {
+        return annotations;
+    }
+    const merged = [];
+    annotations.forEach((annotation) => {
+        if (!updated.has(annotation.id)) {
+            merged.push(annotation);
+        } else if (updated.get(annotation.id)) {
+            merged.push(updated.get(annotation.id));
+        }
+        updated.delete(annotation.id);
+    });
+    updated.forEach((annotation) => {
+        if (annotation) {
+            merged.push(annotation);
+        }
+    });
+    return merged;
+};
+
+/**
+ * Drop the states in `entries` that `annotations` has caught up with.
+ * `entries` maps ids to `{state, own, version}`, `version` being the local
+ * version of the annotation when the state was merged. Annotation states
+ * apply until `annotations` has their version, deletions until it no
+ * longer has the annotation or has a newer version of it, and rejected
+ * edits are rolled back until `annotations` has a version newer than the
+ * rejected one. Returns `entries` itself when nothing is dropped.
+ */
+export const pendingSyncStates = (entries, annotations) => {
+    const versions = new Map(annotations.map((a) => [a.id, a.version || 1]));
+    let pending = entries;
+    entries.forEach(({state, version}, id) => {
+        const local = versions.get(id);
+        let current;
+        if (local === undefined) {
+            current = Boolean(state.annotation);
+        } else if (state.rejected || !state.annotation) {
+            current = local <= version;
+        } else {
+            current = local < (state.annotation.version || 1);
+        }
+        if (!current) {
+            if (pending === entries) {
+                pending = new Map(entries);
+            }
+            pending.delete(id);
+        }
+    });
+    return pending;
+};
+
+export class AnnotationSync {
+    /**
+     * Sync the annotations of the document at `url` (the sync route of the
+     * document). `onStates(states, own)` is called with the annotation
+     * states to merge: those edited by other viewers, and the server's
+     * answer to this viewer's own edits (`own` set).
+     */
+    constructor(url, session, onStates) {
+        this.url = url;
+        this.session = session;
+        this.onStates = onStates;
+        this.queue = [];
+        this.frame = null;
+        this.events = new EventSource(`${url}/events`);
+        this.events.onmessage = ({data}) => {
+            const message = JSON.parse(data);
+            if (message.session !== this.session) {
+                this.onStates(message.changes, false);
+            }
+        };
+    }
+
+    /**
+     * Queue an edit `{op, id, version, patch, annotation, updated_at}`.
+     */
+    push(change) {
+        this.queue.push(change);
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => this.flush());
+        }
+    }
+
+    flush() {
+        this.frame = null;
+        if (this.queue.length === 0) {
+            return;
+        }
+        const changes = this.queue;
+        this.queue = [];
+        fetch(this.url, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({session: this.session, changes}),
+        })
+            .then((response) => {
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                return response.json();
+            })
+            .then((result) => this.onStates(result.changes, true))
+            .catch((error) =>
+                console.warn('Could not sync annotations:', error)
+            );
+    }
+
+    close() {
+        if (this.frame !== null) {
+            cancelAnimationFrame(this.frame);
+            this.flush();
+        }
+        this.events.close();
+    }
+}
@@ -0,0 +1,65 @@
+// Loading a document in fixed-size chunks through a PDFDataRangeTransport.
+//
+// The first chunk is fetched up front and handed to pdf.js as initial data;
+// every further range pdf.js asks for is fetched with an HTTP Range request
+// and passed straight on, so the document is never held as one buffer on
+// the main thread.
+
+import {pdfjs} from 'react-pdf';
+
+const CONTENT_RANGE_TOTAL = /\/(\d+)\s*$/;
+
+const fetchRange = (url, begin, end, signal) =>
+    fetch(url, {
+        headers: {Range: `bytes=${begin}-${end - 1}`},
+        credentials: 'same-origin',
+        signal,
+    }).then((response) => {
+        if (!response.ok) {
+            throw new Error(
+                `Failed to fetch bytes ${begin}-${end - 1} of ${url}: ${response.status}`
+            );
+        }
+        return response;
+    });
+
+/**
+ * Create a pdf.js source for `url` that loads it in chunks of `chunkSize`
+ * bytes. Resolves to `{range}` for react-pdf's `file`, or to `{data}` when
+ * the whole document came back in the first response.
+ */
+export const createChunkedSource = async (url, chunkSize) => {
+    const controller = new AbortController();
+    const first = await fetchRange(url, 0, chunkSize, controller.signal);
+    const match = CONTENT_RANGE_TOTAL.exec(
+        first.headers.get('Content-Range') || ''
+    );
+    const initialData = new Uint8Array(await first.arrayBuffer());
+    const length = match ? Number(match[1]) : initialData.length;
+    if (first.status !== 206 || initialData.length >= length) {
+        return {data: initialData};
+    }
+
+    const transport = new pdfjs.PDFDataRangeTransport(length, initialData);
+    let loaded = initialData.length;
+    transport.requestDataRange = (begin, end) => {
+        fetchRange(url, begin, end, controller.signal)
+            .then((response) => response.arrayBuffer())
+            .then((buffer) => {
+                loaded = Math.min(length, loaded + buffer.byteLength);
+                transport.onDataProgress(loaded, length);
+                transport.onDataRange(begin, new Uint8Array(buffer));
+            })
+            .catch((error) => {
+                if (error.name !== 'AbortError') {
+                    console.error('Error loading PDF range:', error);
+                }
+            });
+    };
+    const abort = transport.abort.bind(transport);
+    transport.abort = () => {
+        controller.abort();
+        abort();
+    };
+    return {range: transport};
+};
@@ -0,0 +1,68 @@
+// Decoding of annotation batches built by `annotations.from_arrays` on the
+// server.
+//
+// A batch holds `count` annotations as columns instead of one object each:
+// `page` as base64 little-endian uint32 and `x`, `y`, `width` and `height`
+// as float32, other columns (ids, selected text...) as plain arrays, and
+// the values shared by all annotations in `fields`.
+
+export const COLUMNAR_FORMAT = 'dash-pdf-columnar';
+
+const BINARY_COLUMNS = {
+    page: (view, i) => view.getUint32(i * 4, true),
+    x: (view, i) => view.getFloat32(i * 4, true),
+    y: (view, i) => view.getFloat32(i * 4, true),
+    width: (view, i) => view.getFloat32(i * 4, true),
+    height: (view, i) => view.getFloat32(i * 4, true),
+};
+
+const decodeBase64 = (data) => {
+    const text = atob(data);
+    const bytes = new Uint8Array(text.length);
+    for (let i = 0; i < text.length; i++) {
+        bytes[i] = text.charCodeAt(i);
+    }
+    return new DataView(bytes.buffer);
+};
+
+/**
+ * Whether `annotations` is a columnar batch rather than an array.
+ */
+export const isColumnar = (annotations) =>
+    Boolean(annotations) && annotations.format === COLUMNAR_FORMAT;
+
+/**
+ * Expand the `annotations` prop into an array of annotation objects.
+ * Arrays are returned as they are.
+ */
+export const decodeAnnotations = (annotations) => {
+    if (!isColumnar(annotations)) {
+        return annotations;
+    }
+    const {count, columns = {}, fields = {}, id_prefix: idPrefix} = annotations;
+    // Float32 values are rounded back to the precision they were sent with
+    const precision = 10 ** (annotations.decimals ?? 2);
+    const decoded = Object.entries(columns).map(([name, data]) => {
+        const read = BINARY_COLUMNS[name];
+        if (!read) {
+            return [name, (i) => data[i]];
+        }
+        const view = decodeBase64(data);
+        return name === 'page'
+            ? [name, (i) => read(view, i)]
+            : [name, (i) => Math.round(read(view, i) * precision) / precision];
+    });
+
+    const result = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const annotation = {...fields};
+        if (idPrefix !== undefined) {
+            annotation.id = `${idPrefix}${i}`;
+        }
+        decoded.forEach(([name, value]) => {
+            annotation[name] = value(i);
+        });
+        result[i] = annotation;
+    }
+    return result;
+};
@@ -0,0 +1,141 @@
+// Decoding and hashing of inline documents off the main thread.
+//
+// Documents passed as data URIs are decoded and hashed with SHA-256 in a
+// Web Worker, which hands the decoded bytes back without copying them. The
+// hash identifies the document in the shared and persistent caches. Where
+// workers cannot be started (e.g. under a strict CSP), the same is done on
+// the main thread.
+
+/**
+ * Bytes of a data URI, or a Uint8Array view of binary data. Self-contained,
+ * as the worker runs it too.
+ */
+export const toBytes = (source) => {
+    if (typeof source !== 'string') {
+        return new Uint8Array(source);
+    }
+    const comma = source.indexOf(',');
+    const header = source.slice(0, comma);
+    const payload = source.slice(comma + 1);
+    const text = header.endsWith(';base64')
+        ? atob(payload)
+        : decodeURIComponent(payload);
+    const bytes = new Uint8Array(text.length);
+    for (let i = 0; i < text.length; i++) {
+        bytes[i] = text.charCodeAt(i);
+    }
+    return bytes;
+};
+
+/**
+ * Hex string of the bytes in `buffer`. Self-contained, as the worker runs
+ * it too.
+ */
+export const toHex = (buffer) =>
+    Array.from(new Uint8Array(buffer))
+        .map((b) => b.toString(16).padStart(2, '0'))
+        .join('');
+
+// The worker runs the same (self-contained) functions
+const WORKER_SOURCE = `
+const toBytes = ${toBytes};
+const toHex = ${toHex};
+
+self.onmessage = async ({data: {id, source}}) => {
+    try {
+        const bytes = toBytes(source);
+        const hash = toHex(await crypto.subtle.digest('SHA-256', bytes));
+        self.postMessage({id, hash, bytes}, [bytes.buffer]);
+    } catch (error) {
+        self.postMessage({id, error: String(error)});
+    }
+};
+`;
+
+let worker = null;
+let requestCount = 0;
+const pending = new Map();
+
+const hashOnMainThread = async (source) => {
+    const bytes = toBytes(source);
+    const hash = toHex(await crypto.subtle.digest('SHA-256', bytes));
+    return {key: `sha256:${hash}`, bytes};
+};
+
+// A copy of the document to send to the worker, whose buffer can be
+// transferred without detaching the caller's data
+const toMessage = (source) => {
+    if (ArrayBuffer.isView(source)) {
+        return new Uint8Array(
+            source.buffer,
+            source.byteOffset,
+            source.byteLength
+        ).slice().buffer;
+    }
+    return source instanceof ArrayBuffer ? source.slice(0) : source;
+};
+
+const startWorker = () => {
+    if (worker !== null) {
+        return worker;
+    }
+    worker = false;
+    try {
+        const url = URL.createObjectURL(
+            new Blob([WORKER_SOURCE], {type: 'text/javascript'})
+        );
+        worker = new Worker(url);
+        URL.revokeObjectURL(url);
+    } catch (error) {
+        return worker;
+    }
+    worker.onmessage = ({data: {id, hash, bytes, error}}) => {
+        const {resolve, reject} = pending.get(id);
+        pending.delete(id);
+        if (error) {
+            reject(new Error(error));
+        } else {
+            resolve({key: `sha256:${hash}`, bytes});
+        }
+    };
+    // The worker may fail to load (e.g. when blocked by a CSP); hash what
+    // it was sent on the main thread from then on
+    worker.onerror = () => {
+        worker.terminate();
+        worker = false;
+        pending.forEach(({source, resolve, reject}) =>
+            hashOnMainThread(toMessage(source)).then(resolve, reject)
+        );
+        pending.clear();
+    };
+    return worker;
+};
+
+/**
+ * Whether `source` is an inline document: a data URI or binary data.
+ */
+export const isInlineDocument = (source) =>
+    (typeof source === 'string' && source.startsWith('data:')) ||
+    source instanceof ArrayBuffer ||
+    ArrayBuffer.isView(source);
+
+/**
+ * Decode and hash an inline document. Resolves to `{key, bytes}`, where
+ * `key` is `sha256:<hex digest>` and `bytes` a Uint8Array of the document.
+ */
+export const hashDocument = (source) => {
+    const message = toMessage(source);
+    const target = startWorker();
+    if (!target) {
+        return hashOnMainThread(message);
+    }
+    requestCount += 1;
+    const id = requestCount;
+    return new Promise((resolve, reject) => {
+        pending.set(id, {source, resolve, reject});
+        target.postMessage(
+            {id, source: message},
+            typeof message === 'string' ? [] : [message]
+        );
+    });
+};
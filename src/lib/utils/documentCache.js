@@ -0,0 +1,260 @@
+// Documents shared between viewers, and the pdf.js workers that parse them.
+//
+// Viewers showing the same source share one PDFDocumentProxy: documents are
+// keyed by URL or by a hash of their bytes and reference counted, and only
+// destroyed a little while after the last viewer releases them, together
+// with the range transport they were loaded through, if any. Documents
+// are spread over a bounded pool of PDFWorkers so that different documents
+// parse in parallel without starting a worker per viewer.
+
+import {useEffect, useRef, useState} from 'react';
+import {pdfjs} from 'react-pdf';
+
+import {createChunkedSource} from './chunkedTransport';
+import {toBytes, toHex} from './contentHash';
+
+const RELEASE_DELAY = 2000;
+const DEFAULT_POOL_SIZE = 4;
+
+const documents = new Map();
+const workers = [];
+const objectKeys = new WeakMap();
+let objectCount = 0;
+
+const isBinary = (file) =>
+    file instanceof ArrayBuffer || ArrayBuffer.isView(file);
+
+/**
+ * Source for a document at `url` loaded in chunks of `chunkSize` bytes. The
+ * range transport behind it belongs to the shared document: it is only
+ * created when the document is not cached yet, and aborted when the
+ * document is destroyed.
+ */
+export const chunkedFile = (url, chunkSize) => ({
+    chunked: true,
+    url,
+    chunkSize,
+});
+
+const isChunkedFile = (file) =>
+    Boolean(file) && typeof file === 'object' && file.chunked === true;
+
+const identityKey = (file) => {
+    if (!objectKeys.has(file)) {
+        objectCount += 1;
+        objectKeys.set(file, `object:${objectCount}`);
+    }
+    return objectKeys.get(file);
+};
+
+/**
+ * Key identifying the document behind `file`: the URL for strings, a
+ * SHA-256 of the bytes for binary data, and the object identity otherwise
+ * (e.g. for range transports).
+ */
+export const sourceKey = async (file) => {
+    if (typeof file === 'string') {
+        return `url:${file}`;
+    }
+    if (isChunkedFile(file)) {
+        return `url:${file.url}`;
+    }
+    if (isBinary(file) && typeof crypto !== 'undefined' && crypto.subtle) {
+        return `sha256:${toHex(await crypto.subtle.digest('SHA-256', file))}`;
+    }
+    return identityKey(file);
+};
+
+// getDocument() parameters for a `data` prop value. Binary data is copied
+// because pdf.js transfers it to the worker.
+const documentSource = (file) => {
+    if (typeof file === 'string') {
+        return file.startsWith('data:')
+            ? {data: toBytes(file)}
+            : {url: file};
+    }
+    if (file instanceof ArrayBuffer) {
+        return {data: new Uint8Array(file.slice(0))};
+    }
+    if (ArrayBuffer.isView(file)) {
+        return {data: new Uint8Array(file)};
+    }
+    return {...file};
+};
+
+const acquireWorker = (poolSize) => {
+    if (workers.length < poolSize) {
+        workers.push({
+            worker: new pdfjs.PDFWorker({name: `dash-pdf-${workers.length}`}),
+            documents: 0,
+        });
+    }
+    const slot = workers
+        .slice(0, poolSize)
+        .reduce((least, other) =>
+            other.documents < least.documents ? other : least
+        );
+    slot.documents += 1;
+    return slot;
+};
+
+// Destroy a document and abort the range transport it was loaded through
+const closeDocument = (key, entry) => {
+    if (documents.get(key) === entry) {
+        documents.delete(key);
+    }
+    if (entry.closed) {
+        return;
+    }
+    entry.closed = true;
+    entry.slot.documents -= 1;
+    if (entry.loadingTask) {
+        entry.loadingTask.destroy();
+    }
+    if (entry.range) {
+        entry.range.abort();
+    }
+};
+
+const openDocument = (key, file, options, poolSize) => {
+    const entry = {
+        key,
+        refs: 0,
+        slot: acquireWorker(poolSize),
+        loadingTask: null,
+        range: null,
+        closed: false,
+        promise: null,
+        listeners: new Set(),
+        releaseTimer: null,
+    };
+    const source = isChunkedFile(file)
+        ? createChunkedSource(file.url, file.chunkSize).then((created) => {
+              entry.range = created.range || null;
+              return created;
+          })
+        : Promise.resolve(documentSource(file));
+    entry.promise = source.then((params) => {
+        if (entry.closed) {
+            if (params.range) {
+                params.range.abort();
+            }
+            return null;
+        }
+        entry.loadingTask = pdfjs.getDocument({
+            ...options,
+            ...params,
+            worker: entry.slot.worker,
+        });
+        entry.loadingTask.onProgress = (progress) =>
+            entry.listeners.forEach((listener) => listener(progress));
+        return entry.loadingTask.promise;
+    });
+    // Drop failed loads right away so that the next viewer retries
+    entry.promise.catch(() => closeDocument(key, entry));
+    documents.set(key, entry);
+    return entry;
+};
+
+/**
+ * Acquire the shared document for `file`. Returns `{promise, release}`;
+ * `onProgress` receives pdf.js load progress while the document loads.
+ * `key` identifies the document when it is already known (e.g. a content
+ * hash), instead of deriving it from `file`.
+ */
+export const acquireDocument = (file, options, poolSize, onProgress, key) => {
+    let entry = null;
+    let released = false;
+
+    const documentKey = key ? Promise.resolve(key) : sourceKey(file);
+    const promise = documentKey.then((documentKey) => {
+        if (released) {
+            return null;
+        }
+        const cacheKey = `${documentKey}|${JSON.stringify(options || {})}`;
+        entry = documents.get(cacheKey);
+        if (!entry) {
+            entry = openDocument(
+                cacheKey,
+                file,
+                options,
+                Math.max(1, poolSize || DEFAULT_POOL_SIZE)
+            );
+        }
+        clearTimeout(entry.releaseTimer);
+        entry.refs += 1;
+        if (onProgress) {
+            entry.listeners.add(onProgress);
+        }
+        return entry.promise;
+    });
+
+    const release = () => {
+        released = true;
+        if (!entry) {
+            return;
+        }
+        const current = entry;
+        entry = null;
+        current.listeners.delete(onProgress);
+        current.refs -= 1;
+        if (current.refs === 0) {
+            current.releaseTimer = setTimeout(() => {
+                if (current.refs === 0) {
+                    closeDocument(current.key, current);
+                }
+            }, RELEASE_DELAY);
+        }
+    };
+
+    return {promise, release};
+};
+
+/**
+ * Load `file` through the shared document cache. Returns `{pdf, error}`.
+ */
+export const useSharedDocument = (
+    file,
+    options,
+    poolSize,
+    onProgress,
+    key = null
+) => {
+    const [state, setState] = useState({pdf: null, error: null});
+    const onProgressRef = useRef(onProgress);
+    onProgressRef.current = onProgress;
+
+    useEffect(() => {
+        setState({pdf: null, error: null});
+        if (!file) {
+            return undefined;
+        }
+        let active = true;
+        const handle = acquireDocument(
+            file,
+            options,
+            poolSize,
+            (progress) =>
+                onProgressRef.current ? onProgressRef.current(progress) : null,
+            key
+        );
+        handle.promise.then(
+            (pdf) => {
+                if (active && pdf) {
+                    setState({pdf, error: null});
+                }
+            },
+            (error) => {
+                if (active) {
+                    setState({pdf: null, error});
+                }
+            }
+        );
+        return () => {
+            active = false;
+            handle.release();
+        };
+    }, [file, options, poolSize, key]);
+
+    return state;
+};
@@ -0,0 +1,114 @@
+// Persistent browser-side store of recently opened documents.
+//
+// Document bytes are kept in IndexedDB under a document key, next to a
+// record of their size and last use. Reopening a stored document (e.g.
+// going back in a review queue) skips the network transfer, and the server
+// can leave `data` out altogether for keys the browser reports as stored.
+// The store is bounded by a byte quota and evicts the least recently used
+// documents first.
+
+const DB_NAME = 'dash-pdf';
+const DB_VERSION = 1;
+const DOCUMENTS = 'documents';
+const USAGE = 'usage';
+
+const requestResult = (request) =>
+    new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+
+const transactionDone = (transaction) =>
+    new Promise((resolve, reject) => {
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+    });
+
+let database = null;
+
+const openDatabase = () => {
+    if (database === null) {
+        if (typeof indexedDB === 'undefined') {
+            database = Promise.reject(new Error('IndexedDB is unavailable'));
+        } else {
+            const request = indexedDB.open(DB_NAME, DB_VERSION);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                db.createObjectStore(DOCUMENTS);
+                db.createObjectStore(USAGE, {keyPath: 'key'}).createIndex(
+                    'lastUsed',
+                    'lastUsed'
+                );
+            };
+            database = requestResult(request);
+        }
+    }
+    return database;
+};
+
+/**
+ * Whether documents can be stored in this browser.
+ */
+export const canStoreDocuments = () => typeof indexedDB !== 'undefined';
+
+/**
+ * Bytes of the stored document `key` as a Uint8Array, or null. Marks the
+ * document as recently used.
+ */
+export const getStoredDocument = async (key) => {
+    const db = await openDatabase();
+    const transaction = db.transaction([DOCUMENTS, USAGE], 'readwrite');
+    const bytes = await requestResult(
+        transaction.objectStore(DOCUMENTS).get(key)
+    );
+    if (bytes) {
+        transaction
+            .objectStore(USAGE)
+            .put({key, size: bytes.byteLength, lastUsed: Date.now()});
+    }
+    await transactionDone(transaction);
+    return bytes || null;
+};
+
+/**
+ * Store the document `key`, then evict the least recently used documents
+ * until the store fits in `maxBytes`. Documents larger than `maxBytes` are
+ * not stored. Resolves to the keys of the stored documents.
+ */
+export const storeDocument = async (key, bytes, maxBytes) => {
+    const db = await openDatabase();
+    const transaction = db.transaction([DOCUMENTS, USAGE], 'readwrite');
+    const documents = transaction.objectStore(DOCUMENTS);
+    const usage = transaction.objectStore(USAGE);
+    if (bytes.byteLength <= maxBytes) {
+        documents.put(bytes, key);
+        usage.put({key, size: bytes.byteLength, lastUsed: Date.now()});
+    }
+
+    // Oldest first
+    const entries = await requestResult(usage.index('lastUsed').getAll());
+    let total = entries.reduce((sum, entry) => sum + entry.size, 0);
+    const kept = [];
+    entries.forEach((entry) => {
+        if (total > maxBytes && entry.key !== key) {
+            documents.delete(entry.key);
+            usage.delete(entry.key);
+            total -= entry.size;
+        } else {
+            kept.push(entry.key);
+        }
+    });
+    await transactionDone(transaction);
+    return kept;
+};
+
+/**
+ * Keys of the stored documents.
+ */
+export const storedDocumentKeys = async () => {
+    const db = await openDatabase();
+    return requestResult(
+        db.transaction(USAGE).objectStore(USAGE).getAllKeys()
+    );
+};
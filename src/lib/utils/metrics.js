@@ -0,0 +1,106 @@
+// Client-side performance metrics, collected while `collect_metrics` is set.
+//
+// Durations (in milliseconds), counters and gauges are accumulated between
+// reports and handed back as one batch by flush(), which the component sends
+// to Dash through the `metrics` prop at a fixed interval.
+
+const now = () =>
+    typeof performance !== 'undefined' ? performance.now() : Date.now();
+
+export class MetricsCollector {
+    constructor() {
+        this.marks = new Map();
+        this.reset();
+    }
+
+    reset() {
+        this.timings = {};
+        this.counters = {};
+        this.gauges = {};
+        this.size = 0;
+    }
+
+    /**
+     * Remember the current time under `key`, for a later measure().
+     */
+    mark(key) {
+        this.marks.set(key, now());
+    }
+
+    /**
+     * Forget mark(`key`), when what it timed will not complete.
+     */
+    unmark(key) {
+        this.marks.delete(key);
+    }
+
+    /**
+     * Record the time elapsed since mark(`key`) as a `name` duration. Does
+     * nothing if `key` was not marked.
+     */
+    measure(name, key, keep = false) {
+        const start = this.marks.get(key);
+        if (start === undefined) {
+            return;
+        }
+        if (!keep) {
+            this.marks.delete(key);
+        }
+        this.timing(name, now() - start);
+    }
+
+    timing(name, milliseconds) {
+        if (!this.timings[name]) {
+            this.timings[name] = [];
+        }
+        this.timings[name].push(Math.round(milliseconds * 100) / 100);
+        this.size += 1;
+    }
+
+    count(name, value = 1) {
+        this.counters[name] = (this.counters[name] || 0) + value;
+        this.size += 1;
+    }
+
+    gauge(name, value) {
+        this.gauges[name] = value;
+        this.size += 1;
+    }
+
+    /**
+     * Return everything recorded since the last flush and start over, or
+     * null if nothing was recorded.
+     */
+    flush() {
+        if (this.size === 0) {
+            return null;
+        }
+        const batch = {
+            timestamp: Date.now(),
+            timings: this.timings,
+            counters: this.counters,
+            gauges: this.gauges,
+        };
+        this.reset();
+        return batch;
+    }
+}
+
+/**
+ * Estimated size of a setProps payload, in bytes of JSON.
+ */
+export const payloadSize = (updates) => {
+    try {
+        return JSON.stringify(updates).length;
+    } catch (error) {
+        return 0;
+    }
+};
+
+/**
+ * Used JS heap size, where the browser exposes it (Chromium only).
+ */
+export const heapSize = () =>
+    typeof performance !== 'undefined' && performance.memory
+        ? performance.memory.usedJSHeapSize
+        : null;
@@ -0,0 +1,124 @@
+// Conversion of annotations stored in the PDF into the component's schema.
+//
+// Square annotations become rectangles, FreeText and Text (sticky note)
+// annotations comments, and each quad of a Highlight annotation a highlight.
+// Other annotation types (links, form fields, ...) are skipped.
+
+const toHexColor = (color) =>
+    color && color.length === 3
+        ? `#${Array.from(color)
+              .map((c) => c.toString(16).padStart(2, '0'))
+              .join('')}`
+        : undefined;
+
+const toViewportRect = (rect, viewport) => {
+    const [x1, y1, x2, y2] = viewport.convertToViewportRectangle(rect);
+    return {
+        x: Math.min(x1, x2),
+        y: Math.min(y1, y2),
+        width: Math.abs(x2 - x1),
+        height: Math.abs(y2 - y1),
+    };
+};
+
+// Bounding boxes of the quads of a highlight, in PDF space. pdf.js returns
+// either a flat array of 8 numbers per quad or a list of {x, y} quads.
+const quadRects = (quadPoints) => {
+    const quads = [];
+    if (quadPoints.length > 0 && typeof quadPoints[0] === 'number') {
+        for (let i = 0; i + 8 <= quadPoints.length; i += 8) {
+            const xs = [0, 2, 4, 6].map((j) => quadPoints[i + j]);
+            const ys = [1, 3, 5, 7].map((j) => quadPoints[i + j]);
+            quads.push({xs, ys});
+        }
+    } else {
+        Array.from(quadPoints).forEach((quad) =>
+            quads.push({
+                xs: quad.map((point) => point.x),
+                ys: quad.map((point) => point.y),
+            })
+        );
+    }
+    return quads.map(({xs, ys}) => [
+        Math.min(...xs),
+        Math.min(...ys),
+        Math.max(...xs),
+        Math.max(...ys),
+    ]);
+};
+
+/**
+ * Read the annotations of one page and convert them. `textIndex` is an
+ * optional SearchIndex used to fill in `selected_text`.
+ */
+export const readPageAnnotations = async (pdf, pageNumber, textIndex) => {
+    const page = await pdf.getPage(pageNumber);
+    const viewport = page.getViewport({scale: 1});
+    const [nativeAnnotations] = await Promise.all([
+        page.getAnnotations({intent: 'display'}),
+        textIndex ? textIndex.indexPage(pageNumber) : null,
+    ]);
+
+    const selectedText = (rect) =>
+        textIndex ? textIndex.textInRect(pageNumber, rect) : '';
+
+    const converted = [];
+    nativeAnnotations.forEach((native) => {
+        const base = {
+            page: pageNumber,
+            version: 1,
+            imported: true,
+            color: toHexColor(native.color),
+        };
+        const comment = native.contentsObj ? native.contentsObj.str : '';
+
+        switch (native.subtype) {
+            case 'Square': {
+                const rect = toViewportRect(native.rect, viewport);
+                converted.push({
+                    ...base,
+                    id: `pdf-${native.id}`,
+                    type: 'rectangle',
+                    ...rect,
+                    selected_text: selectedText(rect),
+                    comment,
+                });
+                break;
+            }
+            case 'FreeText':
+            case 'Text':
+                converted.push({
+                    ...base,
+                    id: `pdf-${native.id}`,
+                    type: 'comment',
+                    ...toViewportRect(native.rect, viewport),
+                    comment,
+                });
+                break;
+            case 'Highlight': {
+                const quads = native.quadPoints
+                    ? quadRects(native.quadPoints)
+                    : [native.rect];
+                quads.forEach((quad, i) => {
+                    const rect = toViewportRect(quad, viewport);
+                    converted.push({
+                        ...base,
+                        id:
+                            quads.length > 1
+                                ? `pdf-${native.id}-${i}`
+                                : `pdf-${native.id}`,
+                        type: 'highlight',
+                        ...rect,
+                        opacity: native.opacity,
+                        selected_text: selectedText(rect),
+                        comment,
+                    });
+                });
+                break;
+            }
+            default:
+                break;
+        }
+    });
+    return converted;
+};
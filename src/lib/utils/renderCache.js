@@ -0,0 +1,124 @@
+// Cache of rendered page bitmaps, keyed by document, page, scale and
+// rotation, with least-recently-used eviction under a memory budget.
+
+const BYTES_PER_PIXEL = 4;
+
+export const pageCacheKey = (documentKey, page, scale, rotation = 0) =>
+    `${documentKey}|${page}|${scale}|${rotation}`;
+
+export class PageBitmapCache {
+    constructor(maxBytes) {
+        this.maxBytes = maxBytes;
+        this.bytes = 0;
+        // Map iteration order doubles as recency order
+        this.entries = new Map();
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        if (entry) {
+            this.entries.delete(key);
+            this.entries.set(key, entry);
+        }
+        return entry;
+    }
+
+    has(key) {
+        return this.entries.has(key);
+    }
+
+    /**
+     * Store an {bitmap, width, height} entry, where width and height are the
+     * CSS size the bitmap is displayed at.
+     */
+    set(key, entry) {
+        const bytes =
+            entry.bitmap.width * entry.bitmap.height * BYTES_PER_PIXEL;
+        if (bytes > this.maxBytes) {
+            entry.bitmap.close();
+            return;
+        }
+        this.delete(key);
+        this.entries.set(key, {...entry, bytes});
+        this.bytes += bytes;
+        this.evict();
+    }
+
+    delete(key) {
+        const entry = this.entries.get(key);
+        if (entry) {
+            this.entries.delete(key);
+            this.bytes -= entry.bytes;
+            entry.bitmap.close();
+        }
+    }
+
+    setMaxBytes(maxBytes) {
+        this.maxBytes = maxBytes;
+        this.evict();
+    }
+
+    evict() {
+        for (const key of this.entries.keys()) {
+            if (this.bytes <= this.maxBytes) {
+                break;
+            }
+            this.delete(key);
+        }
+    }
+
+    clear() {
+        Array.from(this.entries.keys()).forEach((key) => this.delete(key));
+    }
+}
+
+/**
+ * Rasterize a page of a pdf.js document off-screen into a cache entry.
+ */
+export const renderPageBitmap = async (
+    pdf,
+    pageNumber,
+    scale,
+    rotation = 0
+) => {
+    const page = await pdf.getPage(pageNumber);
+    const pixelRatio = window.devicePixelRatio || 1;
+    const viewport = page.getViewport({
+        scale: scale * pixelRatio,
+        rotation,
+    });
+    const canvas = document.createElement('canvas');
+    canvas.width = Math.floor(viewport.width);
+    canvas.height = Math.floor(viewport.height);
+    await page.render({canvasContext: canvas.getContext('2d'), viewport})
+        .promise;
+    const bitmap = await createImageBitmap(canvas);
+    canvas.width = 0;
+    canvas.height = 0;
+    return {
+        bitmap,
+        width: viewport.width / pixelRatio,
+        height: viewport.height / pixelRatio,
+    };
+};
+
+/**
+ * Capture the canvas of a rendered page into a cache entry.
+ */
+export const capturePageBitmap = async (canvas) => ({
+    bitmap: await createImageBitmap(canvas),
+    width: canvas.clientWidth,
+    height: canvas.clientHeight,
+});
+
+const IDLE_TIMEOUT = 200;
+
+export const requestIdle = (callback) =>
+    typeof window.requestIdleCallback === 'function'
+        ? window.requestIdleCallback(callback, {timeout: IDLE_TIMEOUT})
+        : window.setTimeout(callback, IDLE_TIMEOUT);
+
+export const cancelIdle = (handle) =>
+    typeof window.cancelIdleCallback === 'function'
+        ? window.cancelIdleCallback(handle)
+        : window.clearTimeout(handle);
@@ -0,0 +1,262 @@
+// Full-text search over a pdf.js document.
+//
+// Pages are indexed once from getTextContent(): the page text is kept for
+// phrase matching together with the position of every text item, and each
+// word is added to an inverted index of the pages it occurs on. Searches
+// only scan the pages that contain every word of the query. Item positions
+// are bucketed into the same grid as the text layer index, so the text
+// under a rectangle is looked up without scanning the whole page.
+
+import {forEachCell} from './textIndex';
+
+const SNIPPET_CONTEXT = 40;
+
+const normalize = (text) => text.toLowerCase().replace(/\s/g, ' ');
+
+const tokenize = (text) => normalize(text).split(' ').filter(Boolean);
+
+// Viewport rectangle of a text item: the box spanned by its width along
+// the text direction and its height across it, so that rotated text and
+// rotated pages are covered
+const itemRect = (item, viewport) => {
+    const [a, b, c, d, e, f] = item.transform;
+    const height = item.height || Math.hypot(c, d);
+    const along = Math.hypot(a, b) || 1;
+    const across = Math.hypot(c, d) || 1;
+    const dx = [(a / along) * item.width, (c / across) * height];
+    const dy = [(b / along) * item.width, (d / across) * height];
+    const xs = [e, e + dx[0], e + dx[1], e + dx[0] + dx[1]];
+    const ys = [f, f + dy[0], f + dy[1], f + dy[0] + dy[1]];
+    const [x1, y1, x2, y2] = viewport.convertToViewportRectangle([
+        Math.min(...xs),
+        Math.min(...ys),
+        Math.max(...xs),
+        Math.max(...ys),
+    ]);
+    return {
+        x: Math.min(x1, x2),
+        y: Math.min(y1, y2),
+        width: Math.abs(x2 - x1),
+        height: Math.abs(y2 - y1),
+    };
+};
+
+// Rectangles covering the characters [start, end) of the page text, one
+// per text item, with partial items cut proportionally to their length
+const rangeRects = (entry, start, end) =>
+    entry.items
+        .filter((item) => item.start < end && item.end > start)
+        .map((item) => {
+            const length = item.end - item.start;
+            const from = (Math.max(start, item.start) - item.start) / length;
+            const to = (Math.min(end, item.end) - item.start) / length;
+            return {
+                x: item.rect.x + item.rect.width * from,
+                y: item.rect.y,
+                width: item.rect.width * (to - from),
+                height: item.rect.height,
+            };
+        });
+
+const boundingRect = (rects) => {
+    const left = Math.min(...rects.map((r) => r.x));
+    const top = Math.min(...rects.map((r) => r.y));
+    const right = Math.max(...rects.map((r) => r.x + r.width));
+    const bottom = Math.max(...rects.map((r) => r.y + r.height));
+    return {x: left, y: top, width: right - left, height: bottom - top};
+};
+
+export class SearchIndex {
+    constructor(pdf) {
+        this.pdf = pdf;
+        this.pages = new Map();
+        // word -> Set of page numbers
+        this.words = new Map();
+        this.pending = new Map();
+    }
+
+    get complete() {
+        return this.pages.size === this.pdf.numPages;
+    }
+
+    /**
+     * Index a page, once, and return its entry.
+     */
+    indexPage(pageNumber) {
+        if (this.pages.has(pageNumber)) {
+            return Promise.resolve(this.pages.get(pageNumber));
+        }
+        if (!this.pending.has(pageNumber)) {
+            this.pending.set(
+                pageNumber,
+                this.loadPage(pageNumber).finally(() =>
+                    this.pending.delete(pageNumber)
+                )
+            );
+        }
+        return this.pending.get(pageNumber);
+    }
+
+    async loadPage(pageNumber) {
+        const page = await this.pdf.getPage(pageNumber);
+        const viewport = page.getViewport({scale: 1});
+        const content = await page.getTextContent();
+
+        let text = '';
+        const items = [];
+        // grid cell -> positions of the items overlapping it
+        const cells = new Map();
+        content.items.forEach((item) => {
+            if (item.str) {
+                const rect = itemRect(item, viewport);
+                const position =
+                    items.push({
+                        start: text.length,
+                        end: text.length + item.str.length,
+                        rect,
+                    }) - 1;
+                forEachCell(
+                    rect.x,
+                    rect.y,
+                    rect.x + rect.width,
+                    rect.y + rect.height,
+                    (key) => {
+                        const bucket = cells.get(key);
+                        if (bucket) {
+                            bucket.push(position);
+                        } else {
+                            cells.set(key, [position]);
+                        }
+                    }
+                );
+                text += item.str;
+            }
+            if (item.hasEOL) {
+                text += ' ';
+            }
+        });
+
+        const entry = {text: normalize(text), original: text, items, cells};
+        this.pages.set(pageNumber, entry);
+        tokenize(text).forEach((word) => {
+            const pages = this.words.get(word);
+            if (pages) {
+                pages.add(pageNumber);
+            } else {
+                this.words.set(word, new Set([pageNumber]));
+            }
+        });
+        return entry;
+    }
+
+    /**
+     * Pages that may contain `query`: those containing every query word,
+     * where a word also matches as part of a longer indexed word.
+     */
+    candidatePages(query) {
+        let candidates = null;
+        tokenize(query).forEach((term) => {
+            const pages = new Set();
+            this.words.forEach((wordPages, word) => {
+                if (word.includes(term)) {
+                    wordPages.forEach((page) => pages.add(page));
+                }
+            });
+            candidates = candidates
+                ? new Set([...candidates].filter((page) => pages.has(page)))
+                : pages;
+        });
+        return candidates || new Set();
+    }
+
+    /**
+     * Hits of `query` on an indexed page, each with the page, a bounding
+     * rectangle, per-line rectangles and a snippet of surrounding text.
+     */
+    findInPage(pageNumber, query) {
+        const entry = this.pages.get(pageNumber);
+        const needle = tokenize(query).join(' ');
+        const hits = [];
+        if (!entry || !needle) {
+            return hits;
+        }
+        let start = entry.text.indexOf(needle);
+        while (start !== -1) {
+            const end = start + needle.length;
+            const rects = rangeRects(entry, start, end);
+            if (rects.length > 0) {
+                hits.push({
+                    page: pageNumber,
+                    rect: boundingRect(rects),
+                    rects,
+                    snippet: entry.original
+                        .slice(
+                            Math.max(0, start - SNIPPET_CONTEXT),
+                            end + SNIPPET_CONTEXT
+                        )
+                        .trim(),
+                });
+            }
+            start = entry.text.indexOf(needle, end);
+        }
+        return hits;
+    }
+
+    /**
+     * Text of the items of an indexed page overlapping a rectangle (at
+     * scale 1.0), in document order.
+     */
+    textInRect(pageNumber, {x, y, width, height}) {
+        const entry = this.pages.get(pageNumber);
+        if (!entry) {
+            return '';
+        }
+        const candidates = new Set();
+        forEachCell(x, y, x + width, y + height, (key) => {
+            const bucket = entry.cells.get(key);
+            if (bucket) {
+                bucket.forEach((position) => candidates.add(position));
+            }
+        });
+        return Array.from(candidates)
+            .sort((a, b) => a - b)
+            .map((position) => entry.items[position])
+            .filter(
+                ({rect}) =>
+                    !(
+                        rect.x + rect.width < x ||
+                        rect.x > x + width ||
+                        rect.y + rect.height < y ||
+                        rect.y > y + height
+                    )
+            )
+            .map((item) => entry.original.slice(item.start, item.end).trim())
+            .filter(Boolean)
+            .join(' ');
+    }
+
+    /**
+     * Search the document in page order, indexing pages as needed, and call
+     * `onHits(hits)` as matches are found on each page. Stops early when
+     * `isCancelled()` returns true.
+     */
+    async search(query, onHits, isCancelled = () => false) {
+        const candidates = this.complete ? this.candidatePages(query) : null;
+        for (let page = 1; page <= this.pdf.numPages; page++) {
+            if (isCancelled()) {
+                return;
+            }
+            if (candidates && !candidates.has(page)) {
+                continue;
+            }
+            await this.indexPage(page);
+            if (isCancelled()) {
+                return;
+            }
+            const hits = this.findInPage(page, query);
+            if (hits.length > 0) {
+                onHits(hits);
+            }
+        }
+    }
+}
@@ -0,0 +1,110 @@
+// Spatial index over the text layer spans of a rendered page.
+//
+// Span rectangles are measured once, converted to page coordinates at scale
+// 1.0 and bucketed into a uniform grid, so looking up the text under a
+// rectangle only touches the spans in the cells it overlaps instead of
+// calling getBoundingClientRect() on every span of the page.
+
+const TEXT_LAYER_SELECTOR = '.react-pdf__Page__textContent';
+const CELL_SIZE = 64;
+
+/**
+ * Call `callback` with the key of every grid cell overlapping the rectangle.
+ */
+export const forEachCell = (left, top, right, bottom, callback) => {
+    const firstColumn = Math.floor(left / CELL_SIZE);
+    const lastColumn = Math.floor(right / CELL_SIZE);
+    const firstRow = Math.floor(top / CELL_SIZE);
+    const lastRow = Math.floor(bottom / CELL_SIZE);
+    for (let column = firstColumn; column <= lastColumn; column++) {
+        for (let row = firstRow; row <= lastRow; row++) {
+            callback(`${column},${row}`);
+        }
+    }
+};
+
+/**
+ * Measure the text layer spans inside `pageElement` and index them.
+ * Returns null when the page has no text layer yet.
+ */
+export const buildTextIndex = (pageElement, scale = 1.0) => {
+    const textLayer = pageElement?.querySelector(TEXT_LAYER_SELECTOR);
+    if (!textLayer) {
+        return null;
+    }
+
+    const origin = pageElement.getBoundingClientRect();
+    // Screen pixels per unit at scale 1.0, measured so that CSS transforms
+    // (e.g. a zoom gesture in progress) are undone
+    const zoom = pageElement.offsetWidth
+        ? origin.width / pageElement.offsetWidth
+        : 1;
+    const ratio = zoom * scale;
+    const items = [];
+    const cells = new Map();
+
+    textLayer.querySelectorAll('span').forEach((span) => {
+        const text = span.textContent.trim();
+        if (!text) {
+            return;
+        }
+        const rect = span.getBoundingClientRect();
+        const item = {
+            text,
+            left: (rect.left - origin.left) / ratio,
+            top: (rect.top - origin.top) / ratio,
+            right: (rect.right - origin.left) / ratio,
+            bottom: (rect.bottom - origin.top) / ratio,
+        };
+        const position = items.push(item) - 1;
+        forEachCell(item.left, item.top, item.right, item.bottom, (key) => {
+            const bucket = cells.get(key);
+            if (bucket) {
+                bucket.push(position);
+            } else {
+                cells.set(key, [position]);
+            }
+        });
+    });
+
+    return {items, cells};
+};
+
+/**
+ * Text of the indexed spans overlapping the rectangle (in scale 1.0 page
+ * coordinates), joined in document order.
+ */
+export const queryTextIndex = (index, x, y, width, height) => {
+    if (!index) {
+        return '';
+    }
+
+    const left = Math.min(x, x + width);
+    const top = Math.min(y, y + height);
+    const right = Math.max(x, x + width);
+    const bottom = Math.max(y, y + height);
+
+    const candidates = new Set();
+    forEachCell(left, top, right, bottom, (key) => {
+        const bucket = index.cells.get(key);
+        if (bucket) {
+            bucket.forEach((position) => candidates.add(position));
+        }
+    });
+
+    return Array.from(candidates)
+        .sort((a, b) => a - b)
+        .map((position) => index.items[position])
+        .filter(
+            (item) =>
+                !(
+                    item.right < left ||
+                    item.left > right ||
+                    item.bottom < top ||
+                    item.top > bottom
+                )
+        )
+        .map((item) => item.text)
+        .join(' ')
+        .trim();
+};
@@ -0,0 +1,135 @@
+// Tiled rendering of pages too large to rasterize into a single canvas.
+//
+// At high zoom a page is split into fixed-size tiles at the current scale
+// and only the tiles intersecting the visible part of the page are
+// rendered, each into a bitmap of its own. Tiles are cached per scale in a
+// PageBitmapCache, and a low-resolution bitmap of the whole page is shown
+// underneath while they render.
+
+import {pageCacheKey} from './renderCache';
+
+// In 'auto' render mode, pages whose canvas would exceed this many device
+// pixels are tiled
+export const TILED_PIXELS = 4096 * 4096;
+
+// Upper bound on the size of the low-resolution underlay, in pixels
+const UNDERLAY_PIXELS = 1024 * 1024;
+
+export const tileCacheKey = (documentKey, page, scale, tileSize, column, row) =>
+    `${pageCacheKey(documentKey, page, scale)}|${tileSize}|${column}|${row}`;
+
+/**
+ * Scale at which the underlay of a `width` x `height` page (at scale 1.0)
+ * is rendered.
+ */
+export const underlayScale = (width, height, scale) =>
+    Math.min(scale, Math.sqrt(UNDERLAY_PIXELS / (width * height)));
+
+const intersect = (a, b) => ({
+    left: Math.max(a.left, b.left),
+    top: Math.max(a.top, b.top),
+    right: Math.min(a.right, b.right),
+    bottom: Math.min(a.bottom, b.bottom),
+});
+
+/**
+ * Part of `element` that is on screen, in the element's own (untransformed)
+ * coordinates: its box clipped by the window and by every ancestor that
+ * clips its overflow. Null when none of it is visible.
+ */
+export const visibleRect = (element) => {
+    const box = element.getBoundingClientRect();
+    let visible = intersect(box, {
+        left: 0,
+        top: 0,
+        right: window.innerWidth,
+        bottom: window.innerHeight,
+    });
+    for (
+        let node = element.parentElement;
+        node && node !== document.body;
+        node = node.parentElement
+    ) {
+        const style = window.getComputedStyle(node);
+        if (style.overflowX !== 'visible' || style.overflowY !== 'visible') {
+            visible = intersect(visible, node.getBoundingClientRect());
+        }
+    }
+    if (visible.right <= visible.left || visible.bottom <= visible.top) {
+        return null;
+    }
+    // Undo CSS transforms (e.g. a zoom gesture in progress)
+    const ratio = element.offsetWidth ? box.width / element.offsetWidth : 1;
+    return {
+        x: (visible.left - box.left) / ratio,
+        y: (visible.top - box.top) / ratio,
+        width: (visible.right - visible.left) / ratio,
+        height: (visible.bottom - visible.top) / ratio,
+    };
+};
+
+/**
+ * Tiles of a `width` x `height` page (in CSS pixels at the current scale)
+ * that intersect `rect`, plus `margin` tiles on every side, nearest to the
+ * centre of `rect` first.
+ */
+export const tilesInRect = (width, height, tileSize, rect, margin = 0) => {
+    const columns = Math.ceil(width / tileSize);
+    const rows = Math.ceil(height / tileSize);
+    const clampColumn = (c) => Math.max(0, Math.min(columns - 1, c));
+    const clampRow = (r) => Math.max(0, Math.min(rows - 1, r));
+    const firstColumn = clampColumn(Math.floor(rect.x / tileSize) - margin);
+    const lastColumn = clampColumn(
+        Math.floor((rect.x + rect.width) / tileSize) + margin
+    );
+    const firstRow = clampRow(Math.floor(rect.y / tileSize) - margin);
+    const lastRow = clampRow(
+        Math.floor((rect.y + rect.height) / tileSize) + margin
+    );
+
+    const centreX = rect.x + rect.width / 2;
+    const centreY = rect.y + rect.height / 2;
+    const tiles = [];
+    for (let row = firstRow; row <= lastRow; row++) {
+        for (let column = firstColumn; column <= lastColumn; column++) {
+            const x = column * tileSize;
+            const y = row * tileSize;
+            tiles.push({
+                column,
+                row,
+                x,
+                y,
+                width: Math.min(tileSize, width - x),
+                height: Math.min(tileSize, height - y),
+            });
+        }
+    }
+    const distance = (tile) =>
+        Math.hypot(
+            tile.x + tile.width / 2 - centreX,
+            tile.y + tile.height / 2 - centreY
+        );
+    return tiles.sort((a, b) => distance(a) - distance(b));
+};
+
+/**
+ * Rasterize the `tile` rectangle of a pdf.js page rendered at `scale` into
+ * a cache entry.
+ */
+export const renderTileBitmap = async (page, scale, tile) => {
+    const pixelRatio = window.devicePixelRatio || 1;
+    const viewport = page.getViewport({scale: scale * pixelRatio});
+    const canvas = document.createElement('canvas');
+    canvas.width = Math.ceil(tile.width * pixelRatio);
+    canvas.height = Math.ceil(tile.height * pixelRatio);
+    await page.render({
+        canvasContext: canvas.getContext('2d'),
+        viewport,
+        // Shift the page so that the tile lands at the canvas origin
+        transform: [1, 0, 0, 1, -tile.x * pixelRatio, -tile.y * pixelRatio],
+    }).promise;
+    const bitmap = await createImageBitmap(canvas);
+    canvas.width = 0;
+    canvas.height = 0;
+    return {bitmap, width: tile.width, height: tile.height};
+};
@@ -0,0 +1,23 @@
+// The pdf.js worker script served with the package.
+//
+// Kept apart from the viewer so that the lightweight component can start
+// downloading the worker while the viewer's own chunk is still loading.
+
+export const WORKER_SRC =
+    '/_dash-component-suites/dash_pdf_plus/pdf.worker.min.mjs';
+
+let preloaded = false;
+
+/**
+ * Hint the browser to fetch the worker script, once per page.
+ */
+export const preloadWorker = () => {
+    if (preloaded || typeof document === 'undefined') {
+        return;
+    }
+    preloaded = true;
+    const link = document.createElement('link');
+    link.rel = 'prefetch';
+    link.href = WORKER_SRC;
+    document.head.appendChild(link);
+};
@@ -0,0 +1,112 @@
+"""Bundle sizes and import time of the package.
+
+Run after ``npm run build``::
+
+    python -m tests.benchmarks.bundle_and_import --output sizes.json
+
+Reports the raw and gzipped size of every script the package serves, split
+into what every page of an app loads and what is only loaded once a viewer
+is rendered, and the time ``import dash_pdf_plus`` takes in a fresh
+interpreter on top of ``import dash`` (median of ``--runs`` runs), with the
+modules it pulls in that dash did not already import.
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "dash_pdf_plus"
+)
+
+# Modules worth knowing about when they are imported with the package
+WATCHED_MODULES = (
+    "requests",
+    "sqlite3",
+    "multiprocessing",
+    "pdfminer",
+    "pypdfium2",
+    "PIL",
+    "pypdf",
+)
+
+IMPORT_SCRIPT = """
+import json, sys, time
+import dash
+before = set(sys.modules)
+start = time.perf_counter()
+import dash_pdf_plus
+elapsed = time.perf_counter() - start
+added = {name.split(".")[0] for name in set(sys.modules) - before}
+print(json.dumps({"import_ms": elapsed * 1000, "modules": sorted(added)}))
+"""
+
+
+def bundle_sizes(package_dir=PACKAGE_DIR):
+    """Raw and gzipped sizes of the scripts in ``package_dir``."""
+    files = {}
+    for path in sorted(glob.glob(os.path.join(package_dir, "*.js"))) + sorted(
+        glob.glob(os.path.join(package_dir, "*.mjs"))
+    ):
+        with open(path, "rb") as f:
+            content = f.read()
+        files[os.path.basename(path)] = {
+            "bytes": len(content),
+            "gzip_bytes": len(gzip.compress(content)),
+        }
+
+    def total(names):
+        return sum(files[name]["gzip_bytes"] for name in names)
+
+    # Async chunks and the pdf.js worker are only fetched once a viewer mounts
+    initial = [
+        name
+        for name in files
+        if not name.startswith("async-") and not name.endswith(".mjs")
+    ]
+    return {
+        "files": files,
+        "initial_gzip_bytes": total(initial),
+        "on_demand_gzip_bytes": total(set(files) - set(initial)),
+    }
+
+
+def import_time(runs=5):
+    """Median time of ``import dash_pdf_plus`` in fresh interpreters."""
+    samples = []
+    modules = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT])
+        result = json.loads(output)
+        samples.append(result["import_ms"])
+        modules = result["modules"]
+    return {
+        "import_ms": statistics.median(samples),
+        "runs": runs,
+        "modules": len(modules),
+        "watched_modules": [name for name in WATCHED_MODULES if name in modules],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    results = {"bundle": bundle_sizes(), "import": import_time(args.runs)}
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
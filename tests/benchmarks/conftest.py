@@ -0,0 +1,36 @@
+import json
+import os
+
+import pytest
+
+BENCHMARK_ENV = "DASH_PDF_BENCHMARK"
+OUTPUT_ENV = "DASH_PDF_BENCHMARK_OUTPUT"
+
+_results = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get(BENCHMARK_ENV):
+        return
+    skip = pytest.mark.skip(reason="set {}=1 to run benchmarks".format(BENCHMARK_ENV))
+    for item in items:
+        if "benchmarks" in item.nodeid:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def record_benchmark():
+    """Record a named set of measurements for the JSON results file."""
+
+    def record(name, **measurements):
+        _results[name] = measurements
+
+    return record
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    path = os.environ.get(OUTPUT_ENV, "benchmark_results.json")
+    with open(path, "w") as f:
+        json.dump(_results, f, indent=2, sort_keys=True)
@@ -0,0 +1,26 @@
+"""Helpers shared by the browser benchmarks."""
+
+
+def summarize(samples):
+    """Median, 95th percentile and max of a list of durations in ms."""
+    ordered = sorted(samples)
+    return {
+        "median_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+        "samples": len(ordered),
+    }
+
+
+def record_payload_sizes(app, path="_dash-update-component"):
+    """Collect the body size of every callback request the app receives."""
+    from flask import request
+
+    sizes = []
+
+    @app.server.before_request
+    def _record_size():
+        if request.path.endswith(path):
+            sizes.append(request.content_length or 0)
+
+    return sizes
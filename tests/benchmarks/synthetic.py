@@ -0,0 +1,73 @@
+"""Synthetic PDFs and annotation sets for the benchmarks."""
+
+import random
+
+
+def make_pdf(num_pages, lines_per_page=40):
+    """Return the bytes of a letter-size PDF with ``num_pages`` pages of text."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(1, num_pages + 1):
+        lines = [b"BT /F1 11 Tf 72 740 Td 14 TL"]
+        for line in range(lines_per_page):
+            lines.append(
+                "(Page {} line {} lorem ipsum dolor sit amet) '".format(
+                    page, line + 1
+                ).encode("ascii")
+            )
+        lines.append(b"ET")
+        stream = b"\n".join(lines)
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % content_id
+        )
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids),
+        num_pages,
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def make_annotations(count, num_pages, seed=0):
+    """Return ``count`` rectangle annotations spread over ``num_pages`` pages."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": "rectangle-{}".format(i),
+            "type": "rectangle",
+            "version": 1,
+            "created_at": "2024-01-01T00:00:00.000Z",
+            "updated_at": "2024-01-01T00:00:00.000Z",
+            "page": i % num_pages + 1,
+            "x": rng.uniform(0, 500),
+            "y": rng.uniform(0, 700),
+            "width": rng.uniform(20, 100),
+            "height": rng.uniform(10, 60),
+            "selected_text": "",
+        }
+        for i in range(count)
+    ]
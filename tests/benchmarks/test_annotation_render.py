@@ -0,0 +1,71 @@
+from dash import Dash, html
+
+import dash_pdf_plus
+
+from .harness import summarize
+from .synthetic import make_annotations, make_pdf
+
+NUM_PAGES = 500
+NUM_ANNOTATIONS = 10_000
+PAN_MOVES = 120
+
+# Drags the viewer with synthetic mouse events and reports, for each move,
+# the time until the next animation frame
+PAN_SCRIPT = """
+const [selector, moves, done] = arguments;
+const container = document.querySelector(selector);
+const rect = container.getBoundingClientRect();
+const fire = (type, offset) =>
+    container.dispatchEvent(
+        new MouseEvent(type, {
+            bubbles: true,
+            clientX: rect.left + 20 + offset,
+            clientY: rect.top + 20 + offset,
+        })
+    );
+const durations = [];
+let move = 0;
+const step = () => {
+    const start = performance.now();
+    fire('mousemove', move % 50);
+    requestAnimationFrame(() => {
+        durations.push(performance.now() - start);
+        move += 1;
+        if (move < moves) {
+            step();
+        } else {
+            fire('mouseup', 0);
+            done(durations);
+        }
+    });
+};
+fire('mousedown', 0);
+step();
+"""
+
+
+def test_pan_with_many_annotations(dash_duo, record_benchmark):
+    app = Dash(__name__)
+    dash_pdf_plus.init_app(app)
+    app.layout = html.Div(
+        dash_pdf_plus.DashPDF(
+            id="viewer",
+            data=make_pdf(NUM_PAGES),
+            stream=True,
+            enable_annotations=True,
+            annotations=make_annotations(NUM_ANNOTATIONS, NUM_PAGES),
+        )
+    )
+    dash_duo.start_server(app)
+    dash_duo.wait_for_element("#viewer .annotation-rectangle", timeout=30)
+
+    durations = dash_duo.driver.execute_async_script(
+        PAN_SCRIPT, "#viewer .pdf-container", PAN_MOVES
+    )
+
+    record_benchmark(
+        "pan_frame_time",
+        pages=NUM_PAGES,
+        annotations=NUM_ANNOTATIONS,
+        **summarize(durations),
+    )
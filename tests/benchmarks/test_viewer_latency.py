@@ -0,0 +1,233 @@
+import time
+
+import pytest
+from dash import Dash, Input, Output, State, html
+
+import dash_pdf_plus
+
+from .harness import record_payload_sizes, summarize
+from .synthetic import make_annotations, make_pdf
+
+PAGE_FLIPS = 20
+ZOOM_STEPS = 40
+DRAG_MOVES = 120
+
+# Resolves with performance.now() once the text layer of `page` has rendered,
+# which react-pdf does after drawing the canvas
+FIRST_PAGE_SCRIPT = """
+const [page, done] = arguments;
+const selector = `.react-pdf__Page[data-page-number="${page}"] ` +
+    '.react-pdf__Page__textContent span';
+const poll = () =>
+    document.querySelector(selector)
+        ? done(performance.now())
+        : requestAnimationFrame(poll);
+poll();
+"""
+
+# Clicks #next and reports, for each click, the time until the next page's
+# text layer has rendered
+FLIP_SCRIPT = """
+const [flips, done] = arguments;
+const durations = [];
+const flip = (page) => {
+    const selector = `.react-pdf__Page[data-page-number="${page}"] ` +
+        '.react-pdf__Page__textContent span';
+    const start = performance.now();
+    document.querySelector('#next').click();
+    const poll = () => {
+        if (!document.querySelector(selector)) {
+            requestAnimationFrame(poll);
+            return;
+        }
+        durations.push(performance.now() - start);
+        if (durations.length < flips) {
+            flip(page + 1);
+        } else {
+            done(durations);
+        }
+    };
+    poll();
+};
+flip(2);
+"""
+
+# Zooms in and out with ctrl+wheel events and reports, for each event, the
+# time until the next animation frame
+ZOOM_SCRIPT = """
+const [selector, steps, done] = arguments;
+const container = document.querySelector(selector);
+const rect = container.getBoundingClientRect();
+const durations = [];
+const step = () => {
+    const start = performance.now();
+    container.dispatchEvent(
+        new WheelEvent('wheel', {
+            bubbles: true,
+            cancelable: true,
+            ctrlKey: true,
+            deltaY: durations.length % 20 < 10 ? -100 : 100,
+            clientX: rect.left + rect.width / 2,
+            clientY: rect.top + rect.height / 2,
+        })
+    );
+    requestAnimationFrame(() => {
+        durations.push(performance.now() - start);
+        if (durations.length < steps) {
+            step();
+        } else {
+            done(durations);
+        }
+    });
+};
+step();
+"""
+
+# Drags the first annotation with synthetic mouse events and reports, for
+# each move, the time until the next animation frame
+DRAG_SCRIPT = """
+const [moves, done] = arguments;
+const target = document.querySelector('#viewer .annotation-rectangle');
+const rect = target.getBoundingClientRect();
+const fire = (element, type, offset) =>
+    element.dispatchEvent(
+        new MouseEvent(type, {
+            bubbles: true,
+            clientX: rect.left + 5 + offset,
+            clientY: rect.top + 5 + offset,
+        })
+    );
+const durations = [];
+const step = () => {
+    const start = performance.now();
+    fire(document, 'mousemove', (durations.length % 40) + 1);
+    requestAnimationFrame(() => {
+        durations.push(performance.now() - start);
+        if (durations.length < moves) {
+            step();
+        } else {
+            fire(document, 'mouseup', 0);
+            done(durations);
+        }
+    });
+};
+fire(target, 'mousedown', 0);
+requestAnimationFrame(step);
+"""
+
+
+def _viewer_app(viewer):
+    app = Dash(__name__)
+    dash_pdf_plus.init_app(app)
+    app.layout = html.Div(
+        [html.Button("Next", id="next"), html.Div(viewer, style={"height": "90vh"})]
+    )
+    return app
+
+
+@pytest.mark.parametrize("num_pages", [1, 100, 2000])
+@pytest.mark.parametrize("stream", [False, True])
+def test_time_to_first_page(dash_duo, record_benchmark, num_pages, stream):
+    pdf = make_pdf(num_pages)
+    start = time.perf_counter()
+    viewer = dash_pdf_plus.DashPDF(id="viewer", data=pdf, stream=stream)
+    init_ms = (time.perf_counter() - start) * 1000
+
+    dash_duo.start_server(_viewer_app(viewer))
+    first_page_ms = dash_duo.driver.execute_async_script(FIRST_PAGE_SCRIPT, 1)
+
+    record_benchmark(
+        "time_to_first_page[{}-{}]".format(
+            num_pages, "stream" if stream else "inline"
+        ),
+        pages=num_pages,
+        pdf_bytes=len(pdf),
+        init_ms=init_ms,
+        first_page_ms=first_page_ms,
+    )
+
+
+@pytest.mark.parametrize("num_pages", [100, 2000])
+def test_page_flip_latency(dash_duo, record_benchmark, num_pages):
+    app = _viewer_app(
+        dash_pdf_plus.DashPDF(id="viewer", data=make_pdf(num_pages), stream=True)
+    )
+    # Flip pages in the browser, so the latency excludes server round trips
+    app.clientside_callback(
+        "(clicks, page) => (page || 1) + 1",
+        Output("viewer", "page_number"),
+        Input("next", "n_clicks"),
+        State("viewer", "page_number"),
+        prevent_initial_call=True,
+    )
+    dash_duo.start_server(app)
+    dash_duo.driver.execute_async_script(FIRST_PAGE_SCRIPT, 1)
+
+    durations = dash_duo.driver.execute_async_script(FLIP_SCRIPT, PAGE_FLIPS)
+
+    record_benchmark(
+        "page_flip[{}]".format(num_pages), pages=num_pages, **summarize(durations)
+    )
+
+
+def test_wheel_zoom_latency(dash_duo, record_benchmark):
+    num_pages = 100
+    dash_duo.start_server(
+        _viewer_app(
+            dash_pdf_plus.DashPDF(
+                id="viewer", data=make_pdf(num_pages), stream=True, enable_zoom=True
+            )
+        )
+    )
+    dash_duo.driver.execute_async_script(FIRST_PAGE_SCRIPT, 1)
+
+    durations = dash_duo.driver.execute_async_script(
+        ZOOM_SCRIPT, "#viewer .pdf-container", ZOOM_STEPS
+    )
+
+    record_benchmark("wheel_zoom", pages=num_pages, **summarize(durations))
+
+
+@pytest.mark.parametrize("num_annotations", [1_000, 10_000])
+def test_annotation_drag(dash_duo, record_benchmark, num_annotations):
+    num_pages = 10
+    app = _viewer_app(
+        dash_pdf_plus.DashPDF(
+            id="viewer",
+            data=make_pdf(num_pages),
+            stream=True,
+            enable_annotations=True,
+            selected_annotation_tool="rectangle",
+            annotations=make_annotations(num_annotations, num_pages),
+        )
+    )
+    app.layout.children.append(html.Div(id="edits"))
+
+    @app.callback(
+        Output("edits", "children"),
+        Input("viewer", "annotations"),
+        prevent_initial_call=True,
+    )
+    def count_edits(annotations):
+        return "edited {}".format(len(annotations))
+
+    payload_sizes = record_payload_sizes(app)
+    dash_duo.start_server(app)
+    dash_duo.wait_for_element("#viewer .annotation-rectangle", timeout=30)
+    del payload_sizes[:]
+
+    durations = dash_duo.driver.execute_async_script(DRAG_SCRIPT, DRAG_MOVES)
+    dash_duo.wait_for_text_to_equal(
+        "#edits", "edited {}".format(num_annotations), timeout=30
+    )
+
+    frame_times = summarize(durations)
+    record_benchmark(
+        "annotation_drag[{}]".format(num_annotations),
+        pages=num_pages,
+        annotations=num_annotations,
+        fps=1000 / frame_times["median_ms"],
+        callback_requests=len(payload_sizes),
+        callback_payload_bytes=max(payload_sizes, default=0),
+        **frame_times,
+    )
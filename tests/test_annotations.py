@@ -0,0 +1,109 @@
+import pytest
+
+from dash_pdf_plus import text
+from dash_pdf_plus.annotations import AnnotationStore, from_arrays, to_annotations
+from dash_pdf_plus.text import TextExtractor
+
+
+def _rect(annotation_id, page=1, version=1):
+    return {
+        "id": annotation_id,
+        "type": "rectangle",
+        "page": page,
+        "version": version,
+        "x": 10,
+        "y": 10,
+        "width": 50,
+        "height": 20,
+    }
+
+
+def test_apply_changes():
+    store = AnnotationStore([_rect("a")])
+    changes = [
+        {"seq": 1, "session": "s", "op": "add", "id": "b", "patch": _rect("b", 2)},
+        {
+            "seq": 2,
+            "session": "s",
+            "op": "update",
+            "id": "a",
+            "version": 2,
+            "patch": {"x": 30, "version": 2},
+        },
+        {"seq": 3, "session": "s", "op": "delete", "id": "b", "version": 1},
+    ]
+    assert store.apply(changes) == []
+    assert store.get("a")["x"] == 30
+    assert "b" not in store
+    # Re-applying the same window is a no-op
+    assert store.apply(changes) == []
+    assert len(store) == 1
+
+
+def test_stale_update_conflicts():
+    store = AnnotationStore([_rect("a", version=3)])
+    change = {
+        "seq": 1,
+        "session": "s",
+        "op": "update",
+        "id": "a",
+        "version": 2,
+        "patch": {"x": 0, "version": 2},
+    }
+    assert store.apply([change]) == [change]
+    assert store.get("a")["x"] == 10
+
+
+def test_annotations_for_page():
+    store = AnnotationStore([_rect("a", 1), _rect("b", 2)])
+    assert [a["id"] for a in store.annotations(page=2)] == ["b"]
+
+
+def test_from_arrays_round_trip():
+    batch = from_arrays(
+        [1, 2], [10, 50.123], [20, 60], [30, -20], [40, 10], color="#ff0000"
+    )
+    assert batch["count"] == 2
+    annotations = to_annotations(batch)
+    assert [a["page"] for a in annotations] == [1, 2]
+    assert annotations[0]["id"] != annotations[1]["id"]
+    assert annotations[0]["type"] == "rectangle"
+    assert annotations[0]["version"] == 1
+    assert annotations[0]["color"] == "#ff0000"
+    # Negative sizes are normalized, coordinates rounded
+    assert [annotations[1][k] for k in ("x", "y", "width", "height")] == [
+        30.12,
+        60,
+        20,
+        10,
+    ]
+
+
+def test_from_arrays_validates_columns():
+    with pytest.raises(ValueError):
+        from_arrays([1, 2], [0], [0, 0], [1, 1], [1, 1])
+    with pytest.raises(ValueError):
+        from_arrays([0], [0], [0], [1], [1])
+    with pytest.raises(ValueError):
+        from_arrays([1], [float("nan")], [0], [1], [1])
+    with pytest.raises(ValueError):
+        from_arrays([1, 1], [0, 0], [0, 0], [1, 1], [1, 1], ids=["a", "a"])
+
+
+def test_from_arrays_selected_text(monkeypatch):
+    monkeypatch.setattr(
+        text, "extract_runs", lambda content: [[["Hello", 72, 40, 30, 12]]]
+    )
+    batch = from_arrays(
+        iter([1, 1]),
+        [70, 300],
+        [38, 300],
+        [100, 10],
+        [10, 10],
+        ids=["a", "b"],
+        doc=b"%PDF-1",
+        extractor=TextExtractor(cache_dir=False),
+    )
+    annotations = to_annotations(batch)
+    assert [a["id"] for a in annotations] == ["a", "b"]
+    assert [a["selected_text"] for a in annotations] == ["Hello", ""]
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dash_pdf_plus.documents import DocumentRegistry, init_app, register_document
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client():
+    flask = pytest.importorskip("flask")
+    server = flask.Flask(__name__)
+    app = SimpleNamespace(
+        server=server,
+        config=SimpleNamespace(
+            routes_pathname_prefix="/", requests_pathname_prefix="/"
+        ),
+    )
+    registry = init_app(app, registry=DocumentRegistry())
+    client = server.test_client()
+    client.url = registry.url_for(registry.register(CONTENT))
+    return client
+
+
+def test_full_document(client):
+    response = client.get(client.url)
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+
+
+def test_single_range(client):
+    response = client.get(client.url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.data == CONTENT[10:20]
+    assert response.headers["Content-Range"] == "bytes 10-19/{}".format(
+        len(CONTENT)
+    )
+
+
+def test_unsatisfiable_range(client):
+    response = client.get(
+        client.url, headers={"Range": "bytes={}-".format(len(CONTENT) + 10)}
+    )
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == "bytes */{}".format(len(CONTENT))
+
+
+def test_multiple_ranges_are_ignored(client):
+    response = client.get(client.url, headers={"Range": "bytes=0-9,20-29"})
+    assert response.status_code == 200
+    assert response.data == CONTENT
+
+
+def test_not_modified(client):
+    etag = client.get(client.url).headers["ETag"]
+    response = client.get(client.url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_head(client):
+    response = client.head(client.url)
+    assert response.status_code == 200
+    assert response.data == b""
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+
+
+def test_unknown_document(client):
+    assert client.get("/_dash-pdf/missing").status_code == 404
+
+
+def test_registry_evicts_least_recently_used():
+    registry = DocumentRegistry(max_bytes=25)
+    first = registry.register(b"a" * 10)
+    second = registry.register(b"b" * 10)
+    registry.get(first)
+    registry.register(b"c" * 10)
+    assert first in registry
+    assert second not in registry
+
+
+def test_register_document_with_stable_id():
+    registry = DocumentRegistry()
+    url = register_document(CONTENT, registry=registry, doc_id="stable")
+    assert url == registry.url_for("stable")
+    assert register_document(CONTENT, registry=registry, doc_id="stable") == url
+    etag = registry.get("stable").etag
+
+    # New content under the same id replaces the old content
+    assert register_document(b"%PDF-1", registry=registry, doc_id="stable") == url
+    assert registry.get("stable").size == len(b"%PDF-1")
+    assert registry.get("stable").etag != etag
+
+
+def test_replaced_document_is_not_counted_twice():
+    registry = DocumentRegistry(max_bytes=25)
+    first = registry.register(b"a" * 10)
+    registry.register(b"b" * 10, doc_id="stable")
+    registry.register(b"c" * 10, doc_id="stable")
+    assert first in registry
+    assert registry._memory == 20
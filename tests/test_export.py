@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from dash_pdf_plus.export import export_annotations, export_batch, to_pdf_rect
+
+from .benchmarks.synthetic import make_pdf
+
+LETTER = (0, 0, 612, 792)
+
+ANNOTATIONS = [
+    {"id": "r1", "type": "rectangle", "page": 1, "x": 72, "y": 100,
+     "width": 200, "height": 50},
+    {"id": "h1", "type": "highlight", "page": 2, "x": 72, "y": 44,
+     "width": 120, "height": 12, "color": "#00ff00", "opacity": 0.5},
+    {"id": "c1", "type": "comment", "page": 2, "x": 300, "y": 300,
+     "width": 0, "height": 0, "comment": "Check this"},
+]  # fmt: skip
+
+
+@pytest.mark.parametrize(
+    "rotation, expected",
+    [
+        (0, (72, 642, 272, 692)),
+        (90, (100, 72, 150, 272)),
+        (180, (340, 100, 540, 150)),
+        (270, (462, 520, 512, 720)),
+    ],
+)
+def test_to_pdf_rect(rotation, expected):
+    assert to_pdf_rect(72, 100, 200, 50, LETTER, rotation) == expected
+
+
+def test_to_pdf_rect_offset_crop_box():
+    assert to_pdf_rect(0, 0, 10, 10, (50, 60, 550, 760)) == (50, 750, 60, 760)
+
+
+def test_export_annotations():
+    pypdf = pytest.importorskip("pypdf")
+    reader = pypdf.PdfReader(io.BytesIO(export_annotations(make_pdf(2), ANNOTATIONS)))
+
+    (square,) = [a.get_object() for a in reader.pages[0]["/Annots"]]
+    assert square["/Subtype"] == "/Square"
+    assert square["/NM"] == "r1"
+    assert [float(v) for v in square["/Rect"]] == [72, 642, 272, 692]
+    # Opaque border, translucent fill drawn by the appearance stream
+    assert float(square["/CA"]) == 1
+    # Appearance streams must be indirect objects
+    assert isinstance(square["/AP"].raw_get("/N"), pypdf.generic.IndirectObject)
+    appearance = square["/AP"]["/N"].get_object()
+    assert [float(v) for v in appearance["/BBox"]] == [0, 0, 200, 50]
+    graphics_state = appearance["/Resources"]["/ExtGState"]["/GS0"]
+    assert float(graphics_state["/ca"]) == 0.1
+    assert b" re B" in appearance.get_data()
+
+    highlight, comment = [a.get_object() for a in reader.pages[1]["/Annots"]]
+    assert highlight["/Subtype"] == "/Highlight"
+    assert [float(v) for v in highlight["/C"]] == [0, 1, 0]
+    assert float(highlight["/CA"]) == 0.5
+    assert comment["/Subtype"] == "/FreeText"
+    assert comment["/Contents"] == "Check this"
+
+
+def test_export_batch(tmp_path):
+    pytest.importorskip("pypdf")
+    pdf = make_pdf(2)
+    jobs = [(pdf, ANNOTATIONS, tmp_path / "{}.pdf".format(i)) for i in range(4)]
+    jobs.append((pdf, [{**ANNOTATIONS[0], "page": 5}], tmp_path / "bad.pdf"))
+
+    results = dict(export_batch(jobs, max_workers=2))
+    assert len(results) == 5
+    assert isinstance(results.pop(tmp_path / "bad.pdf"), IndexError)
+    assert all(error is None for error in results.values())
+    assert all(path.stat().st_size > len(pdf) for path in results)
@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dash_pdf_plus.fetch import DocumentTooLarge, RemoteFetcher
+
+PDF = b"%PDF-1.4\n" + b"0" * 4096 + b"\n%%EOF"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+    delay = 0
+
+    def do_GET(self):
+        type(self).requests_seen.append(dict(self.headers))
+        time.sleep(type(self).delay)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(PDF)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(PDF)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.requests_seen = []
+    _Handler.delay = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/doc.pdf".format(httpd.server_address[1])
+    httpd.shutdown()
+
+
+def test_fetch_is_cached(server):
+    fetcher = RemoteFetcher(ttl=60)
+    assert fetcher.fetch(server) == PDF
+    assert fetcher.fetch(server) == PDF
+    assert len(_Handler.requests_seen) == 1
+
+
+def test_stale_entry_is_revalidated(server):
+    fetcher = RemoteFetcher(ttl=0)
+    assert fetcher.fetch(server) == PDF
+    assert fetcher.fetch(server) == PDF
+    assert len(_Handler.requests_seen) == 2
+    assert _Handler.requests_seen[1]["If-None-Match"] == '"v1"'
+
+
+def test_concurrent_fetches_share_one_download(server):
+    _Handler.delay = 0.2
+    fetcher = RemoteFetcher(ttl=60)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: fetcher.fetch(server), range(8)))
+    assert results == [PDF] * 8
+    assert len(_Handler.requests_seen) == 1
+
+
+def test_max_size(server):
+    fetcher = RemoteFetcher(max_size=1024)
+    with pytest.raises(DocumentTooLarge):
+        fetcher.fetch(server)
+
+
+def test_session_is_created_on_first_fetch(server):
+    fetcher = RemoteFetcher()
+    assert fetcher._session is None
+    assert fetcher.fetch(server) == PDF
+    assert fetcher._session is not None
@@ -0,0 +1,94 @@
+from dash_pdf_plus.metrics import Histogram, MetricsAggregator
+
+BATCH = {
+    "timestamp": 0,
+    "timings": {"page_render_ms": [3, 12.5, 40000]},
+    "counters": {"set_props_calls": 2, "annotations_rendered": 5},
+    "gauges": {"render_cache_bytes": 1024},
+}
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(10, 1, 100))
+    for value in (0.5, 1, 5, 50, 500):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [
+        (1, 2),
+        (10, 3),
+        (100, 4),
+        (float("inf"), 5),
+    ]
+    assert histogram.sum == 556.5
+
+
+def test_record_aggregates_batches():
+    aggregator = MetricsAggregator()
+    aggregator.record(BATCH)
+    aggregator.record(None)
+    aggregator.record({**BATCH, "gauges": {"render_cache_bytes": 2048}})
+
+    histogram = aggregator.histogram("page_render_ms")
+    assert histogram.count == 6
+    assert histogram.sum == 2 * (3 + 12.5 + 40000)
+
+    text = aggregator.collect()
+    assert "# TYPE dash_pdf_set_props_calls_total counter" in text
+    assert "dash_pdf_set_props_calls_total 4\n" in text
+    assert "dash_pdf_reports_total 2\n" in text
+    assert "dash_pdf_render_cache_bytes 2048\n" in text
+    assert "# TYPE dash_pdf_page_render_ms histogram" in text
+    assert 'dash_pdf_page_render_ms_bucket{le="5"} 2\n' in text
+    assert 'dash_pdf_page_render_ms_bucket{le="10000"} 4\n' in text
+    assert 'dash_pdf_page_render_ms_bucket{le="+Inf"} 6\n' in text
+    assert "dash_pdf_page_render_ms_count 6\n" in text
+
+
+def test_record_labels():
+    aggregator = MetricsAggregator(prefix="viewer")
+    aggregator.record(BATCH, labels={"app": 'a"b'})
+    aggregator.record(BATCH, labels={"app": "c"})
+
+    assert aggregator.histogram("page_render_ms", {"app": "c"}).count == 3
+    text = aggregator.collect()
+    assert 'viewer_set_props_calls_total{app="a\\"b"} 2\n' in text
+    assert 'viewer_set_props_calls_total{app="c"} 2\n' in text
+    assert text.count("# TYPE viewer_set_props_calls_total counter") == 1
+    assert 'viewer_page_render_ms_bucket{app="c",le="+Inf"} 3\n' in text
+
+
+def test_unknown_metrics_are_ignored():
+    batch = {
+        **BATCH,
+        "timings": {"page_render_ms": [3], "made_up_ms": [1]},
+        "counters": {"made_up": 1},
+    }
+    aggregator = MetricsAggregator()
+    aggregator.record(batch)
+    assert aggregator.histogram("made_up_ms") is None
+    assert "made_up" not in aggregator.collect()
+
+    aggregator = MetricsAggregator(metric_names=None)
+    aggregator.record(batch)
+    assert aggregator.histogram("made_up_ms").count == 1
+
+
+def test_non_numeric_values_are_skipped():
+    aggregator = MetricsAggregator()
+    aggregator.record(
+        {
+            "timings": {"page_render_ms": [3, "12", None, float("nan")]},
+            "counters": {"set_props_calls": "2", "set_props_bytes": None},
+            "gauges": {"render_cache_bytes": "1024", "js_heap_bytes": True},
+        }
+    )
+    aggregator.record(
+        {"timings": {"text_layer_ms": 5}, "counters": {"set_props_calls": 1}}
+    )
+
+    assert aggregator.histogram("page_render_ms").count == 1
+    assert aggregator.histogram("text_layer_ms") is None
+    text = aggregator.collect()
+    assert "dash_pdf_set_props_calls_total 1\n" in text
+    assert "set_props_bytes" not in text
+    assert "render_cache_bytes" not in text
+    assert "js_heap_bytes" not in text
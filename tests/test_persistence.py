@@ -0,0 +1,97 @@
+import pytest
+
+from dash_pdf_plus.persistence import AnnotationBackend, MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / "annotations.db"))
+
+
+def _annotation(annotation_id, page, version=1):
+    return {"id": annotation_id, "type": "comment", "page": page, "version": version}
+
+
+def test_get_annotations_by_page(backend):
+    backend.upsert("doc", [_annotation("a", 1), _annotation("b", 2)])
+    backend.upsert("other", [_annotation("c", 2)])
+    assert [a["id"] for a in backend.get_annotations("doc", pages=[2])] == ["b"]
+    assert len(backend.get_annotations("doc")) == 2
+
+
+def test_apply_changes(backend):
+    backend.upsert("doc", [_annotation("a", 1), _annotation("b", 1)])
+    changes = [
+        {
+            "seq": 1,
+            "session": "s",
+            "op": "update",
+            "id": "a",
+            "version": 2,
+            "patch": {"page": 3, "version": 2},
+        },
+        {"seq": 2, "session": "s", "op": "delete", "id": "b", "version": 1},
+        {"seq": 3, "session": "s", "op": "delete", "id": "a", "version": 1},
+    ]
+    conflicts = backend.apply_changes("doc", changes)
+    assert [c["seq"] for c in conflicts] == [3]
+    assert backend.get("doc", "b") is None
+    assert [a["id"] for a in backend.get_annotations("doc", pages=[3])] == ["a"]
+
+
+def _update(seq, annotation_id, version):
+    return {
+        "seq": seq,
+        "session": "s",
+        "op": "update",
+        "id": annotation_id,
+        "version": version,
+        "patch": {"version": version},
+    }
+
+
+def test_applied_changes_survive_restart(tmp_path):
+    path = str(tmp_path / "annotations.db")
+    backend = SQLiteBackend(path)
+    backend.upsert("doc", [_annotation("a", 1)])
+    changes = [_update(1, "a", 2)]
+    assert backend.apply_changes("doc", changes) == []
+    backend.close()
+    # The same window seen again by another process is skipped
+    assert SQLiteBackend(path).apply_changes("doc", changes) == []
+
+
+def test_failed_transaction_keeps_changes(backend, monkeypatch):
+    backend.upsert("doc", [_annotation("a", 1)])
+    changes = [_update(1, "a", 2)]
+
+    def fail(doc_id, annotation_ids):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(backend, "delete", fail)
+        with pytest.raises(RuntimeError):
+            backend.apply_changes("doc", changes)
+    assert backend.get("doc", "a")["version"] == 1
+    assert backend.apply_changes("doc", changes) == []
+    assert backend.get("doc", "a")["version"] == 2
+
+
+def test_incomplete_backend_fails_on_creation():
+    class Incomplete(AnnotationBackend):
+        def get(self, doc_id, annotation_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_failed_upsert_writes_nothing(backend):
+    backend.upsert("doc", [_annotation("a", 1)])
+    with pytest.raises(KeyError):
+        backend.upsert("doc", [_annotation("a", 2, version=2), {"page": 2}])
+    assert backend.get("doc", "a")["version"] == 1
+    assert [a["id"] for a in backend.get_annotations("doc", pages=[1])] == ["a"]
+    assert backend.get_annotations("doc", pages=[2]) == []
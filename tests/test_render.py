@@ -0,0 +1,119 @@
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from dash_pdf_plus import render
+from dash_pdf_plus.documents import DocumentRegistry, init_app
+from dash_pdf_plus.render import PageRenderer, _parse_pages
+
+from .benchmarks.synthetic import make_pdf
+
+
+def test_parse_pages():
+    assert _parse_pages("1-3,7,9-10") == [1, 2, 3, 7, 9, 10]
+
+
+def test_image_cache_evicts_least_recently_used(tmp_path):
+    renderer = PageRenderer(cache_dir=tmp_path, max_cache_bytes=250)
+    directory = tmp_path / "doc"
+    directory.mkdir()
+    paths = []
+    for page in range(1, 4):
+        path = directory / "{}@1.png".format(page)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (page, page))
+        paths.append(str(path))
+    source = directory / "source.pdf"
+    source.write_bytes(b"x" * 100)
+    os.utime(source, (0, 0))
+
+    # Scanned on first use: the source copy and page 1 are the oldest
+    renderer._touch([paths[1]])
+    assert not source.exists()
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[2])
+    renderer._touch([paths[1]])
+    (directory / "4@1.png").write_bytes(b"x" * 100)
+    renderer._touch([str(directory / "4@1.png")])
+    assert os.path.exists(paths[1])
+    assert not os.path.exists(paths[2])
+
+
+def test_page_url_template():
+    registry = DocumentRegistry()
+    doc_id = registry.register(b"%PDF-1")
+    url = registry.page_url_for(doc_id, scale=0.25)
+    assert url == "/_dash-pdf/{}/pages/{{page}}.png?scale=0.25".format(doc_id)
+    assert registry.page_url_for(doc_id, page=3, format="webp").endswith(
+        "/pages/3.webp?scale=1"
+    )
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    pytest.importorskip("pypdfium2")
+    pytest.importorskip("PIL")
+    renderer = PageRenderer(cache_dir=tmp_path, max_workers=2)
+    yield renderer
+    renderer.close()
+
+
+def test_render_pages_is_cached(renderer):
+    pdf = make_pdf(3)
+    paths = renderer.render_pages(pdf, pages=[1, 3], scale=0.5)
+    assert sorted(paths) == [1, 3]
+    mtimes = {page: os.stat(path).st_mtime_ns for page, path in paths.items()}
+
+    again = renderer.render_pages(pdf, pages=[1, 3], scale=0.5)
+    assert again == paths
+    assert {p: os.stat(path).st_mtime_ns for p, path in again.items()} == mtimes
+
+
+def test_render_page_image(renderer):
+    from PIL import Image
+
+    image = renderer.render_page(make_pdf(1), 1, scale=0.5, format="webp")
+    with Image.open(io.BytesIO(image)) as decoded:
+        assert decoded.format == "WEBP"
+        assert decoded.size == (306, 396)
+
+
+def test_image_cache_bounds_document_copies(tmp_path):
+    pytest.importorskip("pypdfium2")
+    pytest.importorskip("PIL")
+    renderer = PageRenderer(cache_dir=tmp_path, max_workers=1, max_cache_bytes=20000)
+    try:
+        for num_pages in range(1, 6):
+            renderer.render_pages(make_pdf(num_pages), pages=[1], scale=0.2)
+            cached = sum(
+                path.stat().st_size for path in tmp_path.rglob("*") if path.is_file()
+            )
+            assert cached <= 20000
+    finally:
+        renderer.close()
+    assert len(list(tmp_path.rglob("source.pdf"))) < 5
+
+
+def test_render_page_out_of_range(renderer):
+    with pytest.raises(IndexError):
+        renderer.render_pages(make_pdf(2), pages=[3])
+
+
+def test_page_route_follows_content_of_reused_id(renderer, monkeypatch):
+    flask = pytest.importorskip("flask")
+    monkeypatch.setattr(render, "default_renderer", renderer)
+    # The same id registered again after a restart, for a longer document
+    for num_pages in (1, 5):
+        server = flask.Flask(__name__)
+        app = SimpleNamespace(
+            server=server,
+            config=SimpleNamespace(
+                routes_pathname_prefix="/", requests_pathname_prefix="/"
+            ),
+        )
+        registry = init_app(app, registry=DocumentRegistry())
+        registry.register(make_pdf(num_pages), doc_id="stable")
+        url = registry.page_url_for("stable", page=num_pages, scale=0.25)
+        assert server.test_client().get(url).status_code == 200
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from dash_pdf_plus import sync
+from dash_pdf_plus.sync import LocalBroker, SyncHub
+
+
+def _rect(annotation_id, version=1, updated_at="2024-01-01T00:00:00.000Z", x=10):
+    return {
+        "id": annotation_id,
+        "type": "rectangle",
+        "page": 1,
+        "version": version,
+        "updated_at": updated_at,
+        "x": x,
+        "y": 10,
+        "width": 50,
+        "height": 20,
+    }
+
+
+def _update(annotation, session="s"):
+    return {
+        "op": "update",
+        "id": annotation["id"],
+        "version": annotation["version"],
+        "patch": {"x": annotation["x"], "version": annotation["version"]},
+        "annotation": annotation,
+        "updated_at": annotation["updated_at"],
+    }
+
+
+def test_local_broker():
+    broker = LocalBroker()
+    first = broker.subscribe("doc")
+    second = broker.subscribe("doc")
+    assert broker.publish("doc", "hello") == 2
+    assert first.get(timeout=0) == "hello"
+    second.close()
+    assert broker.publish("doc", "again") == 1
+    assert first.get(timeout=0) == "again"
+    assert first.get(timeout=0) is None
+
+
+def test_changes_are_broadcast():
+    hub = SyncHub()
+    subscription = hub.subscribe("doc")
+    assert json.loads(subscription.get(timeout=0)) == {"session": None, "changes": []}
+
+    # Annotations the server has not seen are taken from the edit
+    edited = _rect("a", version=2, x=30)
+    assert hub.apply("doc", "s", [_update(edited)]) == [
+        {"id": "a", "annotation": edited}
+    ]
+    message = json.loads(subscription.get(timeout=0))
+    assert message["session"] == "s"
+    assert message["changes"][0]["annotation"]["x"] == 30
+
+    # Late subscribers start from a snapshot
+    snapshot = json.loads(hub.subscribe("doc").get(timeout=0))
+    assert snapshot["changes"] == [{"id": "a", "annotation": edited}]
+
+
+def test_conflicts_resolved_by_updated_at():
+    hub = SyncHub()
+    hub.store("doc", [_rect("a", version=2, updated_at="2024-01-01T00:00:02.000Z")])
+
+    # Made against version 1, but before the current version: rejected
+    stale = _rect("a", version=2, updated_at="2024-01-01T00:00:01.000Z", x=50)
+    [result] = hub.apply("doc", "s", [_update(stale)])
+    assert result["rejected"]
+    assert result["annotation"]["x"] == 10
+
+    # Made against version 1 after the current version: wins
+    later = _rect("a", version=2, updated_at="2024-01-01T00:00:03.000Z", x=70)
+    [result] = hub.apply("doc", "s", [_update(later)])
+    assert result["annotation"]["x"] == 70
+    assert result["annotation"]["version"] == 3
+    assert hub.store("doc").get("a")["version"] == 3
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        None,
+        {"op": "update", "patch": {}},
+        {"id": "a", "op": "move", "patch": {}},
+        {"id": "a", "op": "update"},
+        {"id": "a", "op": "delete", "version": "2"},
+    ],
+)
+def test_malformed_changes_are_rejected(change):
+    hub = SyncHub()
+    valid = _update(_rect("b", version=2))
+    with pytest.raises(ValueError):
+        hub.apply("doc", "s", [valid, change])
+    # Nothing is applied
+    assert hub.store("doc").get("b") is None
+
+
+def test_idle_stores_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sync.time, "monotonic", lambda: now[0])
+    hub = SyncHub(idle_timeout=60)
+    watched = hub.store("watched", [_rect("a")])
+    subscription = hub.subscribe("watched")
+    idle = hub.store("idle", [_rect("a")])
+
+    now[0] += 120
+    assert hub.store("watched") is watched
+    assert hub.store("idle") is not idle
+
+    hub.unsubscribe("watched", subscription)
+    now[0] += 30
+    assert hub.store("watched") is watched
+    now[0] += 120
+    hub.store("other")
+    assert hub.store("watched") is not watched
@@ -0,0 +1,107 @@
+import io
+
+import pytest
+
+from dash_pdf_plus import text
+from dash_pdf_plus.text import DocumentText, TextExtractor, fill_selected_text
+
+from .benchmarks.synthetic import make_pdf
+
+PAGES = [
+    [
+        ["Hello", 72, 40, 30, 12],
+        ["world", 106, 40, 32, 12],
+        ["Second", 72, 300, 40, 12],
+    ],
+    [["Other", 72, 40, 30, 12]],
+]
+
+
+@pytest.fixture
+def counted_runs(monkeypatch):
+    calls = []
+
+    def extract_runs(content):
+        calls.append(content)
+        return PAGES
+
+    monkeypatch.setattr(text, "extract_runs", extract_runs)
+    return calls
+
+
+def test_text_in_rect():
+    document = DocumentText("hash", PAGES)
+    assert document.text_in_rect(1, 70, 38, 100, 10) == "Hello world"
+    assert document.text_in_rect(1, 100, 30, -40, 20) == "Hello"
+    assert document.text_in_rect(1, 70, 200, 100, 200) == "Second"
+    assert document.text_in_rect(1, 300, 300, 10, 10) == ""
+    assert document.text_in_rect(2, 0, 0, 612, 792) == "Other"
+    with pytest.raises(IndexError):
+        document.text_in_rect(3, 0, 0, 10, 10)
+
+
+def test_extraction_is_cached_on_disk(tmp_path, counted_runs):
+    TextExtractor(cache_dir=tmp_path).extract(b"%PDF-1")
+    document = TextExtractor(cache_dir=tmp_path).extract(b"%PDF-1")
+    assert len(counted_runs) == 1
+    assert document.text(1) == "Hello world Second"
+    assert document.runs(2) == [
+        {"text": "Other", "x": 72, "y": 40, "width": 30, "height": 12}
+    ]
+
+
+def test_extraction_is_cached_in_memory(counted_runs):
+    extractor = TextExtractor(cache_dir=False)
+    assert extractor.extract(b"%PDF-1") is extractor.extract(b"%PDF-1")
+    extractor.invalidate(b"%PDF-1")
+    extractor.extract(b"%PDF-1")
+    assert len(counted_runs) == 2
+
+
+def test_fill_selected_text(counted_runs):
+    annotations = [
+        {"id": "a", "type": "rectangle", "page": 1, "x": 70, "y": 38,
+         "width": 100, "height": 10, "selected_text": ""},
+        {"id": "b", "type": "highlight", "page": 2, "x": 70, "y": 38,
+         "width": 10, "height": 10, "selected_text": "kept"},
+        {"id": "c", "type": "comment", "page": 1, "x": 70, "y": 38,
+         "width": 100, "height": 10},
+    ]  # fmt: skip
+    filled = fill_selected_text(
+        b"%PDF-1", annotations, extractor=TextExtractor(cache_dir=False)
+    )
+    assert [a.get("selected_text") for a in filled] == ["Hello world", "kept", None]
+    assert annotations[0]["selected_text"] == ""
+
+
+def test_extract_synthetic_pdf(tmp_path):
+    pytest.importorskip("pdfminer")
+    document = TextExtractor(cache_dir=tmp_path).extract(make_pdf(2))
+    assert len(document) == 2
+    # The text starts at 740 but `'` moves down one line (14pt) before
+    # drawing, so the first line's baseline is 726: about y=57 to 69 from
+    # the top of the 792pt page, with the second line from about y=71
+    text = document.text_in_rect(2, 60, 50, 400, 20)
+    assert text.startswith("Page 2 line 1 lorem")
+    assert "line 2" not in text
+
+
+def test_extract_cropped_pdf(tmp_path):
+    pytest.importorskip("pdfminer")
+    pypdf = pytest.importorskip("pypdf")
+    reader = pypdf.PdfReader(io.BytesIO(make_pdf(1)))
+    writer = pypdf.PdfWriter()
+    page = writer.add_page(reader.pages[0])
+    page.cropbox = pypdf.generic.RectangleObject([50, 40, 562, 772])
+    cropped = io.BytesIO()
+    writer.write(cropped)
+
+    extractor = TextExtractor(cache_dir=False)
+    full = extractor.extract(make_pdf(1)).runs(1)[0]
+    run = extractor.extract(cropped.getvalue()).runs(1)[0]
+    assert run["text"] == full["text"]
+    assert run["x"] == pytest.approx(full["x"] - 50)
+    assert run["y"] == pytest.approx(full["y"] - 20)
+    # The first line seen through the crop
+    text = extractor.extract(cropped.getvalue()).text_in_rect(1, 10, 30, 400, 20)
+    assert text.startswith("Page 1 line 1 lorem")
@@ -1,25 +1,30 @@
-from dash.testing.application_runners import import_app
+from dash import Dash, Input, Output, html
+
+import dash_pdf_plus
+
+from .benchmarks.synthetic import make_pdf
 
 
 # Basic test for the component rendering.
 # The dash_duo pytest fixture is installed with dash (v1.0+)
 def test_render_component(dash_duo):
-    # Start a dash app contained as the variable `app` in `usage.py`
-    app = import_app('usage')
-    dash_duo.start_server(app)
+    app = Dash(__name__)
+    dash_pdf_plus.init_app(app)
+    app.layout = html.Div(
+        [
+            dash_pdf_plus.DashPDF(id="viewer", data=make_pdf(3), stream=True),
+            html.Div(id="output"),
+        ]
+    )
 
-    # Get the generated component input with selenium
-    # The html input will be a children of the #input dash component
-    my_component = dash_duo.find_element('#input > input')
+    @app.callback(Output("output", "children"), Input("viewer", "num_pages"))
+    def show_num_pages(num_pages):
+        return "Pages: {}".format(num_pages)
 
-    assert 'my-value' == my_component.get_attribute('value')
-
-    # Clear the input
-    dash_duo.clear_input(my_component)
-
-    # Send keys to the custom input.
-    my_component.send_keys('Hello dash')
+    dash_duo.start_server(app)
 
-    # Wait for the text to equal, if after the timeout (default 10 seconds)
-    # the text is not equal it will fail the test.
-    dash_duo.wait_for_text_to_equal('#output', 'You have entered Hello dash')
+    # The document is loaded from the registry route and its first page
+    # rendered, with the page count reported back to the server
+    dash_duo.wait_for_element("#viewer .react-pdf__Page__canvas", timeout=10)
+    dash_duo.wait_for_text_to_equal("#output", "Pages: 3")
+    assert dash_duo.get_logs() == []